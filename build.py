@@ -25,6 +25,7 @@ def export_requirements():
             "--output",
             requirements_path,
             "--without-hashes",
+            "--all-extras",
         ],
         capture_output=True,
         text=True,
@@ -0,0 +1,116 @@
+"""Сравнение обработки задачи со стандартным `json` и с кодеком `src.codec`.
+
+Измеряет JSON-часть пути одной задачи: разбор кадра от сервера, подготовку
+данных для драйвера (проверка и выполнение) и кодирование результата.
+
+Запуск: `python -m src.bench.codec_bench --repeat 20000`
+"""
+
+import argparse
+import json
+import timeit
+from typing import Any
+
+from src import codec
+
+
+def make_task(items: int) -> dict[str, Any]:
+    """Задача печати чека с `items` позициями"""
+    return {
+        "number": 1042,
+        "type": "sell",
+        "taxationType": "osn",
+        "operator": {"name": "Иванов И.И.", "vatin": "123654789507"},
+        "items": [
+            {
+                "type": "position",
+                "name": f"Товар №{i} с длинным названием",
+                "price": 199.99,
+                "quantity": 2,
+                "amount": 399.98,
+                "tax": {"type": "vat20"},
+                "paymentObject": "commodity",
+            }
+            for i in range(items)
+        ],
+        "payments": [{"type": "electronically", "sum": 399.98 * items}],
+    }
+
+
+def make_result(task: dict[str, Any]) -> str:
+    """Ответ драйвера: JSON-строка с данными фискального документа"""
+    return json.dumps(
+        {
+            "fiscalParams": {
+                "fiscalDocumentNumber": 5123,
+                "fiscalDocumentSign": "2817263540",
+                "fnNumber": "9999078900012345",
+                "receiptSum": task["payments"][0]["sum"],
+                "registrationNumber": "0000000001002292",
+            },
+            "warnings": None,
+        }
+    )
+
+
+def stdlib_task(frame: bytes, result: str) -> bytes:
+    """Путь задачи до перехода на кодек"""
+    task = json.loads(frame)
+    task_number = task.pop("number")
+    json.dumps(task)  # _validate_json_task
+    json.dumps(task)  # _execute_json_task
+    envelope = {"status": "success", "number": task_number, "data": result}
+    return json.dumps(envelope, ensure_ascii=False).encode("utf-8")
+
+
+def codec_task(frame: bytes, result: str) -> bytes:
+    """Путь задачи через кодек: данные драйвера сериализуются один раз"""
+    task = codec.loads(frame)
+    task_number = task.pop("number")
+    codec.dumps_driver(task)
+    envelope = {"status": "success", "number": task_number, "data": result}
+    return codec.dumps(envelope)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Сравнение JSON-кодеков")
+    parser.add_argument("--repeat", type=int, default=20000)
+    parser.add_argument("--items", type=int, nargs="*", default=[1, 10, 100])
+    args = parser.parse_args()
+
+    print(f"Кодек: {codec.BACKEND}")
+    for items in args.items:
+        task = make_task(items)
+        frame = json.dumps(task, ensure_ascii=False).encode("utf-8")
+        result = make_result(task)
+
+        # Данные для драйвера обязаны совпадать с прежними байт в байт
+        payload = {key: value for key, value in task.items() if key != "number"}
+        if codec.dumps_driver(payload) != json.dumps(payload):
+            raise RuntimeError("Данные для драйвера отличаются от json.dumps")
+
+        stdlib = min(
+            timeit.repeat(
+                lambda: stdlib_task(frame, result),  # noqa: B023
+                number=args.repeat,
+                repeat=3,
+            )
+        )
+        fast = min(
+            timeit.repeat(
+                lambda: codec_task(frame, result),  # noqa: B023
+                number=args.repeat,
+                repeat=3,
+            )
+        )
+        stdlib_us = stdlib / args.repeat * 1e6
+        fast_us = fast / args.repeat * 1e6
+        print(
+            f"{items:>4} позиций, {len(frame):>6} байт: json {stdlib_us:8.1f} мкс, "
+            f"{codec.BACKEND} {fast_us:8.1f} мкс, "
+            f"экономия {stdlib_us - fast_us:7.1f} мкс ({1 - fast / stdlib:.0%})"
+        )
+
+
+if __name__ == "__main__":
+    main()
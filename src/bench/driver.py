@@ -0,0 +1,83 @@
+"""Симулятор драйвера кассы для нагрузочных замеров без оборудования.
+
+Повторяет методы `IFptr`, которые использует `Cashbox`, и выполняет задачу
+за заданное для ее типа время, как настоящая касса.
+"""
+
+import threading
+import time
+from typing import Any
+
+from lib.libfptr10 import IFptr
+from src import codec
+
+# Время выполнения задач на кассе по типу задачи, секунды
+DEFAULT_SERVICE_TIMES = {
+    "getDeviceStatus": 0.005,
+    "sell": 0.05,
+    "sellReturn": 0.05,
+    "openShift": 0.2,
+    "closeShift": 0.5,
+    "reportX": 0.3,
+}
+DEFAULT_SERVICE_TIME = 0.02
+
+
+class SimulatedDriver(IFptr):
+    """Открытое соединение с несуществующей кассой. Библиотека драйвера не загружается."""
+
+    def __init__(self, service_times: dict[str, float] | None = None) -> None:
+        self.service_times = {**DEFAULT_SERVICE_TIMES, **(service_times or {})}
+        self.processed = 0  # Выполнено задач
+        self._params: dict[int, Any] = {}
+        self._opened = True
+        self._lock = threading.Lock()  # Драйвер не допускает параллельных вызовов
+
+    def __del__(self) -> None:
+        pass
+
+    def isOpened(self) -> bool:
+        return self._opened
+
+    def close(self) -> int:
+        self._opened = False
+        return 0
+
+    def setParam(self, paramId: int, param: Any) -> None:
+        self._params[paramId] = param
+
+    def queryData(self) -> int:
+        return 0
+
+    def getParamInt(self, paramId: int) -> int:
+        if paramId == IFptr.LIBFPTR_PARAM_SHIFT_STATE:
+            return int(IFptr.LIBFPTR_SS_OPENED)
+        return 0
+
+    def getParamString(self, paramId: int) -> str:
+        return str(self._params.get(paramId, ""))
+
+    def validateJson(self) -> int:
+        return 0
+
+    def processJson(self) -> int:
+        with self._lock:
+            task = codec.loads(self._params[IFptr.LIBFPTR_PARAM_JSON_DATA])
+            time.sleep(self.service_times.get(task["type"], DEFAULT_SERVICE_TIME))
+            self.processed += 1
+            self._params[IFptr.LIBFPTR_PARAM_JSON_DATA] = codec.dumps_driver(
+                {
+                    "fiscalParams": {
+                        "fiscalDocumentNumber": self.processed,
+                        "fnNumber": "9999078900012345",
+                    },
+                    "warnings": None,
+                }
+            )
+        return 0
+
+    def errorCode(self) -> int:
+        return 0
+
+    def errorDescription(self) -> str:
+        return ""
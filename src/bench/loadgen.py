@@ -0,0 +1,294 @@
+"""Нагрузочный замер клиента на локальном эталонном сервере.
+
+Эталонный сервер раздает задачи `--keys` кассам с заданной частотой и смесью
+типов задач и замеряет время от отправки задачи до получения результата.
+По умолчанию кассы запускаются в этом же процессе: обработка задач та же,
+что и во вкладке приложения, а вместо драйвера работает симулятор
+`src.bench.driver`. Итог - отчет о пропускной способности и задержках,
+который можно сохранить в JSON и сравнить между версиями клиента.
+
+Запуск: `python -m src.bench.loadgen --keys 4 --rate 100 --duration 10`
+
+С `--external` кассы не запускаются: подключите приложение к серверу
+`127.0.0.1:<port>` с ключами соединения `bench-0`, `bench-1` и т.д.
+"""
+
+import argparse
+import logging
+import random
+import sys
+import time
+import tomllib
+from pathlib import Path
+from typing import Any
+
+from src import codec
+from src.bench.driver import SimulatedDriver
+from src.bench.server import ReferenceServer
+from src.bridge import TaskBridge
+from src.cashbox import Cashbox
+from src.ws_client import WebSocketClient
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MIX = "getDeviceStatus=7,sell=3"
+
+
+def parse_weights(value: str) -> dict[str, float]:
+    """Разбирает строку вида `sell=3,getDeviceStatus=7`"""
+    weights = {}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        if not name.strip() or not weight:
+            raise argparse.ArgumentTypeError(f"Ожидается тип=число: {item!r}")
+        weights[name.strip()] = float(weight)
+    return weights
+
+
+def client_version() -> str:
+    """Версия клиента из pyproject.toml"""
+    pyproject = Path(__file__).resolve().parents[2] / "pyproject.toml"
+    try:
+        with pyproject.open("rb") as f:
+            return str(tomllib.load(f)["tool"]["poetry"]["version"])
+    except (OSError, KeyError, tomllib.TOMLDecodeError):
+        return "unknown"
+
+
+class BenchClient:
+    """Касса с симулятором драйвера, которая обрабатывает задачи как вкладка приложения"""
+
+    def __init__(
+        self,
+        server_address: str,
+        key: str,
+        multiplexed: bool = False,
+        service_times: dict[str, float] | None = None,
+        queue_size: int = 20,
+    ) -> None:
+        self.cashbox = Cashbox("Симулятор", f"SIM-{key}", "SIM", {})
+        self.cashbox.connect(SimulatedDriver(service_times))
+        self.bridge = TaskBridge(
+            name=key,
+            logger=logger,
+            get_cashbox=lambda: self.cashbox,
+            queue_size=queue_size,
+        )
+        address = (
+            f"ws://{server_address}/tasks"
+            if multiplexed
+            else f"ws://{server_address}/task/{key}"
+        )
+        self.websocket_client = WebSocketClient(
+            server_address=address,
+            on_message_callback=self.bridge.on_message_received,
+            on_open_callback=lambda: self.bridge.on_connection_open(
+                self.websocket_client
+            ),
+            on_error_callback=lambda e: logger.error(f"[{key}] {e}"),
+            on_close_callback=lambda r: logger.info(f"[{key}] закрыто: {r}"),
+            logger=logger,
+            connection_key=key if multiplexed else None,
+            outbox=self.bridge.outbox,
+        )
+
+    def start(self) -> None:
+        self.websocket_client.connect()
+
+    def stop(self) -> None:
+        self.websocket_client.close()
+        self.bridge.stop()
+
+
+def percentile(values: list[float], p: float) -> float:
+    """Перцентиль по отсортированному списку методом ближайшего ранга"""
+    if not values:
+        return 0.0
+    rank = max(int(len(values) * p / 100 + 0.5), 1)
+    return values[min(rank, len(values)) - 1]
+
+
+def latency_summary(values: list[float]) -> dict[str, float]:
+    values = sorted(values)
+    return {
+        "count": len(values),
+        "mean_ms": sum(values) / len(values) * 1000 if values else 0.0,
+        "p50_ms": percentile(values, 50) * 1000,
+        "p90_ms": percentile(values, 90) * 1000,
+        "p99_ms": percentile(values, 99) * 1000,
+        "max_ms": (values[-1] if values else 0.0) * 1000,
+    }
+
+
+def run_load(args: argparse.Namespace) -> dict[str, Any]:
+    """Запускает сервер и кассы, подает нагрузку и возвращает отчет"""
+    statuses: dict[str, int] = {}
+    last_result_at = 0.0
+
+    def on_result(key: str, result: dict[str, Any]) -> None:
+        nonlocal last_result_at
+        last_result_at = time.monotonic()
+        status = str(result.get("status"))
+        statuses[status] = statuses.get(status, 0) + 1
+
+    server = ReferenceServer(
+        host=args.host,
+        port=args.port,
+        encodings=args.encoding,
+        batching=not args.no_batch,
+        acks=not args.no_ack,
+        compression=not args.no_compression,
+        credits=not args.no_credit,
+        on_result=on_result,
+    )
+    server.start_in_thread()
+
+    keys = [f"bench-{i}" for i in range(args.keys)]
+    clients = []
+    if not args.external:
+        clients = [
+            BenchClient(
+                f"{args.host}:{args.port}",
+                key,
+                multiplexed=args.multiplex,
+                service_times=args.service_time,
+                queue_size=args.queue_size,
+            )
+            for key in keys
+        ]
+        for client in clients:
+            client.start()
+
+    deadline = time.monotonic() + args.connect_timeout
+    while not server.connected_keys.issuperset(keys):
+        if time.monotonic() > deadline:
+            missing = sorted(set(keys) - server.connected_keys)
+            raise RuntimeError(f"Кассы не подключились: {', '.join(missing)}")
+        time.sleep(0.05)
+
+    # Нагрузка с постоянной частотой, не зависящей от скорости ответов клиента
+    rng = random.Random(args.seed)  # nosec B311 - не для криптографии
+    task_types = list(args.mix)
+    weights = list(args.mix.values())
+    total = int(args.rate * args.duration)
+    started_at = time.monotonic()
+    for number in range(total):
+        delay = started_at + number / args.rate - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        task_type = rng.choices(task_types, weights)[0]
+        server.submit(keys[number % len(keys)], {"number": number, "type": task_type})
+    generated_at = time.monotonic()
+
+    deadline = generated_at + args.drain_timeout
+    while len(server.latencies) < total and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+    for client in clients:
+        client.stop()
+
+    latencies = list(server.latencies)
+    completed = len(latencies)
+    elapsed = (last_result_at or generated_at) - started_at
+    by_type: dict[str, list[float]] = {}
+    for task_type, latency in latencies:
+        by_type.setdefault(task_type, []).append(latency)
+
+    return {
+        "label": args.label,
+        "version": client_version(),
+        "codec": codec.BACKEND,
+        "clients": "external" if args.external else "simulated",
+        "multiplex": args.multiplex,
+        "keys": args.keys,
+        "rate": args.rate,
+        "duration": args.duration,
+        "mix": args.mix,
+        "tasks": total,
+        "completed": completed,
+        "statuses": statuses,
+        "rejected": server.rejected,
+        "duplicates": server.duplicates,
+        "result_frames": server.frames,
+        "elapsed": elapsed,
+        "throughput": completed / elapsed if elapsed > 0 else 0.0,
+        "latency": latency_summary([latency for _, latency in latencies]),
+        "latency_by_type": {
+            task_type: latency_summary(values)
+            for task_type, values in sorted(by_type.items())
+        },
+    }
+
+
+def format_report(report: dict[str, Any]) -> str:
+    lines = [
+        f"Клиент {report['version']} {report['label']}".rstrip()
+        + f", кодек {report['codec']}, кассы: {report['clients']}"
+        + (", общее соединение" if report["multiplex"] else ""),
+        f"Нагрузка: {report['keys']} касс, {report['rate']:g} задач/с "
+        f"в течение {report['duration']:g} с",
+        f"Выполнено {report['completed']} из {report['tasks']} задач "
+        f"за {report['elapsed']:.1f} с: {report['throughput']:.1f} задач/с",
+        f"Отклонено из-за очереди: {report['rejected']}, "
+        f"повторов: {report['duplicates']}, кадров с результатами: {report['result_frames']}",
+        "",
+        f"{'Тип':<20}{'задач':>8}{'сред.':>10}{'p50':>10}{'p90':>10}{'p99':>10}{'макс.':>10}",
+    ]
+    rows = [*report["latency_by_type"].items(), ("все", report["latency"])]
+    for name, summary in rows:
+        lines.append(
+            f"{name:<20}{summary['count']:>8}{summary['mean_ms']:>10.1f}"
+            f"{summary['p50_ms']:>10.1f}{summary['p90_ms']:>10.1f}"
+            f"{summary['p99_ms']:>10.1f}{summary['max_ms']:>10.1f}"
+        )
+    lines.append("Задержки в миллисекундах, от отправки задачи до получения результата")
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Нагрузочный замер клиента")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--keys", type=int, default=4, help="Число касс")
+    parser.add_argument("--rate", type=float, default=50, help="Задач в секунду")
+    parser.add_argument("--duration", type=float, default=10, help="Секунды нагрузки")
+    parser.add_argument(
+        "--mix",
+        type=parse_weights,
+        default=parse_weights(DEFAULT_MIX),
+        help=f"Доли типов задач, по умолчанию {DEFAULT_MIX}",
+    )
+    parser.add_argument(
+        "--service-time",
+        type=parse_weights,
+        default={},
+        help="Время выполнения задач симулятором, например sell=0.1",
+    )
+    parser.add_argument("--queue-size", type=int, default=20)
+    parser.add_argument("--multiplex", action="store_true")
+    parser.add_argument("--external", action="store_true")
+    parser.add_argument("--connect-timeout", type=float, default=30)
+    parser.add_argument("--drain-timeout", type=float, default=30)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--label", default="", help="Метка отчета, например ветка")
+    parser.add_argument("--report", type=Path, help="Файл для отчета в JSON")
+    parser.add_argument("--encoding", action="append", help="Разрешенные кодировки")
+    parser.add_argument("--no-batch", action="store_true")
+    parser.add_argument("--no-ack", action="store_true")
+    parser.add_argument("--no-compression", action="store_true")
+    parser.add_argument("--no-credit", action="store_true")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s %(message)s")
+    try:
+        report = run_load(args)
+    except RuntimeError as e:
+        sys.exit(str(e))
+
+    print(format_report(report))
+    if args.report is not None:
+        args.report.write_text(codec.dumps_pretty(report), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
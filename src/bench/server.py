@@ -0,0 +1,317 @@
+"""Эталонный сервер задач для проверки клиента без настоящего сервера.
+
+Поддерживает обе схемы подключения (`/task/<ключ>` и общее `/tasks`),
+кодировки сообщений из `src.encoding`, пакеты результатов, подтверждения
+с возобновлением после переподключения, кредиты и сжатие. Для каждой задачи замеряет
+время от отправки клиенту до получения результата.
+
+Запуск: `python -m src.bench.server --port 8765 --tasks 10`
+"""
+
+import argparse
+import asyncio
+import logging
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Callable
+from typing import Any
+
+from websockets.asyncio.server import ServerConnection, serve
+from websockets.exceptions import ConnectionClosed
+from websockets.http11 import Request, Response
+
+from src.encoding import ENCODINGS, MessageEncoding, get_encoding
+from src.ws_client import ACK_FEATURE, BATCH_FEATURE, CREDIT_FEATURE, FEATURES_HEADER
+
+logger = logging.getLogger(__name__)
+
+
+class ReferenceServer:
+    """Раздает задачи подключенным клиентам и собирает их результаты"""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8765,
+        encodings: list[str] | None = None,
+        batching: bool = True,
+        acks: bool = True,
+        compression: bool = True,
+        credits: bool = True,
+        on_result: Callable[[str, dict[str, Any]], Any] | None = None,
+        initial_tasks: int = 0,
+    ) -> None:
+        self.host = host
+        self.port = port
+        # Кодировки сервера в порядке предпочтения, по умолчанию все доступные
+        self.encodings = [
+            encoding
+            for encoding in ENCODINGS
+            if encodings is None or encoding.name in encodings
+        ]
+        self.batching = batching
+        self.acks = acks
+        self.compression = compression
+        self.credits = credits
+        self.on_result = on_result
+        self.initial_tasks = initial_tasks  # Задач для каждого нового ключа
+
+        self.results: dict[str, list[dict[str, Any]]] = defaultdict(list)
+        self.control: list[dict[str, Any]] = []  # Служебные сообщения клиентов
+        self.frames = 0  # Получено кадров с результатами
+        self.duplicates = 0  # Повторно полученных результатов
+        self.resent = 0  # Задач, отправленных повторно после возобновления
+        self.rejected = 0  # Задач, которые клиент не принял из-за заполненной очереди
+        # Время от первой отправки задачи до результата и тип задачи
+        self.latencies: list[tuple[str, float]] = []
+        self.connected_keys: set[str] = set()  # Ключи с подключенными кассами
+        self._sent_at: dict[str, dict[Any, float]] = defaultdict(dict)
+        # Отправленные задачи без результата по ключу и номеру задачи
+        self._in_flight: dict[str, dict[Any, dict[str, Any]]] = defaultdict(dict)
+        self._answered: dict[str, set[Any]] = defaultdict(set)
+        self.loop: asyncio.AbstractEventLoop | None = None
+        self._queues: dict[str, asyncio.Queue[dict[str, Any]]] = {}
+        # Снят ли флаг backpressure кассы: пока он поднят, задачи ей не отправляются
+        self._accepting: dict[str, asyncio.Event] = {}
+        # Кредиты, выданные кассой на текущее соединение: по одному на задачу
+        self._credits: dict[str, asyncio.Semaphore] = {}
+        self._started = threading.Event()
+
+    def submit(self, key: str, task: dict[str, Any]) -> None:
+        """Ставит задачу для кассы с ключом `key`. Можно вызывать из любого потока."""
+        if self.loop is None:
+            raise RuntimeError("Сервер не запущен")
+        self.loop.call_soon_threadsafe(lambda: self._queue(key).put_nowait(task))
+
+    def start_in_thread(self) -> None:
+        """Запускает сервер в фоновом потоке и ждет, пока он начнет принимать соединения"""
+        threading.Thread(
+            target=lambda: asyncio.run(self.serve_forever()),
+            name="reference-server",
+            daemon=True,
+        ).start()
+        self._started.wait()
+
+    async def serve_forever(self) -> None:
+        self.loop = asyncio.get_running_loop()
+        async with serve(
+            self._handle,
+            self.host,
+            self.port,
+            subprotocols=[encoding.subprotocol for encoding in self.encodings],  # type: ignore[misc]
+            process_response=self._process_response,
+            compression="deflate" if self.compression else None,
+        ):
+            self._started.set()
+            await asyncio.Future()
+
+    def _process_response(
+        self, ws: ServerConnection, request: Request, response: Response
+    ) -> Response:
+        """Подтверждает возможности протокола, которые предложил клиент"""
+        offered = request.headers.get(FEATURES_HEADER, "").split(",")
+        features = [
+            feature
+            for feature, enabled in (
+                (BATCH_FEATURE, self.batching),
+                (ACK_FEATURE, self.acks),
+                (CREDIT_FEATURE, self.credits),
+            )
+            if enabled and feature in offered
+        ]
+        if features:
+            response.headers[FEATURES_HEADER] = ",".join(features)
+        return response
+
+    async def _handle(self, ws: ServerConnection) -> None:
+        encoding = get_encoding(ws.subprotocol)
+        path = ws.request.path if ws.request is not None else ""
+        multiplexed = path.rstrip("/") == "/tasks"
+        keys: set[str] = set() if multiplexed else {path.rsplit("/", 1)[-1]}
+        features = ws.response.headers.get(FEATURES_HEADER, "") if ws.response else ""
+        acks = ACK_FEATURE in features
+        credits = CREDIT_FEATURE in features
+
+        senders = {
+            key: asyncio.create_task(
+                self._send_tasks(ws, encoding, key, multiplexed, credits)
+            )
+            for key in keys
+        }
+        self.connected_keys.update(keys)
+        try:
+            async for frame in ws:
+                message = encoding.decode(frame)
+                if message.get("type") in ("subscribe", "unsubscribe"):
+                    self.control.append(message)
+                    for key in message["keys"]:
+                        if message["type"] == "subscribe" and key not in senders:
+                            senders[key] = asyncio.create_task(
+                                self._send_tasks(
+                                    ws, encoding, key, multiplexed, credits
+                                )
+                            )
+                            self.connected_keys.add(key)
+                        elif message["type"] == "unsubscribe" and key in senders:
+                            senders.pop(key).cancel()
+                            self.connected_keys.discard(key)
+                            self._credits.pop(key, None)
+                    continue
+
+                self.frames += 1
+                items = (
+                    message["items"] if message.get("type") == "batch" else [message]
+                )
+                last_seq: dict[str, int] = {}
+                for item in items:
+                    key = item.pop("key") if multiplexed else next(iter(keys))
+                    if "seq" in item:
+                        last_seq[key] = max(last_seq.get(key, 0), item.pop("seq"))
+                    self._on_message(key, item)
+
+                # Одно подтверждение на кадр: номер последнего сообщения каждой кассы
+                if acks:
+                    for key, seq in last_seq.items():
+                        ack = {"type": "ack", "seq": seq}
+                        if multiplexed:
+                            ack = {"key": key, **ack}
+                        await ws.send(encoding.encode(ack), text=encoding.text)
+        except ConnectionClosed:
+            pass
+        finally:
+            for key, sender in senders.items():
+                sender.cancel()
+                self.connected_keys.discard(key)
+                # Кредиты действуют только в пределах соединения
+                self._credits.pop(key, None)
+
+    def _queue(self, key: str) -> asyncio.Queue[dict[str, Any]]:
+        """Очередь задач кассы. Новая очередь заполняется `initial_tasks` задачами."""
+        if key not in self._queues:
+            self._queues[key] = asyncio.Queue()
+            for number in range(self.initial_tasks):
+                self._queues[key].put_nowait(
+                    {"number": number, "type": "getDeviceStatus"}
+                )
+        return self._queues[key]
+
+    def _accepting_event(self, key: str) -> asyncio.Event:
+        if key not in self._accepting:
+            self._accepting[key] = asyncio.Event()
+            self._accepting[key].set()
+        return self._accepting[key]
+
+    def _credit_semaphore(self, key: str) -> asyncio.Semaphore:
+        if key not in self._credits:
+            self._credits[key] = asyncio.Semaphore(0)
+        return self._credits[key]
+
+    def _on_message(self, key: str, message: dict[str, Any]) -> None:
+        if message.get("type") == "credit":
+            credits = self._credit_semaphore(key)
+            for _ in range(int(message.get("grant", 0))):
+                credits.release()
+        elif message.get("type") == "resume":
+            self._resume(key, set(message.get("pending", [])))
+        elif message.get("type") == "backpressure":
+            if message.get("state") == "on":
+                self._accepting_event(key).clear()
+            else:
+                self._accepting_event(key).set()
+        if "type" in message:
+            self.control.append({"key": key, **message})
+            return
+
+        number = message.get("number")
+        task = self._in_flight[key].pop(number, None)
+        if task is None and number in self._answered[key]:
+            # Результат уже получен до разрыва связи, а подтверждение потерялось
+            self.duplicates += 1
+            return
+
+        if message.get("status") == "busy" and task is not None:
+            # Очередь кассы заполнена, задачу нужно отправить позже
+            self.rejected += 1
+            self._queue(key).put_nowait(task)
+            return
+
+        self._answered[key].add(number)
+        sent_at = self._sent_at[key].pop(number, None)
+        if sent_at is not None:
+            task_type = task.get("type", "") if task is not None else ""
+            self.latencies.append((task_type, time.monotonic() - sent_at))
+
+        self.results[key].append(message)
+        if self.on_result is not None:
+            self.on_result(key, message)
+
+    def _resume(self, key: str, pending: set[Any]) -> None:
+        """Повторно ставит в очередь задачи, которые до клиента не дошли"""
+        for number, task in list(self._in_flight[key].items()):
+            if number not in pending:
+                del self._in_flight[key][number]
+                self._queue(key).put_nowait(task)
+                self.resent += 1
+
+    async def _send_tasks(
+        self,
+        ws: ServerConnection,
+        encoding: MessageEncoding,
+        key: str,
+        multiplexed: bool,
+        credits: bool,
+    ) -> None:
+        queue = self._queue(key)
+        accepting = self._accepting_event(key)
+        while True:
+            await accepting.wait()
+            if credits:
+                # Без кредита касса задачу не ждет
+                await self._credit_semaphore(key).acquire()
+            task = await queue.get()
+            self._in_flight[key][task["number"]] = task
+            # Задержка считается от первой отправки, повторные ее не сбрасывают
+            self._sent_at[key].setdefault(task["number"], time.monotonic())
+            message = {"key": key, **task} if multiplexed else task
+            try:
+                await ws.send(encoding.encode(message), text=encoding.text)
+            except ConnectionClosed:
+                # Задача не доставлена, отдадим ее при следующем подключении
+                del self._in_flight[key][task["number"]]
+                queue.put_nowait(task)
+                return
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Эталонный сервер задач")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument(
+        "--tasks", type=int, default=0, help="Задач на каждый ключ при подключении"
+    )
+    parser.add_argument("--encoding", action="append", help="Разрешенные кодировки")
+    parser.add_argument("--no-batch", action="store_true")
+    parser.add_argument("--no-ack", action="store_true")
+    parser.add_argument("--no-compression", action="store_true")
+    parser.add_argument("--no-credit", action="store_true")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    server = ReferenceServer(
+        host=args.host,
+        port=args.port,
+        encodings=args.encoding,
+        batching=not args.no_batch,
+        acks=not args.no_ack,
+        compression=not args.no_compression,
+        credits=not args.no_credit,
+        on_result=lambda key, result: logger.info(f"[{key}] {result}"),
+        initial_tasks=args.tasks,
+    )
+    logger.info(f"Эталонный сервер слушает ws://{args.host}:{args.port}")
+    asyncio.run(server.serve_forever())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future
+from typing import Any
+
+from src import errors
+from src.cashbox import Cashbox
+from src.flow_control import CreditWindow, FlowControlSettings
+from src.log import TaskLogger
+from src.outbox import Outbox
+from src.task_queue import TaskRegistry, TaskWorker
+from src.ws_client import ACK_FEATURE, CREDIT_FEATURE, WebSocketClient
+
+
+class TaskBridge:
+    """Путь задачи от сервера до кассы и результата обратно.
+
+    Не зависит от GUI: используется вкладкой приложения, режимом без GUI
+    и нагрузочным замером. Соединение с сервером открывает владелец моста
+    и сообщает о нем через `on_connection_open` и `on_connection_closed`.
+
+    Если сервер поддерживает кредиты, он присылает задачи только в пределах
+    окна, которое выдает касса (`CreditWindow`).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        logger: TaskLogger,
+        get_cashbox: Callable[[], Cashbox | None],
+        queue_size: int = 20,
+        on_task_done: Callable[[], Any] | None = None,
+        flow_control: FlowControlSettings | None = None,
+    ) -> None:
+        self.logger = logger
+        self.queue_size = queue_size
+        self.connected = False
+        self._get_cashbox = get_cashbox
+        self._on_task_done = on_task_done
+        # Задачи кассы выполняются по одной в отдельном потоке, чтобы не задерживать
+        # чтение сообщений от сервера
+        self.task_worker = TaskWorker(name=name, maxsize=queue_size)
+        self._backpressure = False  # Сообщили ли серверу о заполненной очереди
+        self._backpressure_lock = threading.Lock()
+        # Номера принятых задач, чтобы не выполнить повторно присланную задачу
+        self.task_registry = TaskRegistry()
+        # Очередь результатов для сервера. Принадлежит мосту, а не соединению, чтобы
+        # результаты, не отправленные до разрыва связи, ушли после переподключения
+        self.outbox = Outbox()
+        self.credits = CreditWindow(flow_control or FlowControlSettings(), queue_size)
+
+    def on_connection_open(self, client: WebSocketClient) -> None:
+        self.connected = True
+        if ACK_FEATURE in client.server_features:
+            # Неподтвержденные результаты уже стоят в очереди первыми. Сообщаем,
+            # какие задачи у нас есть, чтобы сервер прислал только потерянные.
+            # Каждое соединение собирает свой список, прошлый повторно не отправляется
+            self.send(
+                {"type": "resume", "pending": self.task_registry.pending()},
+                replay=False,
+            )
+        # Кредиты прошлого соединения сервер не помнит, выдаем их заново.
+        # Выдачи прошлого соединения очередь отправки уже удалила
+        grant = self.credits.reset(CREDIT_FEATURE in client.server_features)
+        if grant:
+            self.send({"type": "credit", "grant": grant}, replay=False)
+
+    def on_connection_closed(self) -> None:
+        self.connected = False
+        # Без соединения кредиты не выдаются, новое начнется с `reset`
+        self.credits.reset(False)
+
+    def on_message_received(self, task: Any) -> None:
+        """Обработка сообщения от сервера: задача ставится в очередь кассы.
+
+        Сообщение уже разобрано клиентом соединения, невалидное приходит как None.
+        """
+        task_number = None
+        self.credits.consume()
+
+        try:
+            task_number = task["number"]
+            accepted, previous_result = self.task_registry.begin(task_number)
+        except (KeyError, TypeError):
+            self.logger.exception("Невалидный формат задачи")
+            self.send(
+                {"status": "error", "number": task_number, "data": "Bad json received"}
+            )
+            return
+
+        if not accepted:
+            self.logger.warning(f"Задача №{task_number} получена повторно")
+            if previous_result is not None:
+                self.send(previous_result)
+            self._grant_credits()
+            return
+
+        # Учитываем задачу до постановки: рабочий поток может выполнить ее сразу
+        self.credits.task_queued()
+        try:
+            self.task_worker.submit(self._process_task, task)
+        except errors.TaskQueueFull as e:
+            self.credits.task_rejected()
+            # Сообщаем серверу, что задача не принята и ее нужно отправить позже
+            self.task_registry.discard(task_number)
+            self.logger.warning(f"Задача №{task_number} отклонена: {e}")
+            self.send({"status": "busy", "number": task_number, "data": str(e)})
+            self._set_backpressure(True)
+            self._grant_credits()
+
+    def _process_task(self, task: dict[str, Any]) -> None:
+        """Выполняет задачу на кассе. Вызывается в рабочем потоке очереди."""
+        task_number = task.pop("number")
+        cashbox = self._get_cashbox()
+        error_code = None
+        started_at = time.monotonic()
+
+        try:
+            if cashbox is None:
+                raise errors.CashboxConnectionError(
+                    "Задача не может быть выполнена: Касса не привязана"
+                )
+            result = {
+                "status": "success",
+                "number": task_number,
+                "data": cashbox.send_json_task(task),
+            }
+        except KeyError:
+            self.logger.exception("Невалидный формат задачи")
+            result = {
+                "status": "error",
+                "number": task_number,
+                "data": "Bad json received",
+            }
+        except errors.CashboxClientError as e:
+            self.logger.exception(e)
+            error_code = e.code
+            result = {"status": "error", "number": task_number, "data": str(e)}
+        except Exception as e:
+            self.logger.exception("Непредвиденная ошибка во время выполнения задачи")
+            result = {"status": "error", "number": task_number, "data": str(e)}
+        finally:
+            if self._on_task_done is not None:
+                self._on_task_done()
+
+        elapsed = time.monotonic() - started_at
+        self.logger.info(
+            "Задача №%s выполнена за %.2f с: %s",
+            task_number,
+            elapsed,
+            result["status"],
+            extra={
+                "serial": cashbox.serial_number if cashbox else None,
+                "task": task_number,
+                "task_type": task.get("type"),
+                "duration": round(elapsed, 3),
+                "error_code": error_code,
+            },
+        )
+        self.task_registry.finish(task_number, result)
+        self.send(result)
+        self.credits.task_done(elapsed)
+        self._grant_credits()
+
+        # Когда очередь освободилась наполовину, снова принимаем задачи
+        if self._backpressure:
+            self._set_backpressure(False)
+
+    def _set_backpressure(self, enabled: bool) -> None:
+        """Сообщает серверу о заполнении и освобождении очереди задач кассы.
+
+        Вызывается из потока соединения и из рабочего потока, поэтому флаг
+        проверяется, меняется и отправляется под одной блокировкой: порядок
+        сообщений в очереди отправки совпадает с порядком изменений флага.
+        """
+        with self._backpressure_lock:
+            if self._backpressure == enabled:
+                return
+            # Очередь освобождается наполовину, прежде чем снова принимать задачи.
+            # Если она освободилась, пока задачу отклоняли, не включаем: рабочий
+            # поток мог уже выполнить последнюю задачу и не выключил бы
+            half_empty = self.task_worker.depth <= self.queue_size // 2
+            if enabled == half_empty:
+                return
+
+            self._backpressure = enabled
+            self.send(
+                {
+                    "type": "backpressure",
+                    "state": "on" if enabled else "off",
+                    "queue_depth": self.task_worker.depth,
+                    "queue_size": self.queue_size,
+                }
+            )
+
+    def _grant_credits(self) -> None:
+        grant = self.credits.replenish()
+        if grant:
+            # Кредиты действуют только в текущем соединении и не отправляются повторно
+            self.send({"type": "credit", "grant": grant}, replay=False)
+
+    def send(self, message: dict[str, Any], replay: bool = True) -> None:
+        """Ставит сообщение в очередь отправки. Без соединения оно ждет в очереди.
+
+        Сообщение кодируется при отправке в формат, согласованный с сервером.
+        С `replay=False` оно не отправляется повторно после переподключения.
+        """
+        if not self.connected:
+            self.logger.warning(
+                "Нет подключения к серверу, сообщение будет отправлено после "
+                "переподключения"
+            )
+        self.outbox.put(message, replay=replay)
+
+    def execute(
+        self, method: Callable[..., Any], *args: Any, **kwargs: Any
+    ) -> Future[Any]:
+        """Выполняет действие с кассой в той же очереди, что и задачи сервера"""
+        return self.task_worker.submit(method, *args, **kwargs)
+
+    def stop(self) -> None:
+        self.task_worker.stop()
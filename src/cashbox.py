@@ -1,12 +1,19 @@
-import json
 import logging
-from copy import copy
+import threading
+from collections.abc import Callable, Generator, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from dataclasses import dataclass
+from functools import partial
 from typing import Any
 
 from lib.libfptr10 import IFptr
-from src import errors
-from src.ui.log_widget import CashboxLogger
+from src import codec, errors
+from src.constants import PortState
+from src.driver_pool import DriverPool
+from src.log import LogPayload, TaskLogger
+from src.port_probe import list_serial_ports, probe_port
+
+logger = logging.getLogger(__name__)
 
 open_shift = {
     "type": "openShift",
@@ -40,7 +47,7 @@ class Cashbox:
         self.shift_state: int = -1
         self.last_error: CashBoxDriverError | None = None
         self.__connection: IFptr | None = None
-        self._logger: CashboxLogger | logging.Logger | None = None
+        self._logger: TaskLogger | None = None
 
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, Cashbox):
@@ -61,20 +68,27 @@ class Cashbox:
         self.__connection = value
 
     @property
-    def logger(self) -> CashboxLogger | logging.Logger:
+    def logger(self) -> TaskLogger:
         return self._logger or logging.getLogger(__name__)
 
     @logger.setter
-    def logger(self, logger: CashboxLogger) -> None:
+    def logger(self, logger: TaskLogger) -> None:
         self._logger = logger
 
     @property
     def name(self) -> str:
         return f"{self.model} {self.serial_number}"
 
-    def connect(self) -> None:
+    def connect(self, connection: IFptr | None = None) -> None:
+        """Подключается к кассе, используя уже открытое соединение, если оно передано"""
+        if connection is not None and connection.isOpened():  # type: ignore
+            self._connection = connection
+            self.is_connected = True
+            self._update_shift_state()
+            return
+
         self._connection = IFptr()  # type: ignore
-        self._connection.setSettings(self.settings)  # type: ignore
+        self._connection.setSettings(codec.dumps_driver(self.settings))  # type: ignore
         res = self._connection.open()  # type: ignore
         if res >= 0:
             self.is_connected = True
@@ -95,10 +109,16 @@ class Cashbox:
         self.shift_state = self._connection.getParamInt(IFptr.LIBFPTR_PARAM_SHIFT_STATE)  # type: ignore
 
     def send_json_task(self, task: dict[str, Any]) -> str:
-        self.logger.info(f"Получена задача: {task}")
+        self.logger.info("Получена задача: %s", LogPayload(task))
+        self.logger.debug("Задача целиком: %s", LogPayload(task, full=True))
 
         try:
             res = self._execute_json_task(task)
+        except Exception:
+            self.logger.error(
+                "Задача с ошибкой целиком: %s", LogPayload(task, full=True)
+            )
+            raise
         finally:
             self._update_shift_state()
 
@@ -110,18 +130,21 @@ class Cashbox:
                 "Задача не может быть выполнена: Касса не подключена к устройству"
             )
 
-        if not self._validate_json_task(task):
+        # Задача сериализуется один раз и для проверки, и для выполнения
+        data = codec.dumps_driver(task)
+        if not self._validate_json_task(task, data):
             raise errors.CashboxTaskError(
-                f"Задача не может быть выполнена: {str(self.last_error)}"
+                f"Задача не может быть выполнена: {str(self.last_error)}",
+                code=self.last_error.code if self.last_error else None,
             )
 
-        data = json.dumps(task)
         self._connection.setParam(IFptr.LIBFPTR_PARAM_JSON_DATA, data)  # type: ignore
         status = self._connection.processJson()  # type: ignore
 
         if status >= 0:
             res = self._connection.getParamString(IFptr.LIBFPTR_PARAM_JSON_DATA)  # type: ignore
-            self.logger.info(f"Результат выполнения: {res}")
+            self.logger.info("Результат выполнения: %s", LogPayload(res))
+            self.logger.debug("Результат целиком: %s", LogPayload(res, full=True))
             return str(res)
 
         error = self._get_error()
@@ -132,14 +155,15 @@ class Cashbox:
             self._connection.LIBFPTR_ERROR_CONNECTION_DISABLED,
         ):
             raise errors.CashboxConnectionError(
-                "Задача не может быть выполнена: Касса не подключена к устройству"
+                "Задача не может быть выполнена: Касса не подключена к устройству",
+                code=error.code,
             )
         else:
             raise errors.CashboxTaskError(
-                f"Ошибка при выполнении задачи: {str(self._get_error())}"
+                f"Ошибка при выполнении задачи: {str(error)}", code=error.code
             )
 
-    def _validate_json_task(self, task: dict[str, Any]) -> bool:
+    def _validate_json_task(self, task: dict[str, Any], data: str) -> bool:
         to_validate = True
         valid = False
 
@@ -149,7 +173,6 @@ class Cashbox:
             valid = True
 
         if to_validate:
-            data = json.dumps(task)
             self._connection.setParam(IFptr.LIBFPTR_PARAM_JSON_DATA, data)  # type: ignore
             if self._connection.validateJson() < 0:  # type: ignore
                 self.last_error = CashBoxDriverError(
@@ -212,106 +235,413 @@ class Cashbox:
         }
 
 
+POSSIBLE_PORTS = [f"COM{i}" for i in range(1, 21)]  # Перебираем все возможные COM-порты
+
+
 class CashboxManager:
-    _all_cashboxes: set[Cashbox] = set()  # Множество всех найденных касс
-    _used_cashboxes: dict[str, Cashbox] = {}  # Для хранения привязанных касс
+    """Реестр касс приложения.
+
+    Хранит найденные кассы с индексами по серийному номеру, порту и ключу
+    соединения вкладки. Все изменения реестра выполняются под блокировкой,
+    так как он используется из потока поиска, пула потоков и GUI-потока.
+    """
+
+    SEARCH_WORKERS = 4  # Количество портов, опрашиваемых одновременно
+    SEARCH_STOP_POLL = 0.1  # Секунды между проверками, не прерван ли поиск
+    PREWARM_WORKERS = 8  # Количество касс, подключаемых одновременно при запуске
+    # Скорости, перебираемые при расширенном поиске, в порядке убывания популярности
+    BAUD_RATES = [
+        IFptr.LIBFPTR_PORT_BR_115200,
+        IFptr.LIBFPTR_PORT_BR_57600,
+        IFptr.LIBFPTR_PORT_BR_38400,
+        IFptr.LIBFPTR_PORT_BR_19200,
+        IFptr.LIBFPTR_PORT_BR_9600,
+    ]
 
-    @classmethod
-    def search_for_cashboxes(cls) -> list[Cashbox]:
+    def __init__(
+        self,
+        driver_pool: DriverPool | None = None,
+        port_baud_rates: dict[str, int] | None = None,
+    ) -> None:
+        # Открытые при поиске соединения, ждущие привязки
+        self.driver_pool = driver_pool or DriverPool()
+        # Скорости, на которых на портах в последний раз нашлись кассы
+        self._port_baud_rates: dict[str, int] = dict(port_baud_rates or {})
+
+        self._lock = threading.RLock()
+        self._search_lock = threading.Lock()  # Поиск касс выполняется по одному
+
+        self._cashboxes: dict[str, Cashbox] = {}  # Все найденные кассы по серийнику
+        self._serial_by_port: dict[str, str] = {}
+        self._used: dict[str, str] = {}  # Привязанные кассы: серийник -> ключ
+        self._serial_by_key: dict[str, str] = {}
+        self._search_errors: dict[str, str] = {}  # Ошибки последнего поиска
+        self._pending_opens: dict[str, Future[None]] = {}  # Открываемые заранее кассы
+        self._prewarm_executor: ThreadPoolExecutor | None = None
+
+    def search_for_cashboxes(self, scan_baud_rates: bool = False) -> list[Cashbox]:
         """Ищет все доступные кассы и обновляет внутренний список"""
-        found_cashboxes = []
+        return list(self.iter_search_cashboxes(scan_baud_rates=scan_baud_rates))
 
-        base_settings = {
-            IFptr.LIBFPTR_SETTING_MODEL: IFptr.LIBFPTR_MODEL_ATOL_AUTO,
-            IFptr.LIBFPTR_SETTING_PORT: IFptr.LIBFPTR_PORT_COM,
-            IFptr.LIBFPTR_SETTING_BAUDRATE: IFptr.LIBFPTR_PORT_BR_115200,
+    def iter_search_cashboxes(
+        self,
+        on_port_error: Callable[[str, str], Any] | None = None,
+        scan_baud_rates: bool = False,
+        should_stop: Callable[[], bool] | None = None,
+    ) -> Generator[Cashbox, None, None]:
+        """Ищет кассы и отдает каждую найденную сразу после опроса ее порта.
+
+        Ошибка на отдельном порту не прерывает поиск: она сохраняется
+        в `get_search_errors()` и передается в `on_port_error`.
+        Порт открывается на запомненной для него скорости, а при `scan_baud_rates`
+        перебираются и остальные скорости из `BAUD_RATES`.
+        `should_stop` проверяется и пока порты опрашиваются: когда он вернет True,
+        поиск завершается, не дожидаясь опроса оставшихся портов.
+        """
+        stopped = should_stop or (lambda: False)
+        with self._search_lock:
+            with self._lock:
+                self._search_errors = {}
+                # Порты уже привязанных касс заняты нами же, их не опрашиваем
+                used_ports = {self._cashboxes[serial].port for serial in self._used}
+                # Кассы с открытым соединением в пуле точно на месте, отдаем их сразу
+                pooled = [
+                    cashbox
+                    for serial, cashbox in self._cashboxes.items()
+                    if serial not in self._used and serial in self.driver_pool
+                ]
+
+            for cashbox in pooled:
+                if stopped():
+                    return
+                used_ports.add(cashbox.port)
+                yield cashbox
+
+            ports = [
+                port
+                for port in list_serial_ports() or POSSIBLE_PORTS
+                if port not in used_ports
+            ]
+            # Порты, на которых уже находились кассы, опрашиваем первыми
+            with self._lock:
+                known_ports = set(self._port_baud_rates)
+            ports.sort(key=lambda port: port not in known_ports)
+
+            yield from self._probe_ports(ports, on_port_error, scan_baud_rates, stopped)
+
+    def _probe_ports(
+        self,
+        ports: list[str],
+        on_port_error: Callable[[str, str], Any] | None,
+        scan_baud_rates: bool,
+        stopped: Callable[[], bool],
+    ) -> Iterator[Cashbox]:
+        executor = ThreadPoolExecutor(
+            max_workers=self.SEARCH_WORKERS, thread_name_prefix="cashbox-search"
+        )
+        futures = {
+            executor.submit(self._probe_port, port, scan_baud_rates): port
+            for port in ports
         }
+        unhandled = set(futures)  # Опросы, результат которых еще не разобран
+        try:
+            while unhandled and not stopped():
+                # Ждем недолго, чтобы заметить остановку, пока порты еще опрашиваются
+                done, _ = wait(
+                    unhandled,
+                    timeout=self.SEARCH_STOP_POLL,
+                    return_when=FIRST_COMPLETED,
+                )
+                for future in done:
+                    unhandled.discard(future)
+                    port = futures[future]
+                    try:
+                        cashbox = future.result()
+                    except Exception as e:
+                        with self._lock:
+                            self._search_errors[port] = str(e)
+                        if on_port_error:
+                            on_port_error(port, str(e))
+                        else:
+                            logger.warning(f"Ошибка при опросе порта {port}: {e}")
+                        continue
+
+                    if cashbox is not None:
+                        # Кассу регистрируем, даже если поиск уже остановлен
+                        cashbox = self._register(cashbox)
+                        if stopped():
+                            return
+                        yield cashbox
+        finally:
+            # Если поиск прервали, не дожидаемся опроса оставшихся портов. Опрос,
+            # начатый до остановки, уже кладет соединение в пул, поэтому найденную
+            # им кассу регистрируем: иначе следующий поиск не найдет ее, а порт
+            # будет занят соединением из пула
+            executor.shutdown(wait=False, cancel_futures=True)
+            for future in unhandled:
+                future.add_done_callback(self._on_late_probe)
+
+    def _on_late_probe(self, future: Future[Cashbox | None]) -> None:
+        """Регистрирует кассу, найденную опросом уже остановленного поиска"""
+        if future.cancelled() or future.exception() is not None:
+            return
+        cashbox = future.result()
+        if cashbox is not None:
+            self._register(cashbox)
+
+    def _probe_port(self, port: str, scan_baud_rates: bool) -> Cashbox | None:
+        """Опрашивает порт и возвращает кассу, если она на нем найдена.
+
+        Перед открытием порта драйвером он проверяется средствами ОС, чтобы
+        не ждать таймаут драйвера на отсутствующих и занятых портах.
+        Соединение с найденной кассой не закрывается, а кладется в пул,
+        чтобы последующая привязка кассы к вкладке не открывала порт заново.
+        """
+        state = probe_port(port)
+        if state == PortState.MISSING:
+            return None
+        if state == PortState.BUSY:
+            raise errors.CashboxConnectionError("Порт занят другим приложением")
+
+        for baud_rate in self._get_baud_rates_to_try(port, scan_baud_rates):
+            fptr = IFptr()  # type: ignore
+            fptr.setSettings(  # type: ignore
+                codec.dumps_driver(
+                    {
+                        IFptr.LIBFPTR_SETTING_MODEL: IFptr.LIBFPTR_MODEL_ATOL_AUTO,
+                        IFptr.LIBFPTR_SETTING_PORT: IFptr.LIBFPTR_PORT_COM,
+                        IFptr.LIBFPTR_SETTING_BAUDRATE: baud_rate,
+                        IFptr.LIBFPTR_SETTING_COM_FILE: port,
+                    }
+                )
+            )
+            if fptr.open() == 0:  # type: ignore
+                with self._lock:
+                    self._port_baud_rates[port] = baud_rate
+                return self._read_cashbox(port, fptr)
 
-        possible_ports = [
-            f"COM{i}" for i in range(1, 21)
-        ]  # Перебираем все возможные COM-порты
-
-        for port in possible_ports:
-            settings = copy(base_settings)
-            settings[IFptr.LIBFPTR_SETTING_COM_FILE] = port  # type: ignore
-
-            try:
-                fptr = IFptr()  # type: ignore
-                fptr.setSettings(settings)  # type: ignore
-                if fptr.open() == 0:  # type: ignore
-                    fptr.setParam(IFptr.LIBFPTR_PARAM_DATA_TYPE, IFptr.LIBFPTR_DT_STATUS)  # type: ignore
-                    fptr.queryData()  # type: ignore
-
-                    cb = Cashbox(
-                        model=fptr.getParamString(IFptr.LIBFPTR_PARAM_MODEL_NAME),  # type: ignore
-                        serial_number=fptr.getParamString(IFptr.LIBFPTR_PARAM_SERIAL_NUMBER),  # type: ignore
-                        port=port,
-                        settings=fptr.getSettings(),  # type: ignore
-                    )
-                    found_cashboxes.append(cb)
-                    fptr.close()  # type: ignore
-            except Exception as e:
-                raise errors.CashboxConnectionError(str(e)) from e
-
-        # Обновляем список касс и удаляем из назначенных те, что больше не найдены
-        cls._all_cashboxes = cls._all_cashboxes | set(found_cashboxes)
-
-        return found_cashboxes
+        return None
 
-    @classmethod
-    def get_available_cashboxes(cls) -> list[Cashbox]:
-        """Возвращаем список доступных касс, которые еще не привязаны к вкладкам."""
-        return [
-            cb
-            for cb in cls._all_cashboxes
-            if cb.serial_number not in cls._used_cashboxes
-        ]
+    def _get_baud_rates_to_try(self, port: str, scan_baud_rates: bool) -> list[int]:
+        with self._lock:
+            cached = self._port_baud_rates.get(port)
 
-    @staticmethod
-    def is_cashbox_selected(serial_number: str) -> bool:
-        return serial_number in CashboxManager._used_cashboxes
+        first = cached or IFptr.LIBFPTR_PORT_BR_115200
+        if not scan_baud_rates:
+            return [first]
+        return [first] + [rate for rate in self.BAUD_RATES if rate != first]
 
-    @classmethod
-    def acquire_cashbox(cls, cashbox: Cashbox) -> Cashbox:
-        if cashbox not in cls._all_cashboxes:
-            cls._all_cashboxes.add(cashbox)
+    def _read_cashbox(self, port: str, fptr: IFptr) -> Cashbox:
+        """Считывает сведения о кассе с открытого соединения и кладет его в пул"""
+        try:
+            fptr.setParam(IFptr.LIBFPTR_PARAM_DATA_TYPE, IFptr.LIBFPTR_DT_STATUS)  # type: ignore
+            fptr.queryData()  # type: ignore
+
+            cashbox = Cashbox(
+                model=fptr.getParamString(IFptr.LIBFPTR_PARAM_MODEL_NAME),  # type: ignore
+                serial_number=fptr.getParamString(IFptr.LIBFPTR_PARAM_SERIAL_NUMBER),  # type: ignore
+                port=port,
+                settings=codec.loads(fptr.getSettingsStr()),  # type: ignore
+            )
+        except Exception:
+            fptr.close()  # type: ignore
+            raise
 
-        if cashbox.serial_number in CashboxManager._used_cashboxes:
-            raise errors.CashboxAlreadyInUse(
-                f"Касса с номером {cashbox.serial_number} уже используется."
+        self.driver_pool.put(cashbox.serial_number, port, fptr)
+        return cashbox
+
+    def prewarm(self, cashboxes: list[Cashbox]) -> None:
+        """Заранее и параллельно открывает соединения с кассами.
+
+        Открытые соединения кладутся в пул, откуда их забирает `acquire_cashbox`.
+        Если соединение еще открывается, `acquire_cashbox` дожидается его.
+        Касс может быть больше размера пула: их соединения зарезервированы
+        и не вытесняются, пока их не заберут или они не простоят `idle_timeout`.
+        """
+        with self._lock:
+            if self._prewarm_executor is None:
+                self._prewarm_executor = ThreadPoolExecutor(
+                    max_workers=self.PREWARM_WORKERS,
+                    thread_name_prefix="cashbox-prewarm",
+                )
+
+            for cashbox in cashboxes:
+                serial_number = cashbox.serial_number
+                if serial_number in self._used or serial_number in self._pending_opens:
+                    continue
+                self.driver_pool.reserve(serial_number)
+                future = self._prewarm_executor.submit(self._open_driver, cashbox)
+                self._pending_opens[serial_number] = future
+                future.add_done_callback(partial(self._on_prewarmed, serial_number))
+
+    def _open_driver(self, cashbox: Cashbox) -> None:
+        fptr = IFptr()  # type: ignore
+        fptr.setSettings(codec.dumps_driver(cashbox.settings))  # type: ignore
+        if fptr.open() < 0:  # type: ignore
+            raise errors.CashboxConnectionError(
+                f"Не удалось установить связь с кассой: {cashbox.name}"
+            )
+        self.driver_pool.put(cashbox.serial_number, cashbox.port, fptr)
+
+    def _on_prewarmed(self, serial_number: str, future: Future[None]) -> None:
+        with self._lock:
+            if self._pending_opens.get(serial_number) is future:
+                del self._pending_opens[serial_number]
+
+        if future.cancelled():
+            self.driver_pool.unreserve(serial_number)
+        elif future.exception() is not None:
+            self.driver_pool.unreserve(serial_number)
+            logger.warning(
+                f"Не удалось заранее подключиться к кассе {serial_number}: "
+                f"{future.exception()}"
             )
 
+    def _wait_prewarmed(self, serial_number: str) -> None:
+        """Дожидается заранее открываемого соединения с кассой, если оно есть"""
+        with self._lock:
+            future = self._pending_opens.get(serial_number)
+
+        if future is not None:
+            # Ошибка открытия не важна: в этом случае касса подключится заново
+            wait([future])
+
+    def _register(self, cashbox: Cashbox) -> Cashbox:
+        """Добавляет кассу в реестр. Привязанная касса не подменяется новой."""
+        with self._lock:
+            if cashbox.serial_number in self._used:
+                return self._cashboxes[cashbox.serial_number]
+            self._index(cashbox)
+            return cashbox
+
+    def _index(self, cashbox: Cashbox) -> None:
+        """Обновляет индексы по серийному номеру и порту. Вызывается под блокировкой."""
+        serial_number = cashbox.serial_number
+        previous = self._cashboxes.get(serial_number)
+        if previous is not None and previous.port != cashbox.port:
+            self._serial_by_port.pop(previous.port, None)
+
+        self._cashboxes[serial_number] = cashbox
+        self._serial_by_port[cashbox.port] = serial_number
+
+    def _unregister(self, serial_number: str) -> None:
+        """Удаляет кассу из реестра вместе со всеми индексами. Вызывается под блокировкой."""
+        cashbox = self._cashboxes.pop(serial_number, None)
+        if (
+            cashbox is not None
+            and self._serial_by_port.get(cashbox.port) == serial_number
+        ):
+            del self._serial_by_port[cashbox.port]
+        self._release(serial_number)
+
+    def _release(self, serial_number: str) -> None:
+        """Снимает отметку о привязке кассы. Вызывается под блокировкой."""
+        key = self._used.pop(serial_number, None)
+        if key and self._serial_by_key.get(key) == serial_number:
+            del self._serial_by_key[key]
+
+    def get_port_baud_rates(self) -> dict[str, int]:
+        """Возвращает запомненные скорости портов для сохранения в конфиг"""
+        with self._lock:
+            return dict(self._port_baud_rates)
+
+    def get_search_errors(self) -> dict[str, str]:
+        """Возвращает ошибки последнего поиска в виде {порт: описание}"""
+        with self._lock:
+            return dict(self._search_errors)
+
+    def get_available_cashboxes(self) -> list[Cashbox]:
+        """Возвращаем список доступных касс, которые еще не привязаны к вкладкам."""
+        with self._lock:
+            return [
+                cb
+                for serial_number, cb in self._cashboxes.items()
+                if serial_number not in self._used
+            ]
+
+    def get_by_serial_number(self, serial_number: str) -> Cashbox | None:
+        with self._lock:
+            return self._cashboxes.get(serial_number)
+
+    def get_by_port(self, port: str) -> Cashbox | None:
+        with self._lock:
+            serial_number = self._serial_by_port.get(port)
+            return self._cashboxes.get(serial_number) if serial_number else None
+
+    def get_by_connection_key(self, connection_key: str) -> Cashbox | None:
+        with self._lock:
+            serial_number = self._serial_by_key.get(connection_key)
+            return self._cashboxes.get(serial_number) if serial_number else None
+
+    def is_cashbox_selected(self, serial_number: str) -> bool:
+        with self._lock:
+            return serial_number in self._used
+
+    def update_connection_key(self, serial_number: str, connection_key: str) -> None:
+        """Обновляет ключ соединения, под которым привязана касса"""
+        with self._lock:
+            if serial_number not in self._used:
+                return
+            old_key = self._used[serial_number]
+            if old_key and self._serial_by_key.get(old_key) == serial_number:
+                del self._serial_by_key[old_key]
+            self._used[serial_number] = connection_key
+            if connection_key:
+                self._serial_by_key[connection_key] = serial_number
+
+    def acquire_cashbox(self, cashbox: Cashbox, connection_key: str = "") -> Cashbox:
+        """Привязывает кассу к вкладке и подключается к ней.
+
+        Касса резервируется под блокировкой до подключения, поэтому две вкладки
+        не могут одновременно захватить одну и ту же кассу.
+        """
+        serial_number = cashbox.serial_number
+        with self._lock:
+            if serial_number in self._used:
+                raise errors.CashboxAlreadyInUse(
+                    f"Касса с номером {serial_number} уже используется."
+                )
+
+            self._index(cashbox)
+            self._used[serial_number] = connection_key
+            if connection_key:
+                self._serial_by_key[connection_key] = serial_number
+
+        # Подключение к кассе может занять несколько секунд, поэтому выполняется без блокировки
         try:
-            cashbox.connect()
+            self._wait_prewarmed(serial_number)
+            cashbox.connect(
+                connection=self.driver_pool.take(serial_number, cashbox.port)
+            )
         except Exception as e:
             cashbox.is_connected = False
-            cls._all_cashboxes.remove(cashbox)
-            cls._used_cashboxes.pop(cashbox.serial_number, None)
+            with self._lock:
+                self._unregister(serial_number)
             raise errors.CashboxConnectionError(str(e)) from e
 
-        cls._used_cashboxes[cashbox.serial_number] = cashbox
+        baud_rate = cashbox.settings.get(IFptr.LIBFPTR_SETTING_BAUDRATE)
+        if baud_rate:
+            with self._lock:
+                self._port_baud_rates[cashbox.port] = int(baud_rate)
+
         return cashbox
 
-    @classmethod
-    def release_cashbox(cls, serial_number: str) -> None:
+    def release_cashbox(self, serial_number: str) -> None:
         """Освобождаем кассу с указанным серийным номером, чтобы ее можно было использовать в других вкладках."""
-        cashbox = None
-        for cb in cls._all_cashboxes:
-            if cb.serial_number == serial_number:
-                cashbox = cb
-                break
-
-        if not cashbox:
-            return
+        with self._lock:
+            if serial_number not in self._used:
+                return
+            cashbox = self._cashboxes[serial_number]
+            self._release(serial_number)
 
         try:
             cashbox.disconnect()
-            del CashboxManager._used_cashboxes[serial_number]
         except Exception as e:
             raise errors.CashboxDisconnectionError(str(e)) from e
 
 
 if __name__ == "__main__":
-    CashboxManager.search_for_cashboxes()
-    cashboxes = CashboxManager.get_available_cashboxes()
+    manager = CashboxManager()
+    manager.search_for_cashboxes()
+    cashboxes = manager.get_available_cashboxes()
     print(cashboxes)
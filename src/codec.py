@@ -0,0 +1,93 @@
+"""Кодек JSON для всех горячих путей клиента.
+
+Использует orjson или msgspec, если они установлены, иначе стандартный `json`.
+Бэкенд можно выбрать переменной окружения `CASHBOX_JSON_CODEC`
+(`orjson`, `msgspec` или `json`).
+
+Быстрые бэкенды используются для сообщений сервера и конфига. Данные для драйвера
+кассы (`dumps_driver`) всегда совпадают байт в байт с `json.dumps`, потому что
+драйвер получает их в том же виде, что и раньше.
+"""
+
+import json
+import logging
+import os
+from collections.abc import Callable
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - необязательная зависимость
+    HAS_ORJSON = False
+else:
+    HAS_ORJSON = True
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - необязательная зависимость
+    HAS_MSGSPEC = False
+else:
+    HAS_MSGSPEC = True
+
+
+def _std_dumps(obj: Any) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _std_loads(data: str | bytes) -> Any:
+    return json.loads(data)
+
+
+def _select_backend() -> tuple[str, Callable[[Any], bytes], Callable[[Any], Any]]:
+    requested = os.getenv("CASHBOX_JSON_CODEC", "")
+
+    if HAS_ORJSON and requested in ("", "orjson"):
+        options = orjson.OPT_NON_STR_KEYS
+        return (
+            "orjson",
+            lambda obj: orjson.dumps(obj, option=options),
+            orjson.loads,
+        )
+
+    if HAS_MSGSPEC and requested in ("", "msgspec"):
+        encoder = msgspec.json.Encoder()
+        decoder = msgspec.json.Decoder()
+        return "msgspec", encoder.encode, decoder.decode
+
+    if requested not in ("", "json"):
+        logger.warning(f"JSON-кодек {requested} недоступен, используется json")
+    return "json", _std_dumps, _std_loads
+
+
+BACKEND, _fast_dumps, _fast_loads = _select_backend()
+
+
+def dumps(obj: Any) -> bytes:
+    """Компактный JSON в UTF-8, не-ASCII символы не экранируются"""
+    try:
+        return _fast_dumps(obj)
+    except Exception:
+        # Быстрые бэкенды поддерживают не все типы, например целые больше 64 бит
+        return _std_dumps(obj)
+
+
+def loads(data: str | bytes) -> Any:
+    """Разбирает JSON. При невалидных данных выбрасывает `json.JSONDecodeError`."""
+    try:
+        return _fast_loads(data)
+    except Exception:
+        # Повторяем стандартным модулем: он разберет то, что не смог быстрый бэкенд,
+        # или выбросит привычную ошибку
+        return _std_loads(data)
+
+
+def dumps_driver(obj: Any) -> str:
+    """JSON для драйвера кассы, совпадает байт в байт с `json.dumps(obj)`"""
+    return json.dumps(obj)
+
+
+def dumps_pretty(obj: Any) -> str:
+    """JSON для чтения человеком, например для файла конфига"""
+    return json.dumps(obj, indent=4, ensure_ascii=False)
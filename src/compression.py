@@ -0,0 +1,115 @@
+from collections.abc import Sequence
+from dataclasses import asdict, dataclass, fields
+from typing import Any
+
+from websockets.extensions.base import Extension
+from websockets.extensions.permessage_deflate import (
+    ClientPerMessageDeflateFactory,
+    PerMessageDeflate,
+)
+from websockets.frames import Frame, Opcode
+from websockets.typing import ExtensionParameter
+
+DATA_OPCODES = (Opcode.TEXT, Opcode.BINARY, Opcode.CONT)
+
+
+@dataclass
+class CompressionSettings:
+    """Параметры сжатия permessage-deflate, задаются в секции `compression` конфига"""
+
+    enabled: bool = True
+    server_max_window_bits: int = 12  # Размер окна сжатия сервера, 9-15
+    client_max_window_bits: int = 12  # Размер окна сжатия клиента, 9-15
+    # Сбрасывать словарь после каждого сообщения: меньше памяти, хуже сжатие
+    server_no_context_takeover: bool = False
+    client_no_context_takeover: bool = False
+    mem_level: int = 5  # Память zlib на сжатие, 1-9
+
+    @classmethod
+    def from_dict(cls, value: dict[str, Any]) -> "CompressionSettings":
+        types = {field.name: field.type for field in fields(cls)}
+        settings: dict[str, Any] = {}
+        for key, val in value.items():
+            if key in types:
+                settings[key] = bool(val) if types[key] is bool else int(val)
+        return CompressionSettings(**settings)
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+    def create_factory(self, stats: "CompressionStats") -> "MeasuredDeflateFactory":
+        """Создает фабрику расширения, которая предлагается серверу при подключении"""
+        return MeasuredDeflateFactory(
+            stats,
+            server_no_context_takeover=self.server_no_context_takeover,
+            client_no_context_takeover=self.client_no_context_takeover,
+            server_max_window_bits=self.server_max_window_bits,
+            client_max_window_bits=self.client_max_window_bits,
+            compress_settings={"memLevel": self.mem_level},
+        )
+
+
+@dataclass
+class CompressionStats:
+    """Объем данных соединения до сжатия и после него, в байтах"""
+
+    negotiated: bool = False  # Согласовал ли сервер сжатие
+    sent_raw: int = 0
+    sent_wire: int = 0
+    received_raw: int = 0
+    received_wire: int = 0
+
+    @property
+    def sent_ratio(self) -> float | None:
+        """Во сколько раз уменьшились отправленные данные"""
+        return self.sent_raw / self.sent_wire if self.sent_wire else None
+
+    @property
+    def received_ratio(self) -> float | None:
+        """Во сколько раз уменьшились полученные данные"""
+        return self.received_raw / self.received_wire if self.received_wire else None
+
+
+class MeasuredPerMessageDeflate(PerMessageDeflate):
+    """Расширение permessage-deflate, которое считает байты до и после сжатия"""
+
+    def __init__(self, negotiated: PerMessageDeflate, stats: CompressionStats) -> None:
+        super().__init__(
+            negotiated.remote_no_context_takeover,
+            negotiated.local_no_context_takeover,
+            negotiated.remote_max_window_bits,
+            negotiated.local_max_window_bits,
+            negotiated.compress_settings,
+        )
+        self.stats = stats
+
+    def decode(self, frame: Frame, *, max_size: int | None = None) -> Frame:
+        decoded = super().decode(frame, max_size=max_size)
+        if frame.opcode in DATA_OPCODES:
+            self.stats.received_wire += len(frame.data)
+            self.stats.received_raw += len(decoded.data)
+        return decoded
+
+    def encode(self, frame: Frame) -> Frame:
+        encoded = super().encode(frame)
+        if frame.opcode in DATA_OPCODES:
+            self.stats.sent_raw += len(frame.data)
+            self.stats.sent_wire += len(encoded.data)
+        return encoded
+
+
+class MeasuredDeflateFactory(ClientPerMessageDeflateFactory):
+    """Фабрика permessage-deflate, подключающая подсчет степени сжатия"""
+
+    def __init__(self, stats: CompressionStats, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.stats = stats
+
+    def process_response_params(
+        self,
+        params: Sequence[ExtensionParameter],
+        accepted_extensions: Sequence[Extension],
+    ) -> PerMessageDeflate:
+        negotiated = super().process_response_params(params, accepted_extensions)
+        self.stats.negotiated = True
+        return MeasuredPerMessageDeflate(negotiated, self.stats)
@@ -0,0 +1,34 @@
+"""Каталог данных и файл конфига, общие для окна приложения и режима без GUI"""
+
+import os
+from typing import Any
+
+from src import codec
+
+CONFIG_FILE_NAME = "config.json"
+LOG_FILE_NAME = "cashbox_client.log"
+
+
+def get_data_dir() -> str:
+    """Каталог данных приложения. Создается, если его нет."""
+    app_data_dir = os.getenv("LOCALAPPDATA", os.path.expanduser("~"))
+    cashbox_data_dir = os.path.join(app_data_dir, "CashboxClient")
+
+    if not os.path.exists(cashbox_data_dir):
+        os.makedirs(cashbox_data_dir)
+
+    return cashbox_data_dir
+
+
+def load_config(path: str) -> dict[str, Any]:
+    """Читает конфиг. При невалидном файле выбрасывает `json.JSONDecodeError`."""
+    if not os.path.exists(path):
+        return {}
+
+    with open(path, "rb") as file:
+        return codec.loads(file.read())  # type: ignore
+
+
+def save_config(path: str, config: dict[str, Any]) -> None:
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(codec.dumps_pretty(config))
@@ -12,3 +12,19 @@ class LogLineColor:
     GREY: Final[str] = "#7a7a7a"
     ORANGE: Final[str] = "#ffa500"
     RED: Final[str] = "#ff6347"
+
+
+class LogOverflow(StrEnum):
+    DROP = auto()  # Строки ниже WARNING отбрасываются, остальные ждут места
+    BLOCK = auto()  # Все строки ждут места в очереди
+
+
+class LogFormat(StrEnum):
+    TEXT = auto()  # Строка "время [уровень] сообщение"
+    JSON = auto()  # JSON-объект на строку с отдельными полями кассы и задачи
+
+
+class PortState(StrEnum):
+    AVAILABLE = auto()  # Порт есть и свободен
+    MISSING = auto()  # Порта нет в системе
+    BUSY = auto()  # Порт занят другим процессом
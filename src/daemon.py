@@ -0,0 +1,335 @@
+"""Режим без GUI: связь касс с сервером без загрузки PySide6.
+
+Читает те же вкладки из config.json, что и окно приложения, и для каждой
+держит соединение с сервером и выполняет задачи на кассе. Подходит для запуска
+службой на машине без дисплея. Конфиг не перезаписывается.
+
+Запуск: `python -m src.daemon` или `python -m src.daemon --config путь/к/config.json`
+"""
+
+import argparse
+import json
+import logging
+import os
+import signal
+import sys
+import threading
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from src.bridge import TaskBridge
+from src.cashbox import Cashbox, CashboxManager
+from src.compression import CompressionSettings
+from src.config import CONFIG_FILE_NAME, LOG_FILE_NAME, get_data_dir, load_config
+from src.flow_control import FlowControlSettings
+from src.keepalive import KeepaliveSettings
+from src.log import CashboxLogAdapter, LogSettings, setup_logging
+from src.reconnect import ReconnectPolicy, ReconnectScheduler
+from src.ws_client import WebSocketClient
+
+logger = logging.getLogger(__name__)
+
+
+class HeadlessTab:
+    """Вкладка без окна: касса, мост задач и соединение с сервером.
+
+    Все события соединения обрабатываются по очереди в управляющем потоке
+    демона, как в GUI-потоке окна приложения.
+    """
+
+    def __init__(
+        self,
+        daemon: "Daemon",
+        name: str,
+        connection_key: str,
+        cashbox: Cashbox | None,
+    ) -> None:
+        self.daemon = daemon
+        self.name = name
+        self.connection_key = connection_key
+        self.logger = CashboxLogAdapter(name)
+        self.cashbox: Cashbox | None = None
+        self.configured_cashbox = cashbox
+        self.websocket_client: WebSocketClient | None = None
+        self.bridge = TaskBridge(
+            name=name,
+            logger=self.logger,
+            get_cashbox=lambda: self.cashbox,
+            queue_size=daemon.task_queue_size,
+            flow_control=daemon.flow_control_settings,
+        )
+        self.reconnect_scheduler = ReconnectScheduler(daemon.reconnect_policy)
+        self._retry_timer: threading.Timer | None = None
+        self._stopped = False
+
+    def start(self) -> None:
+        if self.configured_cashbox is not None:
+            # Подключение к кассе идет в фоне и не задерживает подключение к серверу
+            self.daemon.attach_executor.submit(
+                self._attach_cashbox, self.configured_cashbox
+            )
+        else:
+            self.logger.warning("Касса не задана для текущей вкладки")
+        self.try_connect_to_server()
+
+    def stop(self) -> None:
+        """Закрывает соединение и освобождает кассу. Вызывается в управляющем потоке."""
+        self._stopped = True
+        if self._retry_timer is not None:
+            self._retry_timer.cancel()
+        self._close_connection()
+        self.bridge.stop()
+        if self.cashbox is not None:
+            try:
+                self.daemon.cashbox_manager.release_cashbox(self.cashbox.serial_number)
+            except Exception as e:
+                self.logger.error(str(e))
+            self.cashbox = None
+
+    def _attach_cashbox(self, cashbox: Cashbox) -> None:
+        try:
+            self.daemon.cashbox_manager.acquire_cashbox(
+                cashbox, connection_key=self.connection_key
+            )
+        except Exception as e:
+            self.logger.error(str(e))
+            return
+
+        if self._stopped:
+            # Пока шло подключение, демон остановили
+            self.daemon.cashbox_manager.release_cashbox(cashbox.serial_number)
+            return
+
+        cashbox.logger = self.logger
+        self.cashbox = cashbox
+        self.logger.info(f"Касса {cashbox.name} привязана.")
+
+    def _in_control_thread(self, fn: Callable[..., Any]) -> Callable[..., None]:
+        """Оборачивает обработчик, чтобы он выполнялся в управляющем потоке"""
+        return lambda *args: self.daemon.run_in_control_thread(fn, *args)
+
+    def schedule_reconnect(self) -> None:
+        if self._stopped or (
+            self._retry_timer is not None and self._retry_timer.is_alive()
+        ):
+            return
+
+        delay = self.reconnect_scheduler.next_delay()
+        attempt = self.reconnect_scheduler.attempts
+        self.logger.info(
+            f"Попытка повторного подключения №{attempt} через {delay:.1f} секунд..."
+        )
+        self._retry_timer = threading.Timer(
+            delay, self._in_control_thread(self.try_connect_to_server)
+        )
+        self._retry_timer.daemon = True
+        self._retry_timer.start()
+
+    def try_connect_to_server(self) -> None:
+        if self._stopped:
+            return
+        if self.websocket_client and self.websocket_client.connected:
+            return
+
+        if not self.daemon.server_address:
+            self.logger.warning("Не указан адрес сервера в настройках")
+            self.schedule_reconnect()
+            return
+
+        if not self.connection_key:
+            self.logger.warning("Не указан ключ соединения")
+            self.schedule_reconnect()
+            return
+
+        try:
+            self.websocket_client = WebSocketClient(
+                server_address=self.daemon.connection_address(self.connection_key),
+                on_message_callback=self.bridge.on_message_received,
+                on_open_callback=self._in_control_thread(self.on_connection_open),
+                on_error_callback=self._in_control_thread(self.on_error_received),
+                on_close_callback=self._in_control_thread(self.on_close_received),
+                logger=self.logger,
+                connection_key=(
+                    self.connection_key if self.daemon.multiplexed else None
+                ),
+                outbox=self.bridge.outbox,
+                compression=self.daemon.compression_settings,
+                binary_encoding=self.daemon.binary_encoding,
+                keepalive=self.daemon.keepalive_settings,
+            )
+            self.websocket_client.connect()
+        except Exception as e:
+            self.logger.error(f"Ошибка при подключении к серверу: {str(e)}")
+            self.schedule_reconnect()
+
+    def on_connection_open(self) -> None:
+        if self.websocket_client is None:
+            return
+
+        self.logger.info(f"Подключено к серверу {self.daemon.server_address}")
+        self.bridge.on_connection_open(self.websocket_client)
+        attempts, recovery_time = self.reconnect_scheduler.reset()
+        if attempts and recovery_time is not None:
+            self.logger.info(
+                f"Соединение восстановлено за {recovery_time:.1f} секунд "
+                f"после {attempts} попыток"
+            )
+
+    def on_error_received(self, message: str) -> None:
+        if not self.websocket_client:
+            return
+
+        self.logger.error(f"Ошибка соединения с сервером: {message}")
+        self._close_connection()
+        self.schedule_reconnect()
+
+    def on_close_received(self, message: str) -> None:
+        if not self.websocket_client:
+            return
+
+        self.logger.error(f"Соединение с сервером потеряно: {message}")
+        self._close_connection()
+        self.schedule_reconnect()
+
+    def _close_connection(self) -> None:
+        if self.websocket_client:
+            try:
+                self.websocket_client.close()
+            except Exception as e:
+                self.logger.error(f"Ошибка при закрытии соединения: {str(e)}")
+            self.bridge.on_connection_closed()
+            self.websocket_client = None
+
+
+class Daemon:
+    """Все вкладки из конфига, работающие без окна приложения"""
+
+    STOP_TIMEOUT = 30  # Секунды на закрытие всех соединений
+
+    def __init__(self, config: dict[str, Any]) -> None:
+        self.config = config
+        self.cashbox_manager = CashboxManager(
+            port_baud_rates=config.get("port_baud_rates", {})
+        )
+        # Управляющий поток обрабатывает события соединений по очереди
+        self.control_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="daemon-control"
+        )
+        self.attach_executor = ThreadPoolExecutor(
+            max_workers=5, thread_name_prefix="daemon-attach"
+        )
+        self.tabs = [
+            HeadlessTab(
+                self,
+                name=tab_info.get("name", "Новая касса"),
+                connection_key=tab_info.get("key", ""),
+                cashbox=(
+                    Cashbox.from_dict(tab_info["cashbox"])
+                    if tab_info.get("cashbox")
+                    else None
+                ),
+            )
+            for tab_info in config.get("tabs", [])
+        ]
+
+    @property
+    def server_address(self) -> str:
+        return str(self.config.get("server", ""))
+
+    @property
+    def multiplexed(self) -> bool:
+        return bool(self.config.get("multiplex", False))
+
+    @property
+    def task_queue_size(self) -> int:
+        return int(self.config.get("task_queue_size", 20))
+
+    @property
+    def reconnect_policy(self) -> ReconnectPolicy:
+        return ReconnectPolicy.from_dict(self.config.get("reconnect", {}))
+
+    @property
+    def compression_settings(self) -> CompressionSettings:
+        return CompressionSettings.from_dict(self.config.get("compression", {}))
+
+    @property
+    def keepalive_settings(self) -> KeepaliveSettings:
+        return KeepaliveSettings.from_dict(self.config.get("keepalive", {}))
+
+    @property
+    def flow_control_settings(self) -> FlowControlSettings:
+        return FlowControlSettings.from_dict(self.config.get("flow_control", {}))
+
+    @property
+    def binary_encoding(self) -> bool:
+        return bool(self.config.get("binary_encoding", True))
+
+    def connection_address(self, connection_key: str) -> str:
+        if self.multiplexed:
+            return f"ws://{self.server_address}/tasks"
+        return f"ws://{self.server_address}/task/{connection_key}"
+
+    def run_in_control_thread(self, fn: Callable[..., Any], *args: Any) -> None:
+        try:
+            self.control_executor.submit(fn, *args)
+        except RuntimeError:
+            pass  # Демон уже остановлен
+
+    def start(self) -> None:
+        # Начинаем подключаться к сохраненным кассам до подключения к серверу
+        cashboxes = [
+            tab.configured_cashbox
+            for tab in self.tabs
+            if tab.configured_cashbox is not None
+        ]
+        if cashboxes:
+            self.cashbox_manager.prewarm(cashboxes)
+
+        for tab in self.tabs:
+            self.run_in_control_thread(tab.start)
+
+    def stop(self) -> None:
+        for tab in self.tabs:
+            self.control_executor.submit(tab.stop).result(timeout=self.STOP_TIMEOUT)
+        self.control_executor.shutdown()
+        self.attach_executor.shutdown(wait=False, cancel_futures=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Клиент касс без GUI")
+    parser.add_argument("--config", help="Путь к config.json")
+    args = parser.parse_args()
+
+    data_dir = get_data_dir()
+    log_file_path = os.path.join(data_dir, LOG_FILE_NAME)
+    config_path = args.config or os.path.join(data_dir, CONFIG_FILE_NAME)
+    try:
+        config = load_config(config_path)
+    except json.JSONDecodeError as e:
+        setup_logging(log_file_path)
+        logger.exception(f"Парсинг конфиг файла не удался: {e}")
+        sys.exit(1)
+    setup_logging(log_file_path, LogSettings.from_dict(config.get("logging", {})))
+
+    daemon = Daemon(config)
+    if not daemon.tabs:
+        logger.error(f"В конфиге {config_path} нет ни одной вкладки")
+        sys.exit(1)
+
+    stop_event = threading.Event()
+    signal.signal(signal.SIGINT, lambda *_: stop_event.set())
+    signal.signal(signal.SIGTERM, lambda *_: stop_event.set())
+
+    logger.info(f"Запущено без GUI, вкладок: {len(daemon.tabs)}")
+    daemon.start()
+    # Ожидание с таймаутом, чтобы сигналы обрабатывались и в Windows
+    while not stop_event.wait(1):
+        pass
+
+    logger.info("Остановка...")
+    daemon.stop()
+
+
+if __name__ == "__main__":
+    main()
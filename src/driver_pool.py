@@ -0,0 +1,146 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass
+
+from lib.libfptr10 import IFptr
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PooledDriver:
+    port: str
+    fptr: IFptr
+    released_at: float
+
+
+class DriverPool:
+    """Пул недавно открытых драйверов касс.
+
+    Поиск касс кладет сюда открытые соединения вместо того, чтобы закрывать их,
+    а привязка кассы к вкладке забирает их отсюда без повторного открытия порта.
+    Соединения, которые никто не забрал за `idle_timeout` секунд, закрываются.
+    Зарезервированные соединения (открытые заранее для вкладок) не вытесняются
+    при переполнении пула, пока их не заберут.
+    """
+
+    def __init__(self, idle_timeout: float = 60.0, max_size: int = 8) -> None:
+        self.idle_timeout = idle_timeout
+        self.max_size = max_size
+
+        self._drivers: dict[str, PooledDriver] = {}  # По серийному номеру кассы
+        self._reserved: set[str] = set()  # Серийные номера, ждущие привязки к вкладке
+        self._lock = threading.Lock()
+        self._reap_timer: threading.Timer | None = None
+
+    def __contains__(self, serial_number: str) -> bool:
+        with self._lock:
+            return serial_number in self._drivers
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._drivers)
+
+    def reserve(self, serial_number: str) -> None:
+        """Защищает соединение с кассой от вытеснения, пока его не заберут"""
+        with self._lock:
+            self._reserved.add(serial_number)
+
+    def unreserve(self, serial_number: str) -> None:
+        with self._lock:
+            self._reserved.discard(serial_number)
+
+    def put(self, serial_number: str, port: str, fptr: IFptr) -> None:
+        """Кладет открытое соединение в пул"""
+        to_close = []
+        with self._lock:
+            previous = self._drivers.pop(serial_number, None)
+            if previous is not None and previous.fptr is not fptr:
+                to_close.append(previous)
+
+            self._drivers[serial_number] = PooledDriver(
+                port=port, fptr=fptr, released_at=time.monotonic()
+            )
+
+            # Если пул переполнен, вытесняем самые давно положенные соединения
+            while len(self._drivers) > self.max_size:
+                evictable = [k for k in self._drivers if k not in self._reserved]
+                if not evictable:
+                    break
+                oldest = min(evictable, key=lambda k: self._drivers[k].released_at)
+                to_close.append(self._drivers.pop(oldest))
+
+            self._schedule_reap()
+
+        self._close(to_close)
+
+    def take(self, serial_number: str, port: str) -> IFptr | None:
+        """Забирает из пула открытое соединение с кассой, если оно есть"""
+        with self._lock:
+            pooled = self._drivers.pop(serial_number, None)
+            self._reserved.discard(serial_number)
+
+        if pooled is None:
+            return None
+
+        if pooled.port != port or not self._is_alive(pooled):
+            self._close([pooled])
+            return None
+
+        return pooled.fptr
+
+    def reap(self) -> None:
+        """Закрывает соединения, простоявшие в пуле дольше `idle_timeout`"""
+        deadline = time.monotonic() - self.idle_timeout
+        with self._lock:
+            expired = [
+                serial_number
+                for serial_number, pooled in self._drivers.items()
+                if pooled.released_at <= deadline
+            ]
+            to_close = [self._drivers.pop(serial_number) for serial_number in expired]
+            self._reserved.difference_update(expired)
+
+            self._reap_timer = None
+            self._schedule_reap()
+
+        self._close(to_close)
+
+    def clear(self) -> None:
+        """Закрывает все соединения в пуле"""
+        with self._lock:
+            to_close = list(self._drivers.values())
+            self._drivers.clear()
+            self._reserved.clear()
+            if self._reap_timer is not None:
+                self._reap_timer.cancel()
+                self._reap_timer = None
+
+        self._close(to_close)
+
+    def _schedule_reap(self) -> None:
+        """Планирует очистку пула. Вызывается под блокировкой."""
+        if self._reap_timer is not None or not self._drivers:
+            return
+
+        oldest = min(pooled.released_at for pooled in self._drivers.values())
+        delay = max(oldest + self.idle_timeout - time.monotonic(), 0.0)
+        self._reap_timer = threading.Timer(delay, self.reap)
+        self._reap_timer.daemon = True
+        self._reap_timer.start()
+
+    @staticmethod
+    def _is_alive(pooled: PooledDriver) -> bool:
+        try:
+            return bool(pooled.fptr.isOpened())  # type: ignore
+        except Exception:
+            return False
+
+    @staticmethod
+    def _close(drivers: list[PooledDriver]) -> None:
+        for pooled in drivers:
+            try:
+                pooled.fptr.close()  # type: ignore
+            except Exception as e:
+                logger.warning(f"Ошибка при закрытии соединения на {pooled.port}: {e}")
@@ -0,0 +1,147 @@
+from abc import ABC, abstractmethod
+from typing import Any
+
+from src import codec
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - необязательная зависимость
+    HAS_MSGPACK = False
+else:
+    HAS_MSGPACK = True
+
+try:
+    import cbor2
+except ImportError:  # pragma: no cover - необязательная зависимость
+    HAS_CBOR = False
+else:
+    HAS_CBOR = True
+
+
+class MessageEncoding(ABC):
+    """Кодирование сообщений протокола, выбирается подпротоколом WebSocket"""
+
+    name = ""
+    subprotocol = ""
+    text = False  # Отправлять ли закодированные сообщения текстовыми кадрами
+
+    @abstractmethod
+    def encode(self, message: Any) -> bytes: ...
+
+    @abstractmethod
+    def decode(self, data: str | bytes) -> Any:
+        """Разбирает кадр. При невалидных данных выбрасывает ValueError."""
+
+    @abstractmethod
+    def encode_batch(self, items: list[bytes]) -> bytes:
+        """Собирает пакет `{"type": "batch", "items": [...]}` из закодированных сообщений"""
+
+
+class JsonEncoding(MessageEncoding):
+    """Текстовые кадры JSON. Используется, если сервер не выбрал подпротокол."""
+
+    name = "json"
+    subprotocol = "cashbox.json"
+    text = True
+
+    def encode(self, message: Any) -> bytes:
+        return codec.dumps(message)
+
+    def decode(self, data: str | bytes) -> Any:
+        return codec.loads(data)  # JSONDecodeError - подкласс ValueError
+
+    def encode_batch(self, items: list[bytes]) -> bytes:
+        return b'{"type":"batch","items":[' + b",".join(items) + b"]}"
+
+
+class MsgpackEncoding(MessageEncoding):
+    """Бинарные кадры MessagePack"""
+
+    name = "msgpack"
+    subprotocol = "cashbox.msgpack"
+
+    def encode(self, message: Any) -> bytes:
+        return bytes(msgpack.packb(message))
+
+    def decode(self, data: str | bytes) -> Any:
+        if isinstance(data, str):
+            raise ValueError("Ожидался бинарный кадр MessagePack")
+        try:
+            return msgpack.unpackb(data)
+        except (msgpack.UnpackException, msgpack.ExtraData) as e:
+            raise ValueError(str(e)) from e
+
+    def encode_batch(self, items: list[bytes]) -> bytes:
+        # Сообщения уже закодированы, поэтому дописываем к ним только заголовки
+        packer = msgpack.Packer()
+        return bytes(
+            packer.pack_map_header(2)
+            + packer.pack("type")
+            + packer.pack("batch")
+            + packer.pack("items")
+            + packer.pack_array_header(len(items))
+            + b"".join(items)
+        )
+
+
+class CborEncoding(MessageEncoding):
+    """Бинарные кадры CBOR (RFC 8949)"""
+
+    name = "cbor"
+    subprotocol = "cashbox.cbor"
+
+    def encode(self, message: Any) -> bytes:
+        return bytes(cbor2.dumps(message))
+
+    def decode(self, data: str | bytes) -> Any:
+        if isinstance(data, str):
+            raise ValueError("Ожидался бинарный кадр CBOR")
+        try:
+            return cbor2.loads(data)
+        except cbor2.CBORDecodeError as e:
+            raise ValueError(str(e)) from e
+
+    def encode_batch(self, items: list[bytes]) -> bytes:
+        return bytes(
+            self._head(5, 2)  # Словарь из двух элементов
+            + cbor2.dumps("type")
+            + cbor2.dumps("batch")
+            + cbor2.dumps("items")
+            + self._head(4, len(items))  # Массив
+            + b"".join(items)
+        )
+
+    @staticmethod
+    def _head(major_type: int, length: int) -> bytes:
+        """Заголовок элемента CBOR с длиной `length`"""
+        if length < 24:
+            return bytes([major_type << 5 | length])
+        for info, size in ((24, 1), (25, 2), (26, 4)):
+            if length < 1 << (8 * size):
+                return bytes([major_type << 5 | info]) + length.to_bytes(size, "big")
+        return bytes([major_type << 5 | 27]) + length.to_bytes(8, "big")
+
+
+JSON = JsonEncoding()
+
+# В порядке предпочтения. Бинарные кодировки доступны, если установлены их библиотеки
+ENCODINGS: list[MessageEncoding] = [
+    *([MsgpackEncoding()] if HAS_MSGPACK else []),
+    *([CborEncoding()] if HAS_CBOR else []),
+    JSON,
+]
+
+
+def offered_subprotocols(binary: bool = True) -> list[str]:
+    """Подпротоколы, которые клиент предлагает серверу при подключении"""
+    return [
+        encoding.subprotocol for encoding in ENCODINGS if binary or encoding is JSON
+    ]
+
+
+def get_encoding(subprotocol: str | None) -> MessageEncoding:
+    """Кодировка по выбранному сервером подпротоколу"""
+    for encoding in ENCODINGS:
+        if encoding.subprotocol == subprotocol:
+            return encoding
+    return JSON
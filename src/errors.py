@@ -1,8 +1,9 @@
 class CashboxClientError(Exception):
     msg: str | None = None
 
-    def __init__(self, msg: str | None = None):
+    def __init__(self, msg: str | None = None, code: int | None = None):
         super().__init__(msg)
+        self.code = code  # Код ошибки драйвера кассы, если она от драйвера
 
 
 class CashboxConnectionError(CashboxClientError):
@@ -17,9 +18,17 @@ class CashboxAlreadyInUse(CashboxClientError):
     pass
 
 
+class ConnectionKeyInUse(CashboxClientError):
+    pass
+
+
 class CashboxTaskError(CashboxClientError):
     pass
 
 
 class NotConnectedToServer(CashboxClientError):
     pass
+
+
+class TaskQueueFull(CashboxClientError):
+    pass
@@ -0,0 +1,121 @@
+import math
+import threading
+from dataclasses import asdict, dataclass, fields
+from typing import Any
+
+
+@dataclass
+class FlowControlSettings:
+    """Параметры кредитного управления потоком задач, задаются в секции `flow_control` конфига"""
+
+    enabled: bool = True
+    target_delay: float = 5.0  # Сколько секунд новая задача может ждать в очереди кассы
+    min_credits: int = 2  # Окно не меньше, чтобы касса не простаивала между задачами
+
+    @classmethod
+    def from_dict(cls, value: dict[str, Any]) -> "FlowControlSettings":
+        types = {field.name: field.type for field in fields(cls)}
+        settings: dict[str, Any] = {}
+        for key, val in value.items():
+            if types.get(key) is bool:
+                settings[key] = bool(val)
+            elif types.get(key) is int:
+                settings[key] = int(val)
+            elif types.get(key) is float:
+                settings[key] = float(val)
+        return FlowControlSettings(**settings)
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class CreditStats:
+    enabled: bool = False  # Согласовал ли сервер кредиты
+    window: int = 0  # Сколько задач может быть у кассы одновременно
+    available: int = 0  # Кредиты сервера: сколько задач он еще может прислать
+    in_flight: int = 0  # Задач в очереди кассы и в работе
+    granted: int = 0  # Выдано кредитов за соединение
+    service_time: float = 0.0  # Скользящее среднее времени выполнения задачи
+
+
+class CreditWindow:
+    """Кредиты, которые касса выдает серверу.
+
+    Сервер присылает задачу, только если у него есть кредит, и тратит
+    по кредиту на каждую задачу. Касса выдает кредиты сообщением
+    `{"type": "credit", "grant": n}` так, чтобы задач у сервера в кредит
+    и в очереди кассы вместе было не больше окна. Окно рассчитывается
+    по среднему времени выполнения задачи: сколько задач касса успеет
+    выполнить за `target_delay`, но не больше размера очереди. После
+    подключения окно минимальное и растет по мере замеров.
+    """
+
+    SERVICE_TIME_SMOOTHING = 0.2  # Вес нового замера в скользящем среднем
+
+    def __init__(self, settings: FlowControlSettings, queue_size: int) -> None:
+        self.settings = settings
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._stats = CreditStats(window=self._window(0.0))
+
+    def _window(self, service_time: float) -> int:
+        low = min(self.settings.min_credits, self.queue_size)
+        if service_time <= 0:
+            return low
+        window = math.ceil(self.settings.target_delay / service_time)
+        return max(low, min(window, self.queue_size))
+
+    def reset(self, enabled: bool) -> int:
+        """Новое соединение: у сервера кредитов нет. Возвращает первую выдачу."""
+        with self._lock:
+            self._stats.enabled = enabled and self.settings.enabled
+            self._stats.available = 0
+            self._stats.granted = 0
+            return self._replenish()
+
+    def consume(self) -> None:
+        """Сервер прислал задачу и потратил кредит"""
+        with self._lock:
+            self._stats.available = max(self._stats.available - 1, 0)
+
+    def task_queued(self) -> None:
+        with self._lock:
+            self._stats.in_flight += 1
+
+    def task_rejected(self) -> None:
+        """Задача, учтенная в `task_queued`, не поместилась в очередь"""
+        with self._lock:
+            self._stats.in_flight = max(self._stats.in_flight - 1, 0)
+
+    def task_done(self, service_time: float) -> None:
+        with self._lock:
+            self._stats.in_flight = max(self._stats.in_flight - 1, 0)
+            if self._stats.service_time:
+                self._stats.service_time += self.SERVICE_TIME_SMOOTHING * (
+                    service_time - self._stats.service_time
+                )
+            else:
+                self._stats.service_time = service_time
+            self._stats.window = self._window(self._stats.service_time)
+
+    def replenish(self) -> int:
+        """Возвращает, сколько кредитов выдать серверу сейчас"""
+        with self._lock:
+            return self._replenish()
+
+    def _replenish(self) -> int:
+        if not self._stats.enabled:
+            return 0
+        grant = self._stats.window - self._stats.available - self._stats.in_flight
+        # Пока у сервера есть кредиты, копим выдачу, чтобы не слать ее на каждую задачу
+        threshold = math.ceil(self._stats.window / 4) if self._stats.available else 1
+        if grant < threshold:
+            return 0
+        self._stats.available += grant
+        self._stats.granted += grant
+        return grant
+
+    def stats(self) -> CreditStats:
+        with self._lock:
+            return CreditStats(**asdict(self._stats))
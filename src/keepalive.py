@@ -0,0 +1,148 @@
+import asyncio
+import logging
+import time
+from dataclasses import asdict, dataclass, fields
+from typing import Any
+
+from websockets.asyncio.client import ClientConnection
+from websockets.exceptions import ConnectionClosed
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class KeepaliveSettings:
+    """Параметры проверки связи с сервером, задаются в секции `keepalive` конфига"""
+
+    dead_peer_timeout: float = (
+        15.0  # За сколько секунд тишины связь считается потерянной
+    )
+    max_interval: float = 30.0  # Замер RTT не реже, даже при активном обмене
+    min_interval: float = 1.0  # Пинг не чаще, чем раз в столько секунд
+
+    @classmethod
+    def from_dict(cls, value: dict[str, Any]) -> "KeepaliveSettings":
+        names = {field.name for field in fields(cls)}
+        return KeepaliveSettings(
+            **{key: float(val) for key, val in value.items() if key in names}
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class RttStats:
+    """Время приема-передачи до сервера по замерам пингами, в секундах"""
+
+    samples: int = 0  # Получено ответов на пинг
+    pings: int = 0  # Отправлено пингов
+    last: float = 0.0
+    smoothed: float = 0.0  # Сглаженное RTT по RFC 6298
+    jitter: float = 0.0  # Сглаженное отклонение RTT
+    min: float = 0.0
+    max: float = 0.0
+    interval: float = 0.0  # Через сколько секунд тишины отправляется пинг
+    flaky: bool = False  # Разброс RTT слишком велик, проверяем связь чаще
+
+    def add_sample(self, rtt: float) -> None:
+        if self.samples == 0:
+            self.smoothed = rtt
+            self.jitter = rtt / 2
+            self.min = self.max = rtt
+        else:
+            self.jitter += 0.25 * (abs(self.smoothed - rtt) - self.jitter)
+            self.smoothed += 0.125 * (rtt - self.smoothed)
+            self.min = min(self.min, rtt)
+            self.max = max(self.max, rtt)
+        self.last = rtt
+        self.samples += 1
+
+
+class Heartbeat:
+    """Проверка связи с сервером и замер RTT вместо встроенного keepalive websockets.
+
+    Любой полученный кадр подтверждает, что сервер жив, поэтому при активном
+    обмене пинг отправляется только для замера RTT, раз в `max_interval`.
+    Когда сервер молчит, пинг уходит заранее, чтобы ответ успел прийти до истечения
+    `dead_peer_timeout`. На нестабильной связи пинг отправляется раньше.
+    Если за `dead_peer_timeout` от сервера ничего не пришло, соединение разрывается.
+    """
+
+    MIN_PONG_WAIT = 1.0  # Наименьшее время, которое отводится на ответ на пинг
+    FLAKY_JITTER = 0.05  # Разброс RTT в секундах, меньше которого связь стабильна
+
+    def __init__(self, ws: ClientConnection, settings: KeepaliveSettings) -> None:
+        self.settings = settings
+        self.stats = RttStats()
+        self._ws = ws
+        self._last_activity = time.monotonic()
+        self._last_ping = self._last_activity
+        self.stats.interval = self.probe_interval()
+
+    def touch(self) -> None:
+        """Отмечает полученный от сервера кадр"""
+        self._last_activity = time.monotonic()
+
+    def probe_interval(self) -> float:
+        """Сколько секунд тишины ждать перед пингом"""
+        bound = self.settings.dead_peer_timeout
+        if self.stats.samples == 0 or self.stats.flaky:
+            # Без замеров и на нестабильной связи отводим на ответ половину срока
+            pong_wait = bound / 2
+        else:
+            rto = self.stats.smoothed + 4 * self.stats.jitter
+            pong_wait = min(max(rto, self.MIN_PONG_WAIT), bound / 2)
+        return max(bound - pong_wait, self.settings.min_interval)
+
+    async def run(self) -> None:
+        """Работает до закрытия соединения, отменяется его обработчиком"""
+        while True:
+            now = time.monotonic()
+            silence = now - self._last_activity
+            since_ping = now - self._last_ping
+            due = min(
+                self.stats.interval - silence,
+                self.settings.max_interval - since_ping,
+            )
+            # Ограничение частоты пингов важнее остальных сроков
+            wait = max(due, self.settings.min_interval - since_ping)
+            if wait > 0:
+                await asyncio.sleep(wait)
+                continue
+            if not await self._ping():
+                return
+
+    async def _ping(self) -> bool:
+        """Отправляет пинг и ждет ответа. Возвращает False, если связь потеряна."""
+        self._last_ping = time.monotonic()
+        self.stats.pings += 1
+        try:
+            pong = asyncio.ensure_future(await self._ws.ping())
+        except ConnectionClosed:
+            return False
+
+        while not pong.done():
+            remaining = self.settings.dead_peer_timeout - (
+                time.monotonic() - self._last_activity
+            )
+            if remaining <= 0:
+                logger.warning(
+                    f"Сервер не отвечает {self.settings.dead_peer_timeout:.0f} с, "
+                    "соединение разорвано"
+                )
+                self._ws.transport.abort()
+                return False
+            # Пока ждем ответа, любой полученный кадр продлевает срок
+            await asyncio.wait([pong], timeout=remaining)
+
+        try:
+            self.stats.add_sample(pong.result())
+        except ConnectionClosed:
+            return False
+        self.stats.flaky = self.stats.jitter > max(
+            self.FLAKY_JITTER, self.stats.smoothed / 2
+        )
+        self.touch()
+        self.stats.interval = self.probe_interval()
+        return True
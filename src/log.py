@@ -0,0 +1,415 @@
+import atexit
+import copy
+import glob
+import gzip
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import shutil
+import threading
+from collections.abc import Mapping, MutableMapping
+from dataclasses import asdict, dataclass, fields
+from json.encoder import encode_basestring
+from typing import Any, Protocol
+
+from src import codec
+from src.constants import LogFormat, LogOverflow
+
+# Поля записи лога о кассе и задаче, которые пишутся в JSON-лог отдельно
+LOG_FIELDS = ("cashbox", "serial", "task", "task_type", "duration", "error_code")
+GZIP_SUFFIX = ".gz"
+
+
+class TaskLogger(Protocol):
+    """Лог вкладки: `CashboxLogger` в окне приложения, обычный логер без GUI.
+
+    Как и в `logging`, аргументы подставляются в `msg` через `%`, только если
+    строка будет записана. В `extra` передаются поля записи из `LOG_FIELDS`.
+    """
+
+    def debug(
+        self, msg: str, *args: object, extra: Mapping[str, object] | None = None
+    ) -> None: ...
+
+    def info(
+        self, msg: str, *args: object, extra: Mapping[str, object] | None = None
+    ) -> None: ...
+
+    def warning(
+        self, msg: str, *args: object, extra: Mapping[str, object] | None = None
+    ) -> None: ...
+
+    def error(
+        self, msg: str, *args: object, extra: Mapping[str, object] | None = None
+    ) -> None: ...
+
+    def exception(
+        self,
+        msg: str | Exception,
+        *args: object,
+        exc_info: bool | None = True,
+        extra: Mapping[str, object] | None = None,
+    ) -> None: ...
+
+
+def _render(value: Any, out: list[str], budget: int) -> int:
+    """Дописывает в `out` JSON-представление `value` примерно в `budget` символов.
+
+    Не обходит то, что не поместится: от длинных списков и строк остается
+    начало с пометкой, сколько пропущено. Возвращает остаток бюджета.
+    """
+    if isinstance(value, dict | list | tuple):
+        items = value.items() if isinstance(value, dict) else value
+        out.append("{" if isinstance(value, dict) else "[")
+        budget -= 1
+        for i, item in enumerate(items):
+            if budget <= 0:
+                out.append(f"… ещё {len(value) - i}")
+                break
+            if i:
+                out.append(", ")
+                budget -= 2
+            if isinstance(value, dict):
+                key = f"{encode_basestring(str(item[0]))}: "
+                out.append(key)
+                budget = _render(item[1], out, budget - len(key))
+            else:
+                budget = _render(item, out, budget)
+        out.append("}" if isinstance(value, dict) else "]")
+        return budget - 1
+
+    if isinstance(value, str) and len(value) > max(budget, 0):
+        shown = value[: max(budget, 0)]
+        text = f'{encode_basestring(shown)[:-1]}…" (+{len(value) - len(shown)} симв.)'
+    elif isinstance(value, str):
+        text = encode_basestring(value)
+    elif isinstance(value, bool) or value is None:
+        text = "null" if value is None else str(value).lower()
+    elif isinstance(value, int | float):
+        text = repr(value)
+    else:
+        text = repr(value)
+    out.append(text)
+    return budget - len(text)
+
+
+class LogPayload:
+    """Задача или результат для записи в лог.
+
+    Текст собирается, только когда строка действительно пишется, и не длиннее
+    `limit` символов. С `full=True` данные пишутся целиком: так их логируют
+    на уровне DEBUG и при ошибке.
+    """
+
+    limit = 1000  # Задается в `setup_logging` из секции `logging` конфига
+
+    def __init__(self, value: Any, full: bool = False) -> None:
+        self.value = value
+        self.full = full
+
+    def __str__(self) -> str:
+        if isinstance(self.value, str):
+            # Результат драйвера уже JSON-строка
+            if self.full or len(self.value) <= self.limit:
+                return self.value
+            hidden = len(self.value) - self.limit
+            return f"{self.value[: self.limit]}… (+{hidden} симв.)"
+        if self.full:
+            return codec.dumps(self.value).decode()
+        out: list[str] = []
+        _render(self.value, out, self.limit)
+        return "".join(out)
+
+
+class CashboxLogAdapter(logging.LoggerAdapter[logging.Logger]):
+    """Логер кассы без GUI. Пишет в общий лог с той же пометкой, что и вкладка."""
+
+    def __init__(self, name: str) -> None:
+        super().__init__(logging.getLogger("cashbox"), {"cashbox": name})
+
+    def process(
+        self, msg: Any, kwargs: MutableMapping[str, Any]
+    ) -> tuple[Any, MutableMapping[str, Any]]:
+        kwargs["extra"] = {**(self.extra or {}), **(kwargs.get("extra") or {})}
+        return msg, kwargs
+
+
+class TextFormatter(logging.Formatter):
+    """Строка лога "время [уровень] сообщение" с пометкой кассы"""
+
+    def __init__(self) -> None:
+        super().__init__("%(asctime)s [%(levelname)s] %(message)s")
+
+    def formatMessage(self, record: logging.LogRecord) -> str:
+        cashbox = getattr(record, "cashbox", None)
+        if cashbox is None:
+            return super().formatMessage(record)
+        return (
+            f"{record.asctime} [{record.levelname}] [Касса: {cashbox}]: "
+            f"{record.message}"
+        )
+
+
+class JsonFormatter(logging.Formatter):
+    """JSON-объект на строку: время, уровень, поля кассы и задачи, сообщение.
+
+    Время и уровень идут первыми и в том же виде, что в текстовом логе,
+    поэтому просмотр логов индексирует оба формата одинаково.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: dict[str, Any] = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+        }
+        for field in LOG_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        entry["message"] = record.getMessage()
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+@dataclass
+class LogSettings:
+    """Параметры записи логов, задаются в секции `logging` конфига"""
+
+    level: str = "INFO"  # С DEBUG задачи и результаты пишутся в лог целиком
+    format: str = LogFormat.TEXT  # Формат строк файла лога
+    max_file_mb: float = 5.0  # Размер файла лога, после которого он ротируется
+    retention_mb: float = 30.0  # Сколько места могут занимать ротированные копии
+    compress: bool = True  # Сжимать ротированные копии в gzip
+    payload_limit: int = 1000  # Сколько символов задачи или результата писать в лог
+    queue_size: int = 10000  # Сколько строк может ждать записи в файл
+    overflow: str = LogOverflow.DROP  # Что делать, если очередь заполнена
+    block_timeout: float = 1.0  # Сколько секунд строка может ждать места в очереди
+
+    @classmethod
+    def from_dict(cls, value: dict[str, Any]) -> "LogSettings":
+        types = {field.name: field.type for field in fields(cls)}
+        settings: dict[str, Any] = {}
+        for key, val in value.items():
+            if types.get(key) is bool:
+                settings[key] = bool(val)
+            elif types.get(key) is int:
+                settings[key] = int(val)
+            elif types.get(key) is float:
+                settings[key] = float(val)
+            elif types.get(key) is str:
+                settings[key] = str(val)
+        return LogSettings(**settings)
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """Передает записи лога в ограниченную очередь, которую пишет фоновый поток.
+
+    Поток, который пишет лог, не ждет диск: запись только форматируется и
+    ставится в очередь. Если очередь заполнена, при политике `drop` строки
+    ниже WARNING отбрасываются сразу, а остальные ждут место не дольше
+    `block_timeout`; при политике `block` так ждут все строки. Число
+    отброшенных строк записывается в лог, когда очередь освобождается.
+    """
+
+    def __init__(
+        self, log_queue: "queue.Queue[logging.LogRecord]", settings: LogSettings
+    ) -> None:
+        super().__init__(log_queue)
+        self.settings = settings
+        self.dropped = 0  # Отброшено строк при переполнении
+        self._reported = 0  # Сколько отброшенных строк уже записано в лог
+        self._lock = threading.Lock()
+
+    exception_formatter = logging.Formatter()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Как и в QueueHandler, сообщение собирается до постановки в очередь, но
+        # трассировка остается отдельным полем, чтобы в JSON-логе у нее было свое
+        record = copy.copy(record)
+        record.message = record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.exception_formatter.formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        log_queue: queue.Queue[logging.LogRecord] = self.queue  # type: ignore
+        if not self._put(log_queue, record):
+            with self._lock:
+                self.dropped += 1
+            return
+
+        with self._lock:
+            unreported = self.dropped - self._reported
+        if not unreported:
+            return
+        try:
+            log_queue.put_nowait(
+                logging.makeLogRecord(
+                    {
+                        "name": __name__,
+                        "levelno": logging.WARNING,
+                        "levelname": logging.getLevelName(logging.WARNING),
+                        "msg": f"Пропущено строк лога при переполнении: {unreported}",
+                    }
+                )
+            )
+        except queue.Full:
+            return  # Сообщим со следующей строкой
+        with self._lock:
+            self._reported += unreported
+
+    def _put(
+        self, log_queue: "queue.Queue[logging.LogRecord]", record: logging.LogRecord
+    ) -> bool:
+        """Ставит запись в очередь по политике переполнения. False, если отброшена."""
+        try:
+            log_queue.put_nowait(record)
+            return True
+        except queue.Full:
+            if (
+                self.settings.overflow != LogOverflow.BLOCK
+                and record.levelno < logging.WARNING
+            ):
+                return False
+        try:
+            log_queue.put(record, timeout=self.settings.block_timeout)
+            return True
+        except queue.Full:
+            return False
+
+
+def rotated_log_files(log_file_path: str) -> list[tuple[int, str]]:
+    """Ротированные копии файла лога с номерами, от новых к старым"""
+    rotated = []
+    for path in glob.glob(glob.escape(log_file_path) + ".*"):
+        suffix = path[len(log_file_path) + 1 :].removesuffix(GZIP_SUFFIX)
+        if suffix.isdigit():
+            rotated.append((int(suffix), path))
+    return sorted(rotated)
+
+
+class RetentionFileHandler(logging.handlers.RotatingFileHandler):
+    """Файл лога с ротацией по размеру и ограничением места под копии.
+
+    Копии нумеруются, как у `RotatingFileHandler`: `.1` - самая новая. Сжатие
+    копий в gzip и удаление самых старых, когда копии вместе занимают больше
+    `retention_bytes`, идут в отдельном потоке, чтобы запись лога не ждала.
+    """
+
+    def __init__(
+        self, filename: str, max_bytes: int, retention_bytes: int, compress: bool
+    ) -> None:
+        super().__init__(filename, maxBytes=max_bytes, encoding="utf-8")
+        self.retention_bytes = retention_bytes
+        self.compress = compress
+        # Ротация и сжатие не переименовывают копии одновременно
+        self._files_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._wake.set()  # Копии, оставшиеся с прошлого запуска
+        threading.Thread(
+            target=self._maintain_loop, name="log-retention", daemon=True
+        ).start()
+
+    def doRollover(self) -> None:
+        if self.stream:
+            self.stream.close()
+            self.stream = None  # type: ignore[assignment]
+
+        with self._files_lock:
+            # Сдвигаем номера копий, начиная со старых
+            for number, path in reversed(rotated_log_files(self.baseFilename)):
+                suffix = GZIP_SUFFIX if path.endswith(GZIP_SUFFIX) else ""
+                os.replace(path, f"{self.baseFilename}.{number + 1}{suffix}")
+            if os.path.exists(self.baseFilename):
+                os.replace(self.baseFilename, f"{self.baseFilename}.1")
+
+        if not self.delay:
+            self.stream = self._open()
+        self._wake.set()
+
+    def _maintain_loop(self) -> None:
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            try:
+                self._maintain()
+            except OSError as e:
+                # Копия может быть открыта в просмотре логов, повторим после ротации
+                logging.getLogger(__name__).warning(
+                    "Не удалось сжать или удалить старые логи: %s", e
+                )
+
+    def _maintain(self) -> None:
+        with self._files_lock:
+            paths: list[str] = []
+            for _, path in rotated_log_files(self.baseFilename):
+                if self.compress and not path.endswith(GZIP_SUFFIX):
+                    path = self._compress(path)
+                if path not in paths:  # Копия и ее сжатая версия после сбоя
+                    paths.append(path)
+
+            total = 0
+            for path in paths:
+                total += os.path.getsize(path)
+                if total > self.retention_bytes:
+                    os.remove(path)
+
+    @staticmethod
+    def _compress(path: str) -> str:
+        compressed = path + GZIP_SUFFIX
+        with open(path, "rb") as source, gzip.open(compressed + ".tmp", "wb") as target:
+            shutil.copyfileobj(source, target)
+        # Копия удаляется, только когда сжатый файл записан целиком
+        os.replace(compressed + ".tmp", compressed)
+        os.remove(path)
+        return compressed
+
+
+def setup_logging(log_file_path: str, settings: LogSettings | None = None) -> None:
+    """Настройка глобального логера для записи логов в файл.
+
+    Файл и консоль пишет один фоновый поток, который разбирает очередь записей,
+    поэтому запись на диск и ротация файлов не задерживают потоки приложения.
+    """
+    root = logging.getLogger()
+    if root.handlers:
+        return  # Как и logging.basicConfig, настраиваем логер один раз
+
+    settings = settings or LogSettings()
+    file_handler = RetentionFileHandler(
+        log_file_path,
+        max_bytes=int(settings.max_file_mb * 1048576),
+        retention_bytes=int(settings.retention_mb * 1048576),
+        compress=settings.compress,
+    )
+    if settings.format == LogFormat.JSON:
+        file_handler.setFormatter(JsonFormatter())
+    else:
+        file_handler.setFormatter(TextFormatter())
+    # В консоли лог всегда текстовый
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(TextFormatter())
+
+    log_queue: queue.Queue[logging.LogRecord] = queue.Queue(settings.queue_size)
+    listener = logging.handlers.QueueListener(
+        log_queue, file_handler, stream_handler, respect_handler_level=True
+    )
+    listener.start()
+    # При выходе дописываем строки из очереди
+    atexit.register(listener.stop)
+
+    LogPayload.limit = settings.payload_limit
+    root.setLevel(
+        logging.getLevelNamesMapping().get(settings.level.upper(), logging.INFO)
+    )
+    root.addHandler(BoundedQueueHandler(log_queue, settings))
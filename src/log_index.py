@@ -0,0 +1,329 @@
+"""Индекс файлов лога для поиска без загрузки файлов в память.
+
+Файлы читаются через mmap: при построении индекса запоминаются только
+смещение, время и уровень каждой записи. Запись - строка, начинающаяся
+с времени, вместе со следующими за ней строками без времени (трассировка
+исключения). Текст записей читается с диска только для показа.
+
+Сжатая копия лога распаковывается один раз во временный файл, который
+читается так же через mmap и удаляется вместе с индексом копии. Строки
+JSON-лога показываются как текстовые.
+"""
+
+import bisect
+import gzip
+import json
+import logging
+import mmap
+import os
+import re
+import shutil
+import tempfile
+import weakref
+from array import array
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+
+from src.log import GZIP_SUFFIX, rotated_log_files
+
+# Начало записи лога: "2024-01-31 12:00:00,123 [INFO] " или
+# '{"time": "2024-01-31 12:00:00,123", "level": "INFO"' в JSON-логе
+ENTRY_PATTERN = re.compile(
+    rb'^(?:\{"time": ")?(\d{4}-\d\d-\d\d \d\d:\d\d:\d\d),\d{3}'
+    rb'(?: \[|", "level": ")([A-Z]+)',
+    re.MULTILINE,
+)
+SIGNATURE_SIZE = 64  # Байт начала файла, по которым замечается ротация
+STALE_ENTRY = "Файл лога изменился, обновите поиск"
+
+LEVELS = logging.getLevelNamesMapping()
+
+
+def log_file_paths(log_file_path: str) -> list[str]:
+    """Файл лога и его ротированные копии, от старых к новым"""
+    paths = [path for _, path in reversed(rotated_log_files(log_file_path))]
+    if os.path.exists(log_file_path):
+        paths.append(log_file_path)
+    return paths
+
+
+def _read_signature(path: str) -> bytes:
+    with open(path, "rb") as file:
+        signature = file.read(SIGNATURE_SIZE)
+        if path.endswith(GZIP_SUFFIX):
+            # Начала сжатых копий одного времени совпадают, а в конце - CRC32
+            # и размер распакованных данных
+            file.seek(-8, os.SEEK_END)
+            signature += file.read()
+        return signature
+
+
+def _remove_file(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def format_entry(text: str) -> str:
+    """Запись JSON-лога в виде строки текстового лога"""
+    if not text.startswith("{"):
+        return text
+    try:
+        entry: dict[str, Any] = json.loads(text)
+        line = f"{entry['time']} [{entry['level']}] "
+        if "cashbox" in entry:
+            line += f"[Касса: {entry['cashbox']}]: "
+        line += str(entry["message"])
+    except (ValueError, KeyError, TypeError):
+        return text
+    if "exception" in entry:
+        line += f"\n{entry['exception']}"
+    return line
+
+
+class LogFileIndex:
+    """Смещения, время и уровни записей одного файла лога"""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.compressed = path.endswith(GZIP_SUFFIX)
+        self.data_path = (
+            path  # Откуда читаются записи: сам файл или распакованная копия
+        )
+        self._remove_data: weakref.finalize | None = None
+        self._reset()
+
+    def _reset(self) -> None:
+        self.size = 0  # Сколько байт файла проиндексировано, до конца последней строки
+        self.signature = b""
+        self.offsets = array("Q")  # Начало каждой записи
+        self.timestamps = array("d")  # Время записи
+        self.levels = array("B")  # Уровень записи
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def entry_end(self, entry: int) -> int:
+        return self.offsets[entry + 1] if entry + 1 < len(self) else self.size
+
+    def is_unchanged(self) -> bool:
+        """Файл тот же, что при построении индекса: не заменен ротацией"""
+        try:
+            return _read_signature(self.path).startswith(self.signature)
+        except OSError:
+            return False
+
+    def is_readable(self) -> bool:
+        """Записи из индекса можно прочитать. Распакованная копия не меняется."""
+        return self.compressed or self.is_unchanged()
+
+    @contextmanager
+    def open_data(self) -> Iterator[mmap.mmap]:
+        with open(self.data_path, "rb") as file:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                yield data
+
+    def _decompress(self) -> None:
+        """Распаковывает сжатую копию во временный файл, не загружая ее в память"""
+        if self._remove_data is not None:
+            self._remove_data()  # Копия прошлого файла с этим именем
+        fd, data_path = tempfile.mkstemp(prefix="cashbox-log-", suffix=".log")
+        self._remove_data = weakref.finalize(self, _remove_file, data_path)
+        with gzip.open(self.path, "rb") as source, os.fdopen(fd, "wb") as target:
+            shutil.copyfileobj(source, target)
+        self.data_path = data_path
+
+    def update(self) -> None:
+        """Индексирует дописанный конец файла. После ротации индекс строится заново."""
+        signature = _read_signature(self.path)
+        if not signature.startswith(self.signature):
+            self._reset()
+        elif self.compressed and self.signature:
+            return  # Сжатая копия не дописывается
+        elif os.path.getsize(self.path) < self.size:
+            self._reset()
+        elif os.path.getsize(self.path) == self.size:
+            return
+
+        if self.compressed:
+            self._decompress()
+        with self.open_data() as data:
+            # Недописанная строка в конце войдет в следующее обновление
+            end = data.rfind(b"\n", self.size) + 1
+            if end <= self.size:
+                return
+            self._index(data, self.size, end)
+        self.size = end
+        self.signature = signature
+
+    def _index(self, data: mmap.mmap, start: int, end: int) -> None:
+        # Время секунды разбирается один раз для всех записей этой секунды
+        parsed_second = b""
+        timestamp = 0.0
+        for match in ENTRY_PATTERN.finditer(data, start, end):
+            second = match.group(1)
+            if second != parsed_second:
+                parsed_second = second
+                timestamp = datetime.fromisoformat(second.decode()).timestamp()
+            self.offsets.append(match.start())
+            self.timestamps.append(timestamp)
+            self.levels.append(LEVELS.get(match.group(2).decode(), logging.INFO))
+
+    def search(
+        self,
+        patterns: list[re.Pattern[bytes]],
+        min_level: int = logging.NOTSET,
+        since: float | None = None,
+        until: float | None = None,
+    ) -> list[int]:
+        """Номера записей, где есть все шаблоны, с уровнем не ниже заданного"""
+        first = 0 if since is None else bisect.bisect_left(self.timestamps, since)
+        last = (
+            len(self) if until is None else bisect.bisect_right(self.timestamps, until)
+        )
+        if first >= last:
+            return []
+
+        entries: Iterable[int] = range(first, last)
+        if patterns:
+            if not self.is_readable():
+                return []  # Файл заменен ротацией, индекс нужно обновить
+            with self.open_data() as data:
+                start, end = self.offsets[first], self.entry_end(last - 1)
+                matched: set[int] | None = None
+                for pattern in patterns:
+                    found = {
+                        bisect.bisect_right(self.offsets, match.start()) - 1
+                        for match in pattern.finditer(data, start, end)
+                    }
+                    matched = found if matched is None else matched & found
+                entries = sorted(matched or ())
+
+        return [entry for entry in entries if self.levels[entry] >= min_level]
+
+
+@dataclass
+class LogFilter:
+    cashbox_name: str = ""
+    task_number: str = ""
+    min_level: int = logging.NOTSET
+    since: float | None = None
+    until: float | None = None
+
+    def patterns(self) -> list[re.Pattern[bytes]]:
+        """Шаблоны поиска, каждый находит запись и текстового, и JSON-лога"""
+        patterns = []
+        if self.cashbox_name:
+            name = re.escape(f"[Касса: {self.cashbox_name}]:")
+            field = re.escape(
+                f'"cashbox": {json.dumps(self.cashbox_name, ensure_ascii=False)}'
+            )
+            patterns.append(re.compile(f"{name}|{field}".encode()))
+        if self.task_number:
+            number = re.escape(self.task_number)
+            # Номер задачи в JSON-логе - число или строка, как его прислал сервер
+            pattern = f'(?:№|"task": "?){number}(?!\\d)'
+            patterns.append(re.compile(pattern.encode()))
+        return patterns
+
+
+@dataclass
+class LogSearchResult:
+    """Найденные записи как пары (номер файла, номер записи), от старых к новым.
+
+    Хранит индексы файлов на момент поиска, поэтому следующее обновление
+    индекса не меняет уже найденное.
+    """
+
+    files: list[LogFileIndex]
+    refs: list[tuple[int, int]]
+
+    def level(self, row: int) -> int:
+        file_number, entry = self.refs[row]
+        return self.files[file_number].levels[entry]
+
+    def read(self, rows: range) -> list[str]:
+        """Читает текст записей. Каждый файл открывается один раз на вызов."""
+        texts: dict[tuple[int, int], str] = {}
+        by_file: dict[int, list[int]] = {}
+        for file_number, entry in self.refs[rows.start : rows.stop]:
+            by_file.setdefault(file_number, []).append(entry)
+
+        for file_number, entries in by_file.items():
+            file = self.files[file_number]
+            try:
+                if not file.is_readable():
+                    raise FileNotFoundError(file.path)
+                with file.open_data() as data:
+                    for entry in entries:
+                        text = data[file.offsets[entry] : file.entry_end(entry)]
+                        texts[(file_number, entry)] = format_entry(
+                            text.decode("utf-8", errors="replace").rstrip("\r\n")
+                        )
+            except OSError:
+                # Файл заменен ротацией после поиска
+                for entry in entries:
+                    texts[(file_number, entry)] = STALE_ENTRY
+        return [texts[ref] for ref in self.refs[rows.start : rows.stop]]
+
+
+class LogIndex:
+    """Индекс файла лога и его ротированных копий.
+
+    Обновление и поиск выполняются в фоновом потоке. Пока индекс строится
+    или идет поиск, файл открыт, поэтому ротация лога в этот момент может
+    не удаться и повторится со следующей строкой.
+    """
+
+    def __init__(self, log_file_path: str) -> None:
+        self.log_file_path = log_file_path
+        self.files: list[LogFileIndex] = []
+
+    @property
+    def entries(self) -> int:
+        return sum(len(file) for file in self.files)
+
+    def update(self, on_progress: Callable[[int, int], object] | None = None) -> None:
+        """Обновляет индекс: заново индексирует только измененные файлы"""
+        known = {file.path: file for file in self.files}
+        # Сжатые копии при ротации только меняют номер, находим их по началу файла
+        compressed = {file.signature: file for file in self.files if file.compressed}
+        files = []
+        paths = log_file_paths(self.log_file_path)
+        for number, path in enumerate(paths):
+            file = known.get(path)
+            if file is not None and file.path != path:
+                file = None  # Индекс уже отдан копии, сменившей номер
+            if path.endswith(GZIP_SUFFIX) and (file is None or not file.is_unchanged()):
+                try:
+                    file = compressed.get(_read_signature(path))
+                except OSError:
+                    continue  # Копия удалена
+                if file is not None:
+                    file.path = path  # Записи читаются из распакованной копии
+            if file is None or not file.is_unchanged():
+                # Индекс замененного файла не меняется на месте: его могут читать
+                # результаты прошлого поиска
+                file = LogFileIndex(path)
+            try:
+                file.update()
+            except (OSError, ValueError):
+                continue  # Файл удален или пуст
+            files.append(file)
+            if on_progress is not None:
+                on_progress(number + 1, len(paths))
+        self.files = files
+
+    def search(self, log_filter: LogFilter) -> LogSearchResult:
+        patterns = log_filter.patterns()
+        refs = []
+        for file_number, file in enumerate(self.files):
+            for entry in file.search(
+                patterns, log_filter.min_level, log_filter.since, log_filter.until
+            ):
+                refs.append((file_number, entry))
+        return LogSearchResult(list(self.files), refs)
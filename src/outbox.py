@@ -0,0 +1,151 @@
+import logging
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass
+from itertools import islice
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class OutboxStats:
+    depth: int = 0  # Сообщений ожидает отправки
+    unacked: int = 0  # Отправлено, но не подтверждено сервером
+    sent: int = 0  # Отправлено сообщений
+    frames: int = 0  # Отправлено кадров, в том числе пакетных
+    dropped: int = 0  # Вытеснено из переполненной очереди
+    last_latency: float = 0.0  # Время от постановки в очередь до отправки, секунды
+    avg_latency: float = 0.0  # Скользящее среднее этого времени
+    max_latency: float = 0.0
+
+
+@dataclass
+class OutboxEntry:
+    seq: int  # Порядковый номер сообщения вкладки
+    message: Any
+    enqueued_at: float
+    replay: bool = True  # Отправлять ли повторно на следующем соединении
+
+
+class Outbox:
+    """Очередь исходящих сообщений кассы.
+
+    Принадлежит вкладке, а не соединению, поэтому сообщения, не отправленные
+    до разрыва связи, уходят на сервер после переподключения. Сообщение
+    удаляется из очереди только после успешной записи в соединение.
+
+    Сообщения хранятся в виде объектов и кодируются писателем соединения
+    в формат, согласованный с сервером.
+
+    Каждое сообщение получает порядковый номер `seq`. Если сервер подтверждает
+    сообщения (`ack`), отправленные сообщения хранятся до подтверждения
+    и при следующем подключении отправляются повторно раньше новых.
+    Сообщения с `replay=False` имеют смысл только для текущего соединения:
+    они не ждут подтверждения, а не отправленные до разрыва связи удаляются.
+    """
+
+    LATENCY_SMOOTHING = 0.2  # Вес нового замера в скользящем среднем
+
+    def __init__(self, maxsize: int = 1000) -> None:
+        self.maxsize = maxsize
+        self._messages: deque[OutboxEntry] = deque()
+        self._unacked: deque[OutboxEntry] = deque()
+        self._seq = 0
+        self._lock = threading.Lock()
+        self._waker: Callable[[], None] | None = None
+        self._stats = OutboxStats()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._messages)
+
+    def put(self, message: Any, replay: bool = True) -> None:
+        """Ставит сообщение в очередь и будит писателя соединения"""
+        with self._lock:
+            if len(self._messages) >= self.maxsize:
+                self._messages.popleft()
+                self._stats.dropped += 1
+                logger.error("Очередь отправки переполнена, старое сообщение удалено")
+            self._seq += 1
+            self._messages.append(
+                OutboxEntry(self._seq, message, time.monotonic(), replay)
+            )
+            waker = self._waker
+
+        if waker is not None:
+            waker()
+
+    def peek(self, max_items: int) -> list[OutboxEntry]:
+        """Возвращает до `max_items` сообщений из начала очереди, не удаляя их"""
+        with self._lock:
+            return list(islice(self._messages, max_items))
+
+    def commit(self, count: int, wait_ack: bool = False) -> None:
+        """Удаляет из очереди `count` отправленных одним кадром сообщений.
+
+        С `wait_ack` сообщения хранятся до подтверждения сервером.
+        """
+        now = time.monotonic()
+        with self._lock:
+            for _ in range(min(count, len(self._messages))):
+                entry = self._messages.popleft()
+                if wait_ack and entry.replay:
+                    self._unacked.append(entry)
+                latency = now - entry.enqueued_at
+                self._stats.sent += 1
+                self._stats.last_latency = latency
+                self._stats.max_latency = max(self._stats.max_latency, latency)
+                self._stats.avg_latency += self.LATENCY_SMOOTHING * (
+                    latency - self._stats.avg_latency
+                )
+            self._stats.frames += 1
+
+    def ack(self, seq: int) -> None:
+        """Сервер подтвердил получение всех сообщений с номерами до `seq` включительно"""
+        with self._lock:
+            while self._unacked and self._unacked[0].seq <= seq:
+                self._unacked.popleft()
+
+    def rewind(self) -> int:
+        """Возвращает неподтвержденные сообщения в начало очереди для повторной отправки.
+
+        Вызывается при новом подключении. Сообщения прошлого соединения
+        с `replay=False` удаляются. Возвращает число повторяемых сообщений.
+        """
+        with self._lock:
+            self._messages = deque(entry for entry in self._messages if entry.replay)
+            count = len(self._unacked)
+            self._messages.extendleft(reversed(self._unacked))
+            self._unacked.clear()
+            return count
+
+    def set_waker(self, waker: Callable[[], None] | None) -> None:
+        """Задает функцию, которая будит писателя при появлении сообщений"""
+        with self._lock:
+            self._waker = waker
+            has_messages = bool(self._messages)
+
+        if waker is not None and has_messages:
+            waker()
+
+    def clear_waker(self, waker: Callable[[], None]) -> None:
+        """Убирает функцию пробуждения, если она не была заменена другой"""
+        with self._lock:
+            if self._waker == waker:
+                self._waker = None
+
+    def stats(self) -> OutboxStats:
+        with self._lock:
+            return OutboxStats(
+                depth=len(self._messages),
+                unacked=len(self._unacked),
+                sent=self._stats.sent,
+                frames=self._stats.frames,
+                dropped=self._stats.dropped,
+                last_latency=self._stats.last_latency,
+                avg_latency=self._stats.avg_latency,
+                max_latency=self._stats.max_latency,
+            )
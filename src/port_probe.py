@@ -0,0 +1,123 @@
+"""Быстрая проверка COM-портов средствами ОС до открытия их драйвером.
+
+Открытие порта драйвером на пустом или занятом порту ждет полный таймаут,
+тогда как системный вызов отвечает за миллисекунды.
+"""
+
+import ctypes
+import errno
+import os
+import platform
+import re
+
+from src.constants import PortState
+
+IS_WINDOWS = platform.system() == "Windows"
+
+# Коды ошибок и флаги WinAPI
+_ERROR_FILE_NOT_FOUND = 2
+_ERROR_PATH_NOT_FOUND = 3
+_ERROR_ACCESS_DENIED = 5
+_ERROR_SHARING_VIOLATION = 32
+_GENERIC_READ = 0x80000000
+_GENERIC_WRITE = 0x40000000
+_OPEN_EXISTING = 3
+_INVALID_HANDLE_VALUE = ctypes.c_void_p(-1).value
+
+
+def list_serial_ports() -> list[str] | None:
+    """Возвращает COM-порты, зарегистрированные в системе.
+
+    Если список получить не удалось, возвращает None, и порты перебираются вслепую.
+    """
+    if not IS_WINDOWS:
+        return None
+
+    import winreg
+
+    ports = []
+    try:
+        with winreg.OpenKey(  # type: ignore[attr-defined]
+            winreg.HKEY_LOCAL_MACHINE,  # type: ignore[attr-defined]
+            r"HARDWARE\DEVICEMAP\SERIALCOMM",
+        ) as key:
+            i = 0
+            while True:
+                try:
+                    _, value, _ = winreg.EnumValue(key, i)  # type: ignore[attr-defined]
+                except OSError:
+                    break
+                ports.append(str(value))
+                i += 1
+    except OSError:
+        return None
+
+    return sorted(ports, key=_port_sort_key)
+
+
+def probe_port(port: str) -> PortState:
+    """Проверяет, существует ли порт и не занят ли он другим процессом"""
+    if IS_WINDOWS:
+        return _probe_windows_port(port)
+    return _probe_posix_port(port)
+
+
+def _probe_windows_port(port: str) -> PortState:
+    kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)  # type: ignore[attr-defined]
+    kernel32.CreateFileW.restype = ctypes.c_void_p
+
+    handle = kernel32.CreateFileW(
+        f"\\\\.\\{port}",
+        _GENERIC_READ | _GENERIC_WRITE,
+        0,  # Монопольный доступ, как его запрашивает драйвер
+        None,
+        _OPEN_EXISTING,
+        0,
+        None,
+    )
+    if handle == _INVALID_HANDLE_VALUE:
+        error = ctypes.get_last_error()  # type: ignore[attr-defined]
+        if error in (_ERROR_ACCESS_DENIED, _ERROR_SHARING_VIOLATION):
+            return PortState.BUSY
+        if error in (_ERROR_FILE_NOT_FOUND, _ERROR_PATH_NOT_FOUND):
+            return PortState.MISSING
+        # Неизвестную ошибку оставляем на усмотрение драйвера
+        return PortState.AVAILABLE
+
+    kernel32.CloseHandle(ctypes.c_void_p(handle))
+    return PortState.AVAILABLE
+
+
+def _probe_posix_port(port: str) -> PortState:
+    if not port.startswith("/"):
+        # Имена вида COM1 драйвер разрешает сам
+        return PortState.AVAILABLE
+
+    import fcntl
+
+    try:
+        fd = os.open(port, os.O_RDWR | os.O_NOCTTY | os.O_NONBLOCK)
+    except FileNotFoundError:
+        return PortState.MISSING
+    except OSError as e:
+        return (
+            PortState.BUSY
+            if e.errno in (errno.EBUSY, errno.EACCES)
+            else PortState.AVAILABLE
+        )
+
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return PortState.BUSY
+    finally:
+        os.close(fd)
+
+    return PortState.AVAILABLE
+
+
+def _port_sort_key(port: str) -> tuple[str, int]:
+    match = re.match(r"(\D*)(\d+)$", port)
+    if not match:
+        return port, -1
+    return match.group(1), int(match.group(2))
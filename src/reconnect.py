@@ -0,0 +1,69 @@
+import random
+import time
+from dataclasses import asdict, dataclass, fields
+from typing import Any
+
+
+@dataclass
+class ReconnectPolicy:
+    """Параметры переподключения к серверу, задаются в секции `reconnect` конфига"""
+
+    first_delay: float = 1.0  # Верхняя граница задержки первой попытки
+    base_delay: float = 2.0  # Верхняя граница задержки второй попытки
+    max_delay: float = 60.0  # Максимальная задержка между попытками
+    factor: float = 2.0  # Во сколько раз растет граница с каждой попыткой
+
+    @classmethod
+    def from_dict(cls, value: dict[str, Any]) -> "ReconnectPolicy":
+        names = {field.name for field in fields(cls)}
+        return ReconnectPolicy(
+            **{key: float(val) for key, val in value.items() if key in names}
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+class ReconnectScheduler:
+    """Рассчитывает задержки переподключения: экспоненциальный рост с полным джиттером.
+
+    Задержка выбирается случайно от нуля до текущей границы, поэтому клиенты,
+    потерявшие связь одновременно, не переподключаются синхронными волнами.
+    """
+
+    def __init__(self, policy: ReconnectPolicy) -> None:
+        self.policy = policy
+        self.attempts = 0  # Попытки с момента потери соединения
+        self.last_delay: float | None = None
+        self.last_recovery_time: float | None = None  # Секунды до восстановления
+        self._disconnected_at: float | None = None
+
+    def next_delay(self) -> float:
+        """Возвращает задержку перед следующей попыткой подключения в секундах"""
+        if self._disconnected_at is None:
+            self._disconnected_at = time.monotonic()
+
+        if self.attempts == 0:
+            cap = self.policy.first_delay
+        else:
+            cap = self.policy.base_delay * self.policy.factor ** (self.attempts - 1)
+        cap = min(cap, self.policy.max_delay)
+
+        self.attempts += 1
+        self.last_delay = random.uniform(0, cap)  # nosec B311 - не для криптографии
+        return self.last_delay
+
+    def reset(self) -> tuple[int, float | None]:
+        """Сбрасывает счетчики после успешного подключения.
+
+        Возвращает число сделанных попыток и время восстановления соединения.
+        """
+        attempts = self.attempts
+        if self._disconnected_at is not None:
+            self.last_recovery_time = time.monotonic() - self._disconnected_at
+
+        recovery_time = self.last_recovery_time if attempts else None
+        self.attempts = 0
+        self.last_delay = None
+        self._disconnected_at = None
+        return attempts, recovery_time
@@ -0,0 +1,110 @@
+import queue
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import Future
+from typing import Any, TypeVar
+
+from src import errors
+
+T = TypeVar("T")
+
+
+class TaskWorker:
+    """Ограниченная очередь задач кассы с отдельным рабочим потоком.
+
+    Задачи выполняются строго по одной и в порядке поступления, так как
+    драйвер кассы не допускает параллельных вызовов. Если очередь заполнена,
+    новая задача не принимается и `submit` выбрасывает `TaskQueueFull`.
+    """
+
+    def __init__(self, name: str, maxsize: int = 20) -> None:
+        self.maxsize = maxsize
+        self._queue: queue.Queue[tuple[Future[Any], Callable[[], Any]] | None] = (
+            queue.Queue(maxsize=maxsize)
+        )
+        self._thread = threading.Thread(
+            target=self._run, name=f"cashbox-worker-{name}", daemon=True
+        )
+        self._thread.start()
+
+    @property
+    def depth(self) -> int:
+        """Количество задач, ожидающих выполнения"""
+        return self._queue.qsize()
+
+    def submit(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> Future[T]:
+        """Ставит задачу в очередь, не дожидаясь освобождения места"""
+        future: Future[T] = Future()
+        try:
+            self._queue.put_nowait((future, lambda: fn(*args, **kwargs)))
+        except queue.Full as e:
+            raise errors.TaskQueueFull(
+                f"Очередь задач кассы заполнена ({self.maxsize} задач)"
+            ) from e
+        return future
+
+    def stop(self) -> None:
+        """Останавливает рабочий поток после выполнения уже принятых задач"""
+        self._queue.put(None)
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+
+            future, call = item
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            try:
+                future.set_result(call())
+            except BaseException as e:
+                future.set_exception(e)
+
+
+class TaskRegistry:
+    """Номера задач кассы, которые выполняются или недавно выполнены.
+
+    После переподключения сервер может прислать задачу повторно. Такая задача
+    не выполняется второй раз: если она еще в очереди, повтор пропускается,
+    а если уже выполнена, серверу повторно отправляется сохраненный результат.
+    """
+
+    def __init__(self, history: int = 200) -> None:
+        self.history = history  # Сколько последних результатов хранить
+        self._pending: set[Any] = set()
+        self._done: OrderedDict[Any, dict[str, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def begin(self, number: Any) -> tuple[bool, dict[str, Any] | None]:
+        """Регистрирует задачу перед постановкой в очередь.
+
+        Возвращает, нужно ли ее выполнять, и сохраненный результат для повтора.
+        """
+        with self._lock:
+            if number in self._pending:
+                return False, None
+            if number in self._done:
+                return False, self._done[number]
+            self._pending.add(number)
+            return True, None
+
+    def finish(self, number: Any, result: dict[str, Any]) -> None:
+        """Запоминает результат выполненной задачи"""
+        with self._lock:
+            self._pending.discard(number)
+            self._done[number] = result
+            while len(self._done) > self.history:
+                self._done.popitem(last=False)
+
+    def discard(self, number: Any) -> None:
+        """Забывает задачу, которая не была принята в очередь"""
+        with self._lock:
+            self._pending.discard(number)
+
+    def pending(self) -> list[Any]:
+        """Номера задач, принятых в очередь, но еще не выполненных"""
+        with self._lock:
+            return list(self._pending)
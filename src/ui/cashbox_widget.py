@@ -1,13 +1,14 @@
-import json
 from collections.abc import Callable
 from concurrent.futures import Future
 from concurrent.futures.thread import ThreadPoolExecutor
+from contextlib import closing
 from logging import Logger
 from typing import TYPE_CHECKING, Any
 
 from PySide6.QtCore import QEvent, QThread, QTimer, Signal
 from PySide6.QtGui import QBrush, QColor, QPainter
 from PySide6.QtWidgets import (
+    QCheckBox,
     QComboBox,
     QDialog,
     QGroupBox,
@@ -22,8 +23,14 @@ from PySide6.QtWidgets import (
 )
 
 from src import errors
+from src.bridge import TaskBridge
 from src.cashbox import Cashbox, CashboxManager
+from src.compression import CompressionSettings, CompressionStats
 from src.errors import CashboxConnectionError
+from src.flow_control import CreditWindow, FlowControlSettings
+from src.keepalive import KeepaliveSettings, RttStats
+from src.outbox import Outbox
+from src.reconnect import ReconnectPolicy, ReconnectScheduler
 from src.ui.log_widget import CashboxLogger, LogWidget
 from src.ws_client import WebSocketClient
 
@@ -37,6 +44,12 @@ class CashboxLayout(QWidget):
     connection_open_signal = Signal()
     connection_close_signal = Signal(str)
     connection_error_signal = Signal(str)
+    cashbox_attached_signal = Signal(object)
+    cashbox_attach_failed_signal = Signal(object, str)
+    cashbox_connection_lost_signal = Signal()
+    cashbox_info_update_signal = Signal()
+
+    INFO_UPDATE_INTERVAL_MS = 16  # Информация о кассе обновляется не чаще раза за кадр
 
     def __init__(
         self,
@@ -49,6 +62,9 @@ class CashboxLayout(QWidget):
 
         self.tab_widget = parent
         self.cashbox: Cashbox | None = None
+        self._attaching_cashbox: Cashbox | None = (
+            None  # Касса, к которой идет подключение
+        )
         self.websocket_client: WebSocketClient | None = None
         self._logger: CashboxLogger | Logger | None = None
         self.thread_executor = ThreadPoolExecutor(max_workers=5)
@@ -61,18 +77,35 @@ class CashboxLayout(QWidget):
         self.create_buttons_section()
         self.create_logs_section()
 
+        # Задачи сервера выполняются на кассе через мост, общий с режимом без GUI
+        self.bridge = TaskBridge(
+            name=name,
+            logger=self.logger,
+            get_cashbox=lambda: self.cashbox,
+            queue_size=self.task_queue_size,
+            on_task_done=self.request_cashbox_info_update,
+            flow_control=self.flow_control_settings,
+        )
+        self.connection_indicator.outbox = self.bridge.outbox
+        self.connection_indicator.credits = self.bridge.credits
+
         # Подключаем сигналы к соответствующим слотам
         self.connection_error_signal.connect(self.on_error_received)
         self.connection_close_signal.connect(self.on_close_received)
         self.connection_open_signal.connect(self.on_connection_open)
+        self.cashbox_attached_signal.connect(self.on_cashbox_attached)
+        self.cashbox_attach_failed_signal.connect(self.on_cashbox_attach_failed)
+        self.cashbox_connection_lost_signal.connect(self.detach_cashbox)
+        self.cashbox_info_update_signal.connect(self._schedule_cashbox_info_update)
 
         # Таймер на подключение и переподключение к серверу
-        self.retry_delay: int = 10
+        self.reconnect_scheduler = ReconnectScheduler(self.reconnect_policy)
         self.retry_timer = QTimer(self)
-        self.retry_timer.setInterval(self.retry_delay * 1000)
+        self.retry_timer.setSingleShot(True)
         self.retry_timer.timeout.connect(self.try_connect_to_server)
 
-        # Автоматически пытаемся подключиться к кассе
+        # Автоматически пытаемся подключиться к кассе. Подключение идет в фоне,
+        # поэтому создание вкладки не ждет открытия порта
         self.attach_cashbox(cashbox)
 
         # Автоматически пытаемся подключиться при старте
@@ -93,12 +126,61 @@ class CashboxLayout(QWidget):
         main_window: "MainWindow" = self.tab_widget.parent()  # type: ignore
         return str(main_window.config.get("server", ""))
 
+    @property
+    def configured_cashbox(self) -> Cashbox | None:
+        """Касса вкладки, в том числе та, подключение к которой еще не завершено"""
+        return self.cashbox or self._attaching_cashbox
+
+    @property
+    def cashbox_manager(self) -> CashboxManager:
+        main_window: "MainWindow" = self.tab_widget.parent()  # type: ignore
+        return main_window.cashbox_manager
+
     @property
     def connection_key(self) -> str:
         return self.key_edit.text()
 
+    @property
+    def reconnect_policy(self) -> ReconnectPolicy:
+        main_window: "MainWindow" = self.tab_widget.parent()  # type: ignore
+        return ReconnectPolicy.from_dict(main_window.config.get("reconnect", {}))
+
+    @property
+    def task_queue_size(self) -> int:
+        main_window: "MainWindow" = self.tab_widget.parent()  # type: ignore
+        return int(main_window.config.get("task_queue_size", 20))
+
+    @property
+    def compression_settings(self) -> CompressionSettings:
+        main_window: "MainWindow" = self.tab_widget.parent()  # type: ignore
+        return CompressionSettings.from_dict(main_window.config.get("compression", {}))
+
+    @property
+    def keepalive_settings(self) -> KeepaliveSettings:
+        main_window: "MainWindow" = self.tab_widget.parent()  # type: ignore
+        return KeepaliveSettings.from_dict(main_window.config.get("keepalive", {}))
+
+    @property
+    def flow_control_settings(self) -> FlowControlSettings:
+        main_window: "MainWindow" = self.tab_widget.parent()  # type: ignore
+        return FlowControlSettings.from_dict(main_window.config.get("flow_control", {}))
+
+    @property
+    def binary_encoding(self) -> bool:
+        """Предлагать ли серверу бинарные кодировки сообщений"""
+        main_window: "MainWindow" = self.tab_widget.parent()  # type: ignore
+        return bool(main_window.config.get("binary_encoding", True))
+
+    @property
+    def multiplexed(self) -> bool:
+        """Работают ли все вкладки через одно общее соединение с сервером"""
+        main_window: "MainWindow" = self.tab_widget.parent()  # type: ignore
+        return bool(main_window.config.get("multiplex", False))
+
     @property
     def connection_address(self) -> str:
+        if self.multiplexed:
+            return f"ws://{self.server_address}/tasks"
         return f"ws://{self.server_address}/task/{self.connection_key}"
 
     def create_info_section(self, name: str) -> None:
@@ -112,6 +194,13 @@ class CashboxLayout(QWidget):
         self.cashbox_info = QLabel("Касса: НЕИЗВЕСТНО", self)
         self.shift_status = QLabel("Смена: НЕИЗВЕСТНО", self)
 
+        # Запросы обновления из разных потоков объединяются в одно за кадр
+        self._info_update_requested = False
+        self.info_update_timer = QTimer(self)
+        self.info_update_timer.setSingleShot(True)
+        self.info_update_timer.setInterval(self.INFO_UPDATE_INTERVAL_MS)
+        self.info_update_timer.timeout.connect(self._update_cashbox_info)
+
         separator1 = QLabel("|", self)
         separator1.setStyleSheet("color: gray;")
         separator2 = QLabel("|", self)
@@ -134,6 +223,7 @@ class CashboxLayout(QWidget):
 
         self.key_edit = QLineEdit(connection_key, self)
         self.key_edit.setFixedWidth(270)
+        self.key_edit.editingFinished.connect(self.on_connection_key_changed)
         connection_label = QLabel("Соединение с сервером:")
         self.connection_indicator = ConnectionIndicator(self)
         separator1 = QLabel("|", self)
@@ -145,14 +235,25 @@ class CashboxLayout(QWidget):
         conn_layout.addWidget(connection_label)
         conn_layout.addWidget(self.connection_indicator)
 
+    def on_connection_key_changed(self) -> None:
+        """Обновляем ключ соединения, под которым касса привязана в менеджере"""
+        if self.cashbox:
+            self.cashbox_manager.update_connection_key(
+                self.cashbox.serial_number, self.connection_key
+            )
+
     def schedule_reconnect(self) -> None:
         """Запускаем таймер повторного подключения, если подключение не удалось."""
-        self.logger.info(
-            f"Попытка повторного подключения через {self.retry_delay} секунд..."
-        )
         if self.retry_timer.isActive():
             return
-        self.retry_timer.start()
+
+        delay = self.reconnect_scheduler.next_delay()
+        attempt = self.reconnect_scheduler.attempts
+        self.logger.info(
+            f"Попытка повторного подключения №{attempt} через {delay:.1f} секунд..."
+        )
+        self.connection_indicator.set_reconnect_info(attempt, delay)
+        self.retry_timer.start(int(delay * 1000))
 
     def try_connect_to_server(self) -> None:
         """Пробуем подключиться к серверу."""
@@ -180,11 +281,16 @@ class CashboxLayout(QWidget):
             # Создаем экземпляр WebSocketClient
             self.websocket_client = WebSocketClient(
                 server_address=self.connection_address,
-                on_message_callback=self.on_message_received,
+                on_message_callback=self.bridge.on_message_received,
                 on_open_callback=self.connection_open_signal.emit,
                 on_error_callback=self.connection_error_signal.emit,
                 on_close_callback=self.connection_close_signal.emit,
                 logger=self.logger,
+                connection_key=self.connection_key if self.multiplexed else None,
+                outbox=self.bridge.outbox,
+                compression=self.compression_settings,
+                binary_encoding=self.binary_encoding,
+                keepalive=self.keepalive_settings,
             )
 
             # Подключаемся к серверу
@@ -200,36 +306,26 @@ class CashboxLayout(QWidget):
         self.logger.info(f"Подключено к серверу {self.server_address}")
         self.retry_timer.stop()  # Останавливаем таймер, так как соединение установлено
 
-    def on_message_received(self, message: str) -> None:
-        """Обработка сообщения от сервера"""
-        task_number = None
-
-        try:
-            task = json.loads(message)
-            task_number = task["number"]
-            del task["number"]
-            result = {
-                "status": "success",
-                "number": task_number,
-                "data": self.cashbox.send_json_task(task),  # type: ignore
-            }
-        except (json.JSONDecodeError, KeyError):
-            self.logger.exception("Невалидный формат задачи")
-            result = {
-                "status": "error",
-                "number": task_number,
-                "data": "Bad json received",
-            }
-        except errors.CashboxClientError as e:
-            self.logger.exception(e)
-            result = {"status": "error", "number": task_number, "data": str(e)}
-        except Exception as e:
-            self.logger.exception("Непредвиденная ошибка во время выполнения задачи")
-            result = {"status": "error", "number": task_number, "data": str(e)}
-        finally:
-            self._update_cashbox_info()
+        if self.websocket_client is not None:
+            stats = self.websocket_client.compression_stats
+            self.connection_indicator.compression = stats
+            self.connection_indicator.rtt = self.websocket_client.rtt_stats
+            if stats.negotiated:
+                self.logger.info("Сжатие permessage-deflate согласовано с сервером")
+            elif self.compression_settings.enabled:
+                self.logger.info("Сервер не поддерживает сжатие, работаем без него")
+            self.logger.info(
+                f"Кодировка сообщений: {self.websocket_client.encoding.name}"
+            )
+            self.bridge.on_connection_open(self.websocket_client)
 
-        self.websocket_client.send(json.dumps(result, ensure_ascii=False))  # type: ignore
+        attempts, recovery_time = self.reconnect_scheduler.reset()
+        if attempts and recovery_time is not None:
+            self.logger.info(
+                f"Соединение восстановлено за {recovery_time:.1f} секунд "
+                f"после {attempts} попыток"
+            )
+        self.connection_indicator.set_reconnect_info(0, None, recovery_time)
 
     def on_error_received(self, message: str) -> None:
         """Обработка ошибки соединения"""
@@ -257,6 +353,7 @@ class CashboxLayout(QWidget):
             except Exception as e:
                 self.logger.error(f"Ошибка при закрытии соединения: {str(e)}")
             self.connection_indicator.set_connected(False)
+            self.bridge.on_connection_closed()
             self.websocket_client = None
 
     def create_buttons_section(self) -> None:
@@ -306,42 +403,79 @@ class CashboxLayout(QWidget):
             self.logger.warning("Касса не задана для текущей вкладки")
             return
 
-        if self.cashbox:
-            if self.cashbox.serial_number == cashbox.serial_number:
+        current = self.configured_cashbox
+        if current:
+            if current.serial_number == cashbox.serial_number:
                 return
             # Освобождаем текущую кассу, если есть
             self.detach_cashbox()
 
         # Проверяем, не привязана ли касса к другому виджету
-        if CashboxManager.is_cashbox_selected(cashbox.serial_number):
+        if self.cashbox_manager.is_cashbox_selected(cashbox.serial_number):
             QMessageBox.warning(
                 self, "Ошибка", "Эта касса уже используется в другой вкладке."
             )
             return
 
-        # Создаем объект кассы и подключаемся
+        # Подключаемся к кассе в фоне, результат придет сигналом в GUI-поток
+        self._attaching_cashbox = cashbox
+        future = self.thread_executor.submit(
+            self.cashbox_manager.acquire_cashbox,
+            cashbox,
+            connection_key=self.connection_key,
+        )
+        future.add_done_callback(lambda f: self._on_cashbox_acquired(cashbox, f))
+        self.request_cashbox_info_update()
+
+    def _on_cashbox_acquired(self, cashbox: Cashbox, future: Future[Cashbox]) -> None:
+        """Вызывается в рабочем потоке по завершении подключения к кассе"""
         try:
-            self.cashbox = CashboxManager.acquire_cashbox(cashbox)
-            self.cashbox.logger = self.logger
-            self.logger.info(f"Касса {self.cashbox.name} привязана.")
+            future.result()
         except Exception as e:
-            self.logger.error(msg=str(e))
+            self.cashbox_attach_failed_signal.emit(cashbox, str(e))
+            return
+        self.cashbox_attached_signal.emit(cashbox)
+
+    def on_cashbox_attached(self, cashbox: Cashbox) -> None:
+        """Обработка успешного подключения к кассе"""
+        if self._attaching_cashbox is not cashbox:
+            # Пока шло подключение, кассу отвязали от вкладки
+            try:
+                self.cashbox_manager.release_cashbox(cashbox.serial_number)
+            except Exception as e:
+                self.logger.error(msg=str(e))
+            return
+
+        self._attaching_cashbox = None
+        self.cashbox = cashbox
+        self.cashbox.logger = self.logger
+        self.logger.info(f"Касса {self.cashbox.name} привязана.")
+        self.request_cashbox_info_update()
 
-        self._update_cashbox_info()
+    def on_cashbox_attach_failed(self, cashbox: Cashbox, message: str) -> None:
+        """Обработка ошибки подключения к кассе"""
+        if self._attaching_cashbox is cashbox:
+            self._attaching_cashbox = None
+        self.logger.error(msg=message)
+        self.request_cashbox_info_update()
 
     def detach_cashbox(self) -> None:
         """Отвязываем кассу от текущей вкладки."""
+        # Незавершенное подключение будет отменено по его окончании
+        self._attaching_cashbox = None
+
         if not self.cashbox:
+            self.request_cashbox_info_update()
             return
 
         try:
-            CashboxManager.release_cashbox(self.cashbox.serial_number)
+            self.cashbox_manager.release_cashbox(self.cashbox.serial_number)
             self.logger.info(f"Касса {self.cashbox.name} отвязана.")
         except Exception as e:
             self.logger.error(msg=str(e))
 
         self.cashbox = None
-        self._update_cashbox_info()
+        self.request_cashbox_info_update()
 
     def open_shift(self) -> None:
         """Открывает смену на кассе"""
@@ -350,7 +484,6 @@ class CashboxLayout(QWidget):
             return
 
         self._execute_cashbox_method(self.cashbox.open_shift)
-        self._update_cashbox_info()
 
     def close_shift(self) -> None:
         """Закрывает смену на кассе"""
@@ -359,7 +492,6 @@ class CashboxLayout(QWidget):
             return
 
         self._execute_cashbox_method(self.cashbox.close_shift)
-        self._update_cashbox_info()
 
     def x_report(self) -> None:
         """Печатает X-отчет на кассе"""
@@ -372,21 +504,53 @@ class CashboxLayout(QWidget):
     def _execute_cashbox_method(
         self, method: Callable[[], Any], *args: Any, **kwargs: Any
     ) -> None:
-        future = self.thread_executor.submit(method, *args, **kwargs)
+        # Действия с кассы выполняются в той же очереди, что и задачи сервера
+        try:
+            future = self.bridge.execute(method, *args, **kwargs)
+        except errors.TaskQueueFull as e:
+            self.logger.warning(str(e))
+            return
         future.add_done_callback(self._task_callback)
 
     def _task_callback(self, future: Future[Any]) -> Any:
+        """Вызывается в рабочем потоке по завершении действия с кассой"""
         try:
             return future.result()
         except CashboxConnectionError as e:
             self.logger.error(msg=str(e))
-            self.detach_cashbox()
+            # Кассу отвязываем в GUI-потоке
+            self.cashbox_connection_lost_signal.emit()
         except Exception as e:
             self.logger.error(msg=str(e))
+        finally:
+            self.request_cashbox_info_update()
+
+    def request_cashbox_info_update(self) -> None:
+        """Запрашивает обновление информации о кассе. Можно вызывать из любого потока.
+
+        Обновление выполняется в GUI-потоке по таймеру, поэтому серия запросов,
+        например после каждой задачи, обновляет надписи один раз.
+        """
+        if self._info_update_requested:
+            return
+        self._info_update_requested = True
+        self.cashbox_info_update_signal.emit()
+
+    def _schedule_cashbox_info_update(self) -> None:
+        if not self.info_update_timer.isActive():
+            self.info_update_timer.start()
 
     def _update_cashbox_info(self) -> None:
-        """Обновляет информацию о привязанной кассе"""
-        if not self.cashbox:
+        """Обновляет информацию о привязанной кассе. Вызывается в GUI-потоке."""
+        # Флаг сбрасывается до чтения состояния: изменение после этого
+        # запросит новое обновление
+        self._info_update_requested = False
+        if self._attaching_cashbox:
+            self.cashbox_info.setText(
+                f"Касса: {self._attaching_cashbox.name} (подключение...)"
+            )
+            self.shift_status.setText("Смена: НЕИЗВЕСТНО")
+        elif not self.cashbox:
             self.cashbox_info.setText("Касса: НЕИЗВЕСТНО")
             self.shift_status.setText("Смена: НЕИЗВЕСТНО")
         else:
@@ -404,6 +568,7 @@ class CashboxLayout(QWidget):
     def destroy(self, *args: Any, **kwargs: Any) -> None:
         self.detach_cashbox()
         self._close_connection()
+        self.bridge.stop()
         super().destroy(*args, *kwargs)
 
 
@@ -411,6 +576,13 @@ class ConnectionIndicator(QWidget):
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         super().__init__(*args, **kwargs)
         self.connected = False  # Начальный статус (отключено)
+        self.reconnect_attempts = 0
+        self.next_reconnect_delay: float | None = None
+        self.last_recovery_time: float | None = None
+        self.outbox: Outbox | None = None  # Очередь отправки для статистики
+        self.compression: CompressionStats | None = None  # Сжатие соединения
+        self.rtt: RttStats | None = None  # Замеры RTT соединения
+        self.credits: CreditWindow | None = None  # Кредиты, выданные серверу
         self.setFixedSize(20, 20)  # Размер индикатора
 
         # Устанавливаем начальную подсказку
@@ -434,9 +606,69 @@ class ConnectionIndicator(QWidget):
         self.update_tooltip()  # Обновляем текст подсказки
         self.update()  # Перерисовываем виджет
 
+    def set_reconnect_info(
+        self,
+        attempts: int,
+        next_delay: float | None,
+        recovery_time: float | None = None,
+    ) -> None:
+        """Метод для обновления сведений о переподключении"""
+        self.reconnect_attempts = attempts
+        self.next_reconnect_delay = next_delay
+        if recovery_time is not None:
+            self.last_recovery_time = recovery_time
+        self.update_tooltip()
+
     def update_tooltip(self) -> None:
         """Обновление текста подсказки"""
         status_text = "Есть соединение" if self.connected else "Нет соединения"
+        if not self.connected and self.reconnect_attempts:
+            status_text += f"\nПопытка переподключения: {self.reconnect_attempts}"
+            if self.next_reconnect_delay is not None:
+                status_text += f", через {self.next_reconnect_delay:.1f} с"
+        if self.last_recovery_time is not None:
+            status_text += (
+                f"\nПоследнее восстановление: {self.last_recovery_time:.1f} с"
+            )
+        if self.outbox is not None:
+            stats = self.outbox.stats()
+            status_text += (
+                f"\nОчередь отправки: {stats.depth}, "
+                f"отправлено {stats.sent} в {stats.frames} кадрах"
+                f"\nЗадержка отправки: {stats.avg_latency * 1000:.0f} мс, "
+                f"макс. {stats.max_latency * 1000:.0f} мс"
+            )
+            if stats.unacked:
+                status_text += f"\nОжидают подтверждения: {stats.unacked}"
+            if stats.dropped:
+                status_text += f"\nПотеряно при переполнении: {stats.dropped}"
+        if self.connected and self.compression is not None:
+            if not self.compression.negotiated:
+                status_text += "\nСжатие: выключено"
+            else:
+                sent = self.compression.sent_ratio
+                received = self.compression.received_ratio
+                status_text += f"\nСжатие: отправка {sent or 1:.1f}x, получение {received or 1:.1f}x"
+        if self.connected and self.rtt is not None and self.rtt.samples:
+            status_text += (
+                f"\nRTT: {self.rtt.smoothed * 1000:.0f} мс, "
+                f"разброс {self.rtt.jitter * 1000:.0f} мс, "
+                f"мин. {self.rtt.min * 1000:.0f} мс, макс. {self.rtt.max * 1000:.0f} мс"
+                f"\nПроверка связи после {self.rtt.interval:.0f} с тишины"
+            )
+            if self.rtt.flaky:
+                status_text += ", связь нестабильна"
+        if self.connected and self.credits is not None:
+            credits = self.credits.stats()
+            if credits.enabled:
+                status_text += (
+                    f"\nКредиты сервера: {credits.available}, "
+                    f"задач у кассы {credits.in_flight}, окно {credits.window}"
+                )
+                if credits.service_time:
+                    status_text += (
+                        f"\nСреднее время задачи: {credits.service_time:.2f} с"
+                    )
         self.setToolTip(status_text)
 
     def enterEvent(self, event: QEvent) -> None:
@@ -475,6 +707,9 @@ class CashboxSelectionDialog(QDialog):
         self.progress_bar.setVisible(False)
         layout.addWidget(self.progress_bar)
 
+        # Перебор скоростей нужен только для касс, настроенных не на 115200
+        self.scan_baud_rates_check_box = QCheckBox("Перебирать скорости порта", self)
+
         # Кнопка привязки и отвязки кассы
         button_layout = QHBoxLayout()
         self.attach_button = QPushButton("Привязать кассу", self)
@@ -487,31 +722,50 @@ class CashboxSelectionDialog(QDialog):
         button_layout.addWidget(self.detach_button)
 
         layout.addLayout(search_layout)
+        layout.addWidget(self.scan_baud_rates_check_box)
         layout.addLayout(button_layout)
 
-        # Инициализируем поток для поиска касс
-        self.search_thread = CashboxSearchThread()
+        # Инициализируем поток для поиска касс. Поток принадлежит вкладке,
+        # чтобы поиск мог спокойно завершиться после закрытия диалога
+        self.search_thread = CashboxSearchThread(parent.cashbox_manager, parent)
+        self.search_thread.cashbox_found.connect(self.on_cashbox_found)
+        self.search_thread.port_failed.connect(self.on_port_failed)
         self.search_thread.finished.connect(self.on_search_finished)
 
     def start_search(self) -> None:
         """Запускаем поиск касс в отдельном потоке."""
         self.search_button.setEnabled(False)  # Отключаем кнопку поиска
         self.progress_bar.setVisible(True)  # Отображаем прогресс бар
+        self.search_thread.scan_baud_rates = self.scan_baud_rates_check_box.isChecked()
         self.search_thread.start()  # Запускаем поток
 
+    def on_cashbox_found(self, cashbox: Cashbox) -> None:
+        """Добавляем найденную кассу в список, не дожидаясь окончания поиска."""
+        if self.combo_box.findText(cashbox.name) >= 0:
+            return
+        parent: CashboxLayout = self.parent()  # type: ignore
+        if parent.cashbox_manager.is_cashbox_selected(cashbox.serial_number):
+            return
+        self.combo_box.addItem(f"{cashbox.name}", cashbox)
+
+    def on_port_failed(self, port: str, error: str) -> None:
+        """Сообщаем об ошибке на отдельном порту, поиск при этом продолжается."""
+        parent: CashboxLayout = self.parent()  # type: ignore
+        parent.logger.warning(f"Ошибка при опросе порта {port}: {error}")
+
     def on_search_finished(self) -> None:
         """Обработка завершения поиска касс."""
-        self.update_combo_box()  # Обновляем выпадающий список касс
         self.progress_bar.setVisible(False)  # Скрываем прогресс бар
         self.search_button.setEnabled(True)  # Включаем кнопку поиска
 
     def update_combo_box(self) -> None:
         self.combo_box.clear()
         self.combo_box.addItem("Выберите кассу...")  # Дефолтное значение
-        for cashbox in CashboxManager.get_available_cashboxes():
+        parent: CashboxLayout = self.parent()  # type: ignore
+        for cashbox in parent.cashbox_manager.get_available_cashboxes():
             self.combo_box.addItem(f"{cashbox.name}", cashbox)
 
-        parent_cashbox = self.parent().cashbox  # type: ignore
+        parent_cashbox = parent.cashbox
         if parent_cashbox is None:
             return
 
@@ -531,9 +785,32 @@ class CashboxSelectionDialog(QDialog):
         parent.detach_cashbox()
         self.combo_box.setCurrentIndex(0)
 
+    def done(self, result: int) -> None:
+        """При закрытии диалога прерываем поиск и отписываемся от его сигналов."""
+        self.search_thread.requestInterruption()
+        self.search_thread.cashbox_found.disconnect(self.on_cashbox_found)
+        self.search_thread.port_failed.disconnect(self.on_port_failed)
+        self.search_thread.finished.disconnect(self.on_search_finished)
+        super().done(result)
+
 
 class CashboxSearchThread(QThread):
     """Поток для поиска касс."""
 
+    cashbox_found = Signal(object)
+    port_failed = Signal(str, str)
+
+    def __init__(self, cashbox_manager: CashboxManager, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.cashbox_manager = cashbox_manager
+        self.scan_baud_rates = False
+
     def run(self) -> None:
-        CashboxManager.search_for_cashboxes()
+        search = self.cashbox_manager.iter_search_cashboxes(
+            on_port_error=self.port_failed.emit,
+            scan_baud_rates=self.scan_baud_rates,
+            should_stop=self.isInterruptionRequested,
+        )
+        with closing(search):
+            for cashbox in search:
+                self.cashbox_found.emit(cashbox)
@@ -0,0 +1,254 @@
+import logging
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, cast
+
+from PySide6.QtCore import (
+    QAbstractListModel,
+    QDateTime,
+    QModelIndex,
+    QPersistentModelIndex,
+    Qt,
+    QThread,
+    Signal,
+)
+from PySide6.QtGui import QKeySequence, QShortcut
+from PySide6.QtWidgets import (
+    QAbstractItemView,
+    QApplication,
+    QCheckBox,
+    QComboBox,
+    QDateTimeEdit,
+    QDialog,
+    QFormLayout,
+    QHBoxLayout,
+    QHeaderView,
+    QLabel,
+    QLineEdit,
+    QPushButton,
+    QTableView,
+    QVBoxLayout,
+    QWidget,
+)
+
+from src.log_index import LogFilter, LogIndex, LogSearchResult
+from src.ui.log_widget import LogLineDelegate, LogModel, LogWidget
+
+if TYPE_CHECKING:
+    from src.ui.cashbox_widget import CashboxLayout
+    from src.ui.main_window import MainWindow
+
+
+class LogSearchThread(QThread):
+    """Поток, который обновляет индекс логов и ищет в нем записи."""
+
+    progress = Signal(int, int)
+    search_finished = Signal(object)
+
+    def __init__(self, index: LogIndex, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.index = index
+        self.log_filter = LogFilter()
+
+    def run(self) -> None:
+        self.index.update(on_progress=self.progress.emit)
+        self.search_finished.emit(self.index.search(self.log_filter))
+
+
+class LogSearchModel(QAbstractListModel):
+    """Найденные записи. Текст читается из файлов страницами по мере прокрутки."""
+
+    PAGE_SIZE = 256  # Записей, читаемых из файлов за раз
+    MAX_PAGES = 32  # Сколько прочитанных страниц держать в памяти
+    MAX_TOOLTIP_LENGTH = 4000
+
+    def __init__(self, parent: QWidget | None = None) -> None:
+        super().__init__(parent)
+        self.result = LogSearchResult([], [])
+        self._pages: OrderedDict[int, list[str]] = OrderedDict()
+
+    def set_result(self, result: LogSearchResult) -> None:
+        self.beginResetModel()
+        self.result = result
+        self._pages.clear()
+        self.endResetModel()
+
+    def rowCount(
+        self, parent: QModelIndex | QPersistentModelIndex | None = None
+    ) -> int:
+        return 0 if parent is not None and parent.isValid() else len(self.result.refs)
+
+    def text(self, row: int) -> str:
+        page = row // self.PAGE_SIZE
+        if page in self._pages:
+            self._pages.move_to_end(page)
+        else:
+            first = page * self.PAGE_SIZE
+            last = min(first + self.PAGE_SIZE, len(self.result.refs))
+            self._pages[page] = self.result.read(range(first, last))
+            if len(self._pages) > self.MAX_PAGES:
+                self._pages.popitem(last=False)
+        return self._pages[page][row % self.PAGE_SIZE]
+
+    def data(
+        self,
+        index: QModelIndex | QPersistentModelIndex,
+        role: int = Qt.ItemDataRole.DisplayRole,
+    ) -> Any:
+        if not index.isValid() or index.row() >= len(self.result.refs):
+            return None
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            # Трассировка исключения видна в подсказке, в таблице только первая строка
+            first_line, _, rest = self.text(index.row()).partition("\n")
+            return f"{first_line} …" if rest else first_line
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return self.text(index.row())[: self.MAX_TOOLTIP_LENGTH]
+        if role == LogModel.LevelRole:
+            return self.result.level(index.row())
+        return None
+
+
+class LogViewerDialog(QDialog):
+    """Поиск по файлу лога и его ротированным копиям.
+
+    Файлы не загружаются в память: в фоне строится индекс записей, а текст
+    найденных записей читается с диска при прокрутке. Повторный поиск
+    индексирует только дописанные строки.
+    """
+
+    LEVELS = {
+        "Все": logging.NOTSET,
+        "INFO и выше": logging.INFO,
+        "WARNING и выше": logging.WARNING,
+        "ERROR": logging.ERROR,
+    }
+
+    def __init__(self, parent: "MainWindow") -> None:
+        super().__init__(parent)
+        self.setWindowTitle("Просмотр логов")
+        self.resize(900, 600)
+
+        self.search_thread = LogSearchThread(LogIndex(parent.log_file_path), self)
+        self.search_thread.progress.connect(self.on_progress)
+        self.search_thread.search_finished.connect(self.on_search_finished)
+        self._search_again = False  # Фильтр изменился во время поиска
+
+        layout = QVBoxLayout(self)
+        self.create_filters_section(layout)
+
+        self.model = LogSearchModel(self)
+        self.table = QTableView(self)
+        font = self.table.font()
+        font.setPointSize(10)
+        self.table.setFont(font)
+        # Как и в логах вкладки: строки одной высоты, рисуются только видимые
+        self.table.horizontalHeader().hide()
+        self.table.horizontalHeader().setStretchLastSection(True)
+        row_header = self.table.verticalHeader()
+        row_header.hide()
+        row_header.setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        row_header.setDefaultSectionSize(self.table.fontMetrics().height() + 2)
+        self.table.setShowGrid(False)
+        self.table.setWordWrap(False)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.table.setModel(self.model)
+        self.table.setItemDelegate(LogLineDelegate(LogWidget.LOG_COLORS, self.table))
+        layout.addWidget(self.table)
+
+        copy_shortcut = QShortcut(QKeySequence.StandardKey.Copy, self.table)
+        copy_shortcut.activated.connect(self.copy_selected)
+
+        self.status_label = QLabel(self)
+        layout.addWidget(self.status_label)
+
+        self.search()
+
+    def create_filters_section(self, layout: QVBoxLayout) -> None:
+        filters_layout = QFormLayout()
+        layout.addLayout(filters_layout)
+
+        # Имена касс из вкладок, можно ввести и другое
+        self.cashbox_input = QComboBox(self)
+        self.cashbox_input.setEditable(True)
+        self.cashbox_input.addItem("")
+        main_window = cast("MainWindow", self.parent())
+        for i in range(main_window.tab_widget.count() - 1):  # Игнорируем вкладку "+"
+            tab = cast("CashboxLayout", main_window.tab_widget.widget(i))
+            self.cashbox_input.addItem(tab.name_edit.text())
+        filters_layout.addRow("Касса:", self.cashbox_input)
+
+        self.task_input = QLineEdit(self)
+        self.task_input.setPlaceholderText("Номер задачи")
+        filters_layout.addRow("Задача №:", self.task_input)
+
+        self.level_input = QComboBox(self)
+        self.level_input.addItems(list(self.LEVELS))
+        filters_layout.addRow("Уровень:", self.level_input)
+
+        period_layout = QHBoxLayout()
+        self.period_check_box = QCheckBox(self)
+        now = QDateTime.currentDateTime()
+        self.since_input = QDateTimeEdit(now.addDays(-1), self)
+        self.until_input = QDateTimeEdit(now, self)
+        period_layout.addWidget(self.period_check_box)
+        for label, date_input in (("с", self.since_input), ("по", self.until_input)):
+            date_input.setCalendarPopup(True)
+            date_input.setDisplayFormat("yyyy-MM-dd HH:mm:ss")
+            period_layout.addWidget(QLabel(label))
+            period_layout.addWidget(date_input)
+        period_layout.addStretch()
+        filters_layout.addRow("Период:", period_layout)
+
+        search_button = QPushButton("Найти", self)
+        search_button.setFixedWidth(120)
+        search_button.setDefault(True)
+        search_button.clicked.connect(self.search)
+        filters_layout.addRow(search_button)
+
+    def log_filter(self) -> LogFilter:
+        period = self.period_check_box.isChecked()
+        return LogFilter(
+            cashbox_name=self.cashbox_input.currentText().strip(),
+            task_number=self.task_input.text().strip(),
+            min_level=self.LEVELS[self.level_input.currentText()],
+            since=self.since_input.dateTime().toSecsSinceEpoch() if period else None,
+            until=self.until_input.dateTime().toSecsSinceEpoch() if period else None,
+        )
+
+    def search(self) -> None:
+        """Запускает поиск. Во время поиска новый запускается после текущего."""
+        if self.search_thread.isRunning():
+            self._search_again = True
+            return
+
+        self._search_again = False
+        self.search_thread.log_filter = self.log_filter()
+        self.status_label.setText("Индексация логов...")
+        self.search_thread.start()
+
+    def on_progress(self, done: int, total: int) -> None:
+        self.status_label.setText(f"Индексация логов: файл {done} из {total}")
+
+    def on_search_finished(self, result: LogSearchResult) -> None:
+        if self._search_again:
+            self.search_thread.wait()
+            self.search()
+            return
+
+        self.model.set_result(result)
+        self.table.scrollToBottom()
+        index = self.search_thread.index
+        self.status_label.setText(
+            f"Записей в логах: {index.entries}, файлов: {len(index.files)}. "
+            f"Найдено: {len(result.refs)}"
+        )
+
+    def copy_selected(self) -> None:
+        rows = sorted(index.row() for index in self.table.selectedIndexes())
+        text = "\n".join(self.model.text(row) for row in rows)
+        QApplication.clipboard().setText(text)
+
+    def done(self, result: int) -> None:
+        self.search_thread.wait()
+        super().done(result)
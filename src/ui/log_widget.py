@@ -1,9 +1,32 @@
 import logging
-from datetime import datetime
-from typing import TYPE_CHECKING
+import threading
+import time
+from collections import deque
+from collections.abc import Mapping
+from typing import TYPE_CHECKING, Any, NamedTuple, cast
 
-from PySide6.QtCore import Qt
-from PySide6.QtWidgets import QGroupBox, QPushButton, QTextEdit, QVBoxLayout, QWidget
+from PySide6.QtCore import (
+    QAbstractListModel,
+    QModelIndex,
+    QPersistentModelIndex,
+    Qt,
+    QTimer,
+)
+from PySide6.QtGui import QColor, QKeySequence, QPalette, QShortcut
+from PySide6.QtWidgets import (
+    QAbstractItemView,
+    QApplication,
+    QGroupBox,
+    QHBoxLayout,
+    QHeaderView,
+    QLabel,
+    QPushButton,
+    QStyledItemDelegate,
+    QStyleOptionViewItem,
+    QTableView,
+    QVBoxLayout,
+    QWidget,
+)
 
 from src.constants import LogLineColor
 
@@ -11,99 +34,336 @@ if TYPE_CHECKING:
     from src.ui.cashbox_widget import CashboxLayout
 
 
+class LogLine(NamedTuple):
+    timestamp: float
+    level: int
+    message: str
+
+
+class LogRing:
+    """Кольцевой буфер строк лога фиксированной емкости.
+
+    Добавление за O(1): когда буфер полон, новая строка занимает место самой старой.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self._lines: list[LogLine | None] = [None] * capacity
+        self._start = 0  # Индекс самой старой строки
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, row: int) -> LogLine:
+        if not 0 <= row < self._count:
+            raise IndexError(f"Нет строки {row} в буфере из {self._count} строк")
+        line = self._lines[(self._start + row) % self.capacity]
+        return cast(LogLine, line)  # Строки в пределах _count заполнены
+
+    def append(self, line: LogLine) -> None:
+        if self._count < self.capacity:
+            self._lines[(self._start + self._count) % self.capacity] = line
+            self._count += 1
+        else:
+            self._lines[self._start] = line
+            self._start = (self._start + 1) % self.capacity
+
+    def clear(self) -> None:
+        self._lines = [None] * self.capacity
+        self._start = 0
+        self._count = 0
+
+
+class LogModel(QAbstractListModel):
+    """Модель строк лога поверх `LogRing`. Текст строки собирается только при отрисовке."""
+
+    LevelRole = Qt.ItemDataRole.UserRole + 1
+
+    def __init__(self, capacity: int, parent: QWidget | None = None) -> None:
+        super().__init__(parent)
+        self.ring = LogRing(capacity)
+
+    def rowCount(
+        self, parent: QModelIndex | QPersistentModelIndex | None = None
+    ) -> int:
+        return 0 if parent is not None and parent.isValid() else len(self.ring)
+
+    def data(
+        self,
+        index: QModelIndex | QPersistentModelIndex,
+        role: int = Qt.ItemDataRole.DisplayRole,
+    ) -> Any:
+        if not index.isValid() or index.row() >= len(self.ring):
+            return None
+
+        line = self.ring[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self.format_line(line)
+        if role == self.LevelRole:
+            return line.level
+        return None
+
+    @staticmethod
+    def format_line(line: LogLine) -> str:
+        timestamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(line.timestamp))
+        return f"[{timestamp}] [{logging.getLevelName(line.level)}] {line.message}"
+
+    def append_lines(self, lines: list[LogLine]) -> None:
+        """Добавляет пакет строк. Когда буфер полон, число строк не меняется,
+        а их содержимое сдвигается, поэтому представление только перерисовывает
+        видимые строки."""
+        inserted = min(len(lines), self.ring.capacity - len(self.ring))
+        if inserted:
+            first = len(self.ring)
+            self.beginInsertRows(QModelIndex(), first, first + inserted - 1)
+            for line in lines[:inserted]:
+                self.ring.append(line)
+            self.endInsertRows()
+
+        if inserted < len(lines):
+            for line in lines[inserted:]:
+                self.ring.append(line)
+            self.dataChanged.emit(self.index(0), self.index(len(self.ring) - 1))
+
+    def clear(self) -> None:
+        self.beginResetModel()
+        self.ring.clear()
+        self.endResetModel()
+
+
+class LogLineDelegate(QStyledItemDelegate):
+    """Отрисовка строки лога цветом ее уровня"""
+
+    def __init__(self, colors: dict[int, str], parent: QWidget | None = None) -> None:
+        super().__init__(parent)
+        self.colors = {level: QColor(color) for level, color in colors.items()}
+        self.default_color = QColor(LogLineColor.GREY)
+
+    def initStyleOption(
+        self,
+        option: QStyleOptionViewItem,
+        index: QModelIndex | QPersistentModelIndex,
+    ) -> None:
+        super().initStyleOption(option, index)
+        color = self.colors.get(index.data(LogModel.LevelRole), self.default_color)
+        option.palette.setColor(QPalette.ColorRole.Text, color)
+
+
 class LogWidget(QWidget):
+    """Логи вкладки.
+
+    Строки можно добавлять из любого потока: они копятся в буфере и выводятся
+    одним пакетом по таймеру в GUI-потоке. Если за время между выводами строк
+    больше, чем вмещает буфер, старые вытесняются и считаются пропущенными.
+    В файл строки пишутся сразу.
+
+    Показанные строки хранятся в кольцевом буфере на `MAX_LOG_LINES` строк и
+    выводятся таблицей, которая отрисовывает только видимые строки.
+    """
+
     LOG_COLORS = {
         logging.INFO: LogLineColor.GREY,
         logging.WARNING: LogLineColor.ORANGE,
         logging.ERROR: LogLineColor.RED,
     }
 
-    MAX_LOG_LINES = 100  # Максимальное количество строк в текстовом поле
+    MAX_LOG_LINES = 100_000  # Сколько строк хранится и показывается во вкладке
+    MAX_PENDING_LINES = 10_000  # Сколько строк может ждать вывода
+    FLUSH_INTERVAL_MS = 100  # Как часто буфер выводится в таблицу
+    STATS_INTERVAL = 1.0  # Секунды между обновлениями счетчиков вывода
 
     def __init__(self, parent: "CashboxLayout") -> None:
         super().__init__(parent)
 
+        # Буфер строк для вывода. Блокировка держится только на время добавления
+        # или забора строк, поэтому потоки, которые пишут логи, не ждут отрисовку
+        self._pending: deque[LogLine] = deque(maxlen=self.MAX_PENDING_LINES)
+        self._pending_lock = threading.Lock()
+        self.dropped = 0  # Строк вытеснено из буфера до вывода
+        self.flush_rate = 0.0  # Выводов пакета в секунду
+        self._flushes = 0
+        self._stats_started_at = time.monotonic()
+
         self.main_layout = QVBoxLayout(self)
         self.setLayout(self.main_layout)
 
         self.create_logs_section()
 
+        self.flush_timer = QTimer(self)
+        self.flush_timer.timeout.connect(self.flush)
+        self.flush_timer.start(self.FLUSH_INTERVAL_MS)
+
     def create_logs_section(self) -> None:
-        """Добавляем текстовое поле для логов и кнопку очистки."""
+        """Добавляем таблицу логов и кнопку очистки."""
         group_box = QGroupBox(self)
         group_box.setTitle("Логи")
         logs_layout = QVBoxLayout()
         group_box.setLayout(logs_layout)
         self.main_layout.addWidget(group_box)
 
-        self.log_box = QTextEdit(self)
+        self.log_model = LogModel(self.MAX_LOG_LINES, self)
+        self.log_box = QTableView(self)
         font = self.log_box.font()
         font.setPointSize(10)  # Устанавливаем размер шрифта
         self.log_box.setFont(font)
-        self.log_box.setReadOnly(True)
+        # Таблица с одной колонкой и строками одной высоты: в отличие от QListView,
+        # она не обходит все строки модели при обновлении, а рисует только видимые
+        self.log_box.horizontalHeader().hide()
+        self.log_box.horizontalHeader().setStretchLastSection(True)
+        row_header = self.log_box.verticalHeader()
+        row_header.hide()
+        row_header.setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        row_header.setDefaultSectionSize(self.log_box.fontMetrics().height() + 2)
+        self.log_box.setShowGrid(False)
+        self.log_box.setWordWrap(False)
+        self.log_box.setSelectionBehavior(
+            QAbstractItemView.SelectionBehavior.SelectRows
+        )
+        self.log_box.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.log_box.setModel(self.log_model)
+        self.log_box.setItemDelegate(LogLineDelegate(self.LOG_COLORS, self.log_box))
         logs_layout.addWidget(self.log_box)
 
+        # Копирование выделенных строк
+        copy_shortcut = QShortcut(QKeySequence.StandardKey.Copy, self.log_box)
+        copy_shortcut.activated.connect(self.copy_selected)
+
+        bottom_layout = QHBoxLayout()
+        logs_layout.addLayout(bottom_layout)
+
+        # Счетчики вывода логов
+        self.stats_label = QLabel(self)
+        bottom_layout.addWidget(self.stats_label)
+        bottom_layout.addStretch()
+
         # Добавляем кнопку для очистки логов
         clear_button = QPushButton("Очистить логи", self)
         clear_button.setFixedWidth(120)
         clear_button.clicked.connect(self.clear_logs)
-        logs_layout.addWidget(clear_button, alignment=Qt.AlignmentFlag.AlignRight)
+        bottom_layout.addWidget(clear_button)
+
+        self.update_stats_label()
 
     def add_log(
-        self, message: str, level: int = 20, exc_info: bool | None = False
+        self,
+        message: str,
+        level: int = 20,
+        exc_info: bool | None = False,
+        extra: Mapping[str, object] | None = None,
     ) -> None:
-        """Добавление логов в текстовый бокс с цветом и уровнем"""
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        color = self.LOG_COLORS.get(level, LogLineColor.GREY)  # Получаем цвет по уровню
+        """Добавление строки лога. Можно вызывать из любого потока."""
+        line = LogLine(time.time(), level, message)
+        with self._pending_lock:
+            if len(self._pending) == self._pending.maxlen:
+                self.dropped += 1  # Новая строка вытеснит самую старую
+            self._pending.append(line)
 
-        # Форматируем сообщение
-        formatted_message = f"[{timestamp}] [{logging.getLevelName(level)}] {message}"
+        # Записываем лог в файл с пометкой о кассе
+        self.log_to_file(message=message, level=level, exc_info=exc_info, extra=extra)
 
-        # Добавляем сообщение с цветом
-        self.log_box.setTextColor(Qt.GlobalColor.white)  # Цвет по умолчанию - белый
-        self.log_box.append(f'<span style="color:{color};">{formatted_message}</span>')
+    def flush(self) -> None:
+        """Выводит накопленные строки в таблицу одним пакетом"""
+        with self._pending_lock:
+            lines = list(self._pending)
+            self._pending.clear()
 
-        # Проверяем, если строк больше, чем MAX_LOG_LINES, удаляем верхние строки
-        if self.log_box.document().blockCount() > self.MAX_LOG_LINES:
-            cursor = self.log_box.textCursor()
-            cursor.movePosition(cursor.MoveOperation.Start)
-            cursor.select(cursor.SelectionType.BlockUnderCursor)
-            cursor.removeSelectedText()
-            cursor.deleteChar()
+        if lines:
+            self._flushes += 1
+            self._render(lines)
 
-        # Записываем лог в файл с пометкой о кассе
-        self.log_to_file(message=message, level=level, exc_info=exc_info)
+        now = time.monotonic()
+        if now - self._stats_started_at >= self.STATS_INTERVAL:
+            self.flush_rate = self._flushes / (now - self._stats_started_at)
+            self._flushes = 0
+            self._stats_started_at = now
+            self.update_stats_label()
+
+    def _render(self, lines: list[LogLine]) -> None:
+        # Прокручиваем к новым строкам, только если таблица и так была прокручена вниз
+        scroll_bar = self.log_box.verticalScrollBar()
+        at_bottom = scroll_bar.value() >= scroll_bar.maximum()
+        self.log_model.append_lines(lines)
+        if at_bottom:
+            self.log_box.scrollToBottom()
+
+    def copy_selected(self) -> None:
+        rows = sorted(index.row() for index in self.log_box.selectedIndexes())
+        text = "\n".join(
+            self.log_model.format_line(self.log_model.ring[row]) for row in rows
+        )
+        QApplication.clipboard().setText(text)
+
+    def update_stats_label(self) -> None:
+        self.stats_label.setText(
+            f"Вывод: {self.flush_rate:.1f} раз/с, пропущено строк: {self.dropped}"
+        )
 
     def log_to_file(
-        self, message: str, level: int, exc_info: bool | None = False
+        self,
+        message: str,
+        level: int,
+        exc_info: bool | None = False,
+        extra: Mapping[str, object] | None = None,
     ) -> None:
         """Запись логов в файл с указанием имени кассы"""
         parent: "CashboxLayout" = self.parent()  # type: ignore
-        log_message = f"[Касса: {parent.name_edit.text()}]: {message}"
-        logging.getLogger().log(level, log_message, exc_info=exc_info)
+        logging.getLogger().log(
+            level,
+            message,
+            exc_info=exc_info,
+            extra={"cashbox": parent.name_edit.text(), **(extra or {})},
+        )
 
     def clear_logs(self) -> None:
         """Очищаем лог"""
-        self.log_box.clear()
+        with self._pending_lock:
+            self._pending.clear()
+        self.log_model.clear()
 
 
 class CashboxLogger:
+    """Лог вкладки. Строка собирается в потоке, который пишет лог, а не в GUI-потоке."""
+
     def __init__(self, log_widget: LogWidget) -> None:
         self.log_widget = log_widget
 
-    def info(self, msg: str) -> None:
+    @staticmethod
+    def _format(msg: str, args: tuple[object, ...]) -> str:
+        return msg % args if args else msg
+
+    def debug(
+        self, msg: str, *args: object, extra: Mapping[str, object] | None = None
+    ) -> None:
+        """Логирование уровня DEBUG, если он включен в настройках логов."""
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            self.log_widget.add_log(self._format(msg, args), logging.DEBUG, extra=extra)
+
+    def info(
+        self, msg: str, *args: object, extra: Mapping[str, object] | None = None
+    ) -> None:
         """Логирование уровня INFO."""
-        self.log_widget.add_log(msg, logging.INFO)
+        self.log_widget.add_log(self._format(msg, args), logging.INFO, extra=extra)
 
-    def warning(self, msg: str) -> None:
+    def warning(
+        self, msg: str, *args: object, extra: Mapping[str, object] | None = None
+    ) -> None:
         """Логирование уровня WARNING."""
-        self.log_widget.add_log(msg, logging.WARNING)
+        self.log_widget.add_log(self._format(msg, args), logging.WARNING, extra=extra)
 
-    def error(self, msg: str) -> None:
+    def error(
+        self, msg: str, *args: object, extra: Mapping[str, object] | None = None
+    ) -> None:
         """Логирование уровня ERROR."""
-        self.log_widget.add_log(msg, logging.ERROR)
+        self.log_widget.add_log(self._format(msg, args), logging.ERROR, extra=extra)
 
-    def exception(self, msg: str | Exception, exc_info: bool | None = True) -> None:
+    def exception(
+        self,
+        msg: str | Exception,
+        *args: object,
+        exc_info: bool | None = True,
+        extra: Mapping[str, object] | None = None,
+    ) -> None:
         """Логирование уровня ERROR."""
-        msg = str(msg) if isinstance(msg, Exception) else msg
-        self.log_widget.add_log(msg, logging.ERROR, exc_info=exc_info)
+        msg = str(msg) if isinstance(msg, Exception) else self._format(msg, args)
+        self.log_widget.add_log(msg, logging.ERROR, exc_info=exc_info, extra=extra)
@@ -1,6 +1,5 @@
 import json
 import logging
-import logging.handlers
 import os
 import sys
 from typing import Any, cast
@@ -10,7 +9,19 @@ from PySide6.QtGui import QCloseEvent, QColor, QPalette
 from PySide6.QtWidgets import QApplication, QMainWindow, QMessageBox
 
 from src.cashbox import Cashbox, CashboxManager
+from src.compression import CompressionSettings
+from src.config import (
+    CONFIG_FILE_NAME,
+    LOG_FILE_NAME,
+    get_data_dir,
+    load_config,
+    save_config,
+)
 from src.constants import ColorTheme
+from src.flow_control import FlowControlSettings
+from src.keepalive import KeepaliveSettings
+from src.log import LogSettings, setup_logging
+from src.reconnect import ReconnectPolicy
 from src.ui.cashbox_widget import CashboxLayout
 from src.ui.menu_widget import MenuBar
 from src.ui.tab_widget import TabWidget
@@ -24,15 +35,21 @@ class MainWindow(QMainWindow):
         self.app.setStyle("Fusion")
         self.setWindowTitle("Cashbox")
 
-        # Создаем экземпляр менеджера касс
-        self.cashbox_manager = CashboxManager()
-
         # Настраиваем конфиги
-        self._data_dir = self._get_data_dir_path()
-        self.config_file_path = os.path.join(self._data_dir, "config.json")
-        self.log_file_path = os.path.join(self._data_dir, "cashbox_client.log")
+        self._data_dir = get_data_dir()
+        self.config_file_path = os.path.join(self._data_dir, CONFIG_FILE_NAME)
+        self.log_file_path = os.path.join(self._data_dir, LOG_FILE_NAME)
         self.config = self._load_config()
-        self.setup_logging()
+        setup_logging(
+            self.log_file_path, LogSettings.from_dict(self.config.get("logging", {}))
+        )
+
+        # Создаем экземпляр менеджера касс
+        self.cashbox_manager = CashboxManager(
+            port_baud_rates=self.config.get("port_baud_rates", {})
+        )
+        # Начинаем подключаться к сохраненным кассам до создания вкладок
+        self.prewarm_cashboxes()
 
         self.menu_bar = MenuBar(self)
         self.setMenuBar(self.menu_bar)
@@ -52,50 +69,46 @@ class MainWindow(QMainWindow):
 
         self.set_theme(self.config.get("theme", ColorTheme.SYSTEM))
 
-    @staticmethod
-    def _get_data_dir_path() -> str:
-        app_data_dir = os.getenv("LOCALAPPDATA", os.path.expanduser("~"))
-        cashbox_data_dir = os.path.join(app_data_dir, "CashboxClient")
-
-        if not os.path.exists(cashbox_data_dir):
-            os.makedirs(cashbox_data_dir)
-
-        return cashbox_data_dir
-
     def _load_config(self) -> dict[str, Any]:
-        if not os.path.exists(self.config_file_path):
-            return {}
-
-        with open(self.config_file_path) as file:
-            try:
-                return json.load(file)  # type: ignore
-            except json.JSONDecodeError as e:
-                msg = "Парсинг конфиг файла не удался."
-                QMessageBox.warning(self, "Ошибка", msg)
-                logging.exception(f"{msg}: {e}", exc_info=True)
-                sys.exit(0)
-
-    def setup_logging(self) -> None:
-        """Настройка глобального логера для записи логов в файл"""
-        logging.basicConfig(
-            level=logging.INFO,
-            format="%(asctime)s [%(levelname)s] %(message)s",
-            handlers=[
-                logging.handlers.RotatingFileHandler(
-                    filename=self.log_file_path,
-                    maxBytes=1048576 * 5,  # 5 MB
-                    backupCount=7,
-                    encoding="utf-8",
-                ),
-                logging.StreamHandler(),
-            ],
-        )
+        try:
+            return load_config(self.config_file_path)
+        except json.JSONDecodeError as e:
+            msg = "Парсинг конфиг файла не удался."
+            QMessageBox.warning(self, "Ошибка", msg)
+            logging.exception(f"{msg}: {e}", exc_info=True)
+            sys.exit(0)
 
     def save_state(self) -> None:
         """Сохраняем текущее состояние приложения в файл config.json"""
         state = {
             "server": self.config.get("server", ""),  # Сохраняем адрес сервера
             "theme": self.config.get("theme", ColorTheme.SYSTEM),  # Сохраняем тему
+            # Сохраняем режим общего соединения с сервером
+            "multiplex": self.config.get("multiplex", False),
+            # Сохраняем размер очереди задач каждой кассы
+            "task_queue_size": self.config.get("task_queue_size", 20),
+            # Сохраняем параметры переподключения к серверу
+            "reconnect": ReconnectPolicy.from_dict(
+                self.config.get("reconnect", {})
+            ).to_dict(),
+            # Сохраняем разрешение бинарных кодировок сообщений
+            "binary_encoding": self.config.get("binary_encoding", True),
+            # Сохраняем параметры сжатия соединения с сервером
+            "compression": CompressionSettings.from_dict(
+                self.config.get("compression", {})
+            ).to_dict(),
+            # Сохраняем параметры проверки связи с сервером
+            "keepalive": KeepaliveSettings.from_dict(
+                self.config.get("keepalive", {})
+            ).to_dict(),
+            # Сохраняем параметры кредитного управления потоком задач
+            "flow_control": FlowControlSettings.from_dict(
+                self.config.get("flow_control", {})
+            ).to_dict(),
+            # Сохраняем параметры записи логов
+            "logging": LogSettings.from_dict(self.config.get("logging", {})).to_dict(),
+            # Скорости портов, на которых находились кассы
+            "port_baud_rates": self.cashbox_manager.get_port_baud_rates(),
             "tabs": [],
         }
 
@@ -107,13 +120,26 @@ class MainWindow(QMainWindow):
                 {
                     "name": tab.name_edit.text(),
                     "key": tab.key_edit.text(),
-                    "cashbox": tab.cashbox.to_dict() if tab.cashbox else None,
+                    "cashbox": (
+                        tab.configured_cashbox.to_dict()
+                        if tab.configured_cashbox
+                        else None
+                    ),
                 }
             )
 
         # Сохраняем в файл
-        with open(self.config_file_path, "w") as file:
-            json.dump(state, file, indent=4, ensure_ascii=False)
+        save_config(self.config_file_path, state)
+
+    def prewarm_cashboxes(self) -> None:
+        """Параллельно открываем в фоне соединения со всеми кассами из конфига"""
+        cashboxes = [
+            Cashbox.from_dict(tab_info["cashbox"])
+            for tab_info in self.config.get("tabs", [])
+            if tab_info.get("cashbox")
+        ]
+        if cashboxes:
+            self.cashbox_manager.prewarm(cashboxes)
 
     def load_state(self) -> bool:
         """Загружаем состояние приложения из конфига"""
@@ -161,6 +187,12 @@ class MainWindow(QMainWindow):
         self.config["server"] = address
         self.save_state()
 
+    def set_multiplex(self, enabled: bool) -> None:
+        """Включает общее соединение с сервером для всех вкладок"""
+        # Режим применяется к соединениям, открываемым после изменения настройки
+        self.config["multiplex"] = enabled
+        self.save_state()
+
     def apply_dark_theme(self) -> None:
         """Применяет темную тему"""
         palette = QPalette()
@@ -3,6 +3,7 @@ from typing import TYPE_CHECKING
 from PySide6.QtCore import Qt
 from PySide6.QtGui import QAction
 from PySide6.QtWidgets import (
+    QCheckBox,
     QComboBox,
     QDialog,
     QFormLayout,
@@ -15,6 +16,7 @@ from PySide6.QtWidgets import (
 )
 
 from src.constants import ColorTheme
+from src.ui.log_viewer import LogViewerDialog
 
 if TYPE_CHECKING:
     from src.ui.main_window import MainWindow
@@ -27,16 +29,22 @@ class MenuBar(QMenuBar):
 
         self._server_input: QLineEdit | None = None
         self._theme_dropdown: QComboBox | None = None
+        self._multiplex_check_box: QCheckBox | None = None
+        # Окно просмотра логов одно на приложение: его индекс логов не строится заново
+        self._log_viewer: LogViewerDialog | None = None
 
         self.menu = self.addMenu("Настройки")
 
         # Добавляем действия
         self.settings_action = QAction("Настройки", self)
         self.settings_action.triggered.connect(self.show_settings_dialog)
+        self.log_viewer_action = QAction("Просмотр логов", self)
+        self.log_viewer_action.triggered.connect(self.show_log_viewer)
         self.about_action = QAction("О программе", self)
         self.about_action.triggered.connect(self.show_about_info)
 
         self.menu.addAction(self.settings_action)
+        self.menu.addAction(self.log_viewer_action)
         self.menu.addAction(self.about_action)
 
     @property
@@ -59,6 +67,16 @@ class MenuBar(QMenuBar):
     def theme_dropdown(self, value: QComboBox) -> None:
         self._theme_dropdown = value
 
+    @property
+    def multiplex_check_box(self) -> QCheckBox:
+        if self._multiplex_check_box is None:
+            raise ValueError("multiplex_check_box is not set")
+        return self._multiplex_check_box
+
+    @multiplex_check_box.setter
+    def multiplex_check_box(self, value: QCheckBox) -> None:
+        self._multiplex_check_box = value
+
     def parent(self) -> "MainWindow":
         return super().parent()  # type: ignore
 
@@ -74,6 +92,13 @@ class MenuBar(QMenuBar):
         self.server_input.setFixedWidth(250)
         layout.addRow("Адрес сервера:", self.server_input)
 
+        # Общее соединение для всех касс вместо отдельного на каждую вкладку
+        self.multiplex_check_box = QCheckBox(self)
+        self.multiplex_check_box.setChecked(
+            bool(self.parent().config.get("multiplex", False))
+        )
+        layout.addRow("Общее соединение:", self.multiplex_check_box)
+
         # Добавляем выбор темы
         theme_label = QLabel("Тема:")
         self.theme_dropdown = QComboBox(self)
@@ -95,6 +120,15 @@ class MenuBar(QMenuBar):
         dialog.setLayout(layout)
         dialog.exec()
 
+    def show_log_viewer(self) -> None:
+        """Открываем окно поиска по логам. Оно не блокирует работу с вкладками."""
+        if self._log_viewer is None:
+            self._log_viewer = LogViewerDialog(self.parent())
+        else:
+            self._log_viewer.search()
+        self._log_viewer.show()
+        self._log_viewer.raise_()
+
     def show_about_info(self) -> None:
         """Открываем модальное окно для вывода полезной информации."""
         dialog = QDialog(self)
@@ -129,6 +163,7 @@ class MenuBar(QMenuBar):
     def accept_dialog(self, dialog: QDialog) -> None:
         server_value = self.server_input.text()
         self.parent().set_server_address(server_value)
+        self.parent().set_multiplex(self.multiplex_check_box.isChecked())
 
         selected_theme = self.theme_dropdown.currentText()
         if selected_theme == "Светлая":
@@ -1,15 +1,459 @@
+import asyncio
+import logging
 import threading
-from collections.abc import Callable
-from logging import Logger
-from typing import Any
+from collections.abc import Callable, Coroutine
+from concurrent.futures import Future
+from typing import Any, TypeVar
 
-import websocket
+from websockets.asyncio.client import ClientConnection, connect
+from websockets.exceptions import ConnectionClosed, NegotiationError
 
-from src.errors import NotConnectedToServer
-from src.ui.log_widget import CashboxLogger
+from src import errors
+from src.compression import CompressionSettings, CompressionStats
+from src.encoding import JSON, MessageEncoding, get_encoding, offered_subprotocols
+from src.keepalive import Heartbeat, KeepaliveSettings, RttStats
+from src.log import LogPayload, TaskLogger
+from src.outbox import Outbox
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+FEATURES_HEADER = "X-Cashbox-Features"  # Возможности протокола клиента и сервера
+BATCH_FEATURE = "batch"  # Сервер принимает пакеты результатов
+ACK_FEATURE = "ack"  # Сервер подтверждает сообщения и поддерживает возобновление
+CREDIT_FEATURE = "credit"  # Сервер присылает задачи в пределах выданных кассой кредитов
+CLIENT_FEATURES = f"{BATCH_FEATURE},{ACK_FEATURE},{CREDIT_FEATURE}"
+
+
+def _server_features(ws: ClientConnection) -> set[str]:
+    """Возможности, которые сервер подтвердил в ответе на рукопожатие"""
+    if ws.response is None:
+        return set()
+    value = ws.response.headers.get(FEATURES_HEADER, "")
+    return {feature.strip() for feature in value.split(",") if feature.strip()}
+
+
+async def _open_connection(
+    server_address: str,
+    compression: CompressionSettings | None,
+    binary_encoding: bool = True,
+) -> tuple[ClientConnection, CompressionStats]:
+    """Открывает соединение, предлагая серверу сжатие permessage-deflate
+    и кодировки сообщений в виде подпротоколов.
+
+    Если сервер не поддерживает сжатие, соединение работает без него.
+    Если сервер отверг предложенные параметры, подключаемся еще раз без сжатия.
+    Если сервер не выбрал подпротокол, сообщения передаются в JSON.
+    Встроенный keepalive выключен: связь проверяет `Heartbeat`.
+    """
+    options: dict[str, Any] = {
+        "ping_interval": None,
+        "ping_timeout": None,
+        "compression": None,
+        "additional_headers": {FEATURES_HEADER: CLIENT_FEATURES},
+        "subprotocols": offered_subprotocols(binary_encoding),
+    }
+    stats = CompressionStats()
+    if compression is not None and compression.enabled:
+        try:
+            ws = await connect(
+                server_address,
+                extensions=[compression.create_factory(stats)],
+                **options,
+            )
+            return ws, stats
+        except NegotiationError as e:
+            logger.warning(
+                f"Сервер отклонил параметры сжатия, подключаемся без него: {e}"
+            )
+
+    return await connect(server_address, **options), stats
+
+
+class EventLoopThread:
+    """Общий цикл событий asyncio, в котором работают все соединения с сервером.
+
+    Вместо отдельного потока на каждое соединение все вкладки обслуживаются
+    одним потоком. Обработчики сообщений вызываются прямо в нем, поэтому
+    они не должны блокироваться: задачи кассы выполняются в ее очереди.
+    """
+
+    _instance: "EventLoopThread | None" = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self) -> None:
+        self.loop = asyncio.new_event_loop()
+        self._background_tasks: set[asyncio.Task[None]] = set()
+        self._thread = threading.Thread(
+            target=self._run, name="ws-event-loop", daemon=True
+        )
+        self._thread.start()
+
+    @classmethod
+    def get(cls) -> "EventLoopThread":
+        """Возвращает общий цикл событий, запуская его при первом обращении"""
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = EventLoopThread()
+            return cls._instance
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def in_loop_thread(self) -> bool:
+        return threading.current_thread() is self._thread
+
+    def submit(self, coro: Coroutine[Any, Any, T]) -> Future[T]:
+        """Запускает корутину в цикле событий из любого потока"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Coroutine[Any, Any, None], timeout: float) -> None:
+        """Выполняет корутину и ждет ее завершения.
+
+        В самом потоке цикла событий ждать нельзя, поэтому там корутина
+        только планируется к выполнению.
+        """
+        if self.in_loop_thread():
+            task = self.loop.create_task(coro)
+            self._background_tasks.add(task)
+            task.add_done_callback(self._on_background_task_done)
+            return
+
+        self.submit(coro).result(timeout=timeout)
+
+    def _on_background_task_done(self, task: "asyncio.Task[None]") -> None:
+        self._background_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Ошибка в фоновой задаче соединения: {task.exception()}")
+
+
+class OutboxWriter:
+    """Единственный писатель соединения.
+
+    Забирает сообщения из очередей отправки подключенных вкладок и пишет их
+    в соединение по одному кадру за раз. Если сервер поддерживает пакеты,
+    несколько мелких сообщений объединяются в один кадр
+    `{"type": "batch", "items": [...]}`. Сообщения кодируются в формат,
+    согласованный с сервером. Сообщение удаляется из очереди только
+    после записи кадра, поэтому при разрыве связи оно уйдет после
+    переподключения.
+
+    Если сервер подтверждает сообщения, к каждому добавляется номер `seq`,
+    а неподтвержденные на прошлом соединении сообщения отправляются первыми.
+    """
+
+    MAX_BATCH_ITEMS = 50  # Сообщений в одном пакете
+    MAX_BATCH_BYTES = 64 * 1024  # Размер пакета, после которого он отправляется
+
+    def __init__(self, ws: ClientConnection, multiplexed: bool = False) -> None:
+        features = _server_features(ws)
+        self.batching = BATCH_FEATURE in features
+        self.acks = ACK_FEATURE in features
+        self.encoding = get_encoding(ws.subprotocol)
+        self._ws = ws
+        self._multiplexed = multiplexed
+        self._loop = asyncio.get_running_loop()
+        self._ready = asyncio.Event()
+        # Очереди по ключу соединения, меняются только в потоке цикла событий
+        self._outboxes: dict[str, Outbox] = {}
+        self._next = 0  # С какой очереди начинать следующий кадр
+
+    def add(self, key: str, outbox: Outbox) -> None:
+        replayed = outbox.rewind()
+        if replayed:
+            logger.info(f"Повторная отправка неподтвержденных сообщений: {replayed}")
+        self._outboxes[key] = outbox
+        outbox.set_waker(self.wake)
+
+    def remove(self, key: str) -> None:
+        outbox = self._outboxes.pop(key, None)
+        if outbox is not None:
+            outbox.clear_waker(self.wake)
+
+    def wake(self) -> None:
+        """Будит писателя. Можно вызывать из любого потока."""
+        self._loop.call_soon_threadsafe(self._ready.set)
+
+    async def run(self) -> None:
+        try:
+            while True:
+                await self._ready.wait()
+                self._ready.clear()
+                while await self._write_frame():
+                    pass
+        except ConnectionClosed:
+            pass
+        finally:
+            for key in list(self._outboxes):
+                self.remove(key)
+
+    async def _write_frame(self) -> bool:
+        """Отправляет один кадр. Возвращает False, если все очереди пусты."""
+        max_items = self.MAX_BATCH_ITEMS if self.batching else 1
+        size = 0
+        taken: list[tuple[Outbox, int]] = []
+        encoded: list[bytes] = []
+
+        # Обходим очереди по кругу, чтобы одна вкладка не задерживала другие
+        keys = list(self._outboxes)
+        for i in range(len(keys)):
+            if len(encoded) >= max_items or size >= self.MAX_BATCH_BYTES:
+                break
+            key = keys[(self._next + i) % len(keys)]
+            outbox = self._outboxes[key]
+            count = 0
+            for entry in outbox.peek(max_items - len(encoded)):
+                message = entry.message
+                if self.acks:
+                    message = {**message, "seq": entry.seq}
+                if self._multiplexed:
+                    message = {"key": key, **message}
+                data = self.encoding.encode(message)
+                # Первое сообщение отправляем, даже если оно больше пакета
+                if encoded and size + len(data) > self.MAX_BATCH_BYTES:
+                    break
+                encoded.append(data)
+                size += len(data)
+                count += 1
+            if count:
+                taken.append((outbox, count))
+        self._next += 1
+
+        if not encoded:
+            return False
+
+        if len(encoded) == 1:
+            frame = encoded[0]
+        else:
+            frame = self.encoding.encode_batch(encoded)
+        await self._ws.send(frame, text=self.encoding.text)
+
+        for outbox, count in taken:
+            outbox.commit(count, wait_ack=self.acks)
+        return True
+
+
+class MultiplexedConnection:
+    """Одно соединение с сервером, по которому идут задачи для многих касс.
+
+    Каждое сообщение содержит поле `key` с ключом соединения вкладки.
+    Входящие задачи раздаются клиентам по этому ключу, а к исходящим
+    результатам ключ добавляется. Набор ключей сообщается серверу
+    сообщениями `subscribe` и `unsubscribe`.
+    """
+
+    _instances: dict[str, "MultiplexedConnection"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(
+        self,
+        server_address: str,
+        compression: CompressionSettings | None = None,
+        binary_encoding: bool = True,
+        keepalive: KeepaliveSettings | None = None,
+    ) -> None:
+        self.server_address = server_address
+        self.compression = compression
+        self.compression_stats = CompressionStats()
+        self.keepalive = keepalive or KeepaliveSettings()
+        self.rtt_stats = RttStats()
+        self.server_features: set[str] = set()
+        self.binary_encoding = binary_encoding
+        self.encoding: MessageEncoding = JSON
+        self.connected = False
+
+        self._loop_thread = EventLoopThread.get()
+        self._ws: ClientConnection | None = None
+        self._task: Future[None] | None = None
+        self._writer: OutboxWriter | None = None
+        # Клиенты меняются только в потоке цикла событий
+        self._clients: dict[str, "WebSocketClient"] = {}
+        # Ключи занимаются сразу при подключении клиента, под блокировкой
+        self._keys: dict[str, "WebSocketClient"] = {}
+        self._keys_lock = threading.Lock()
+
+    @classmethod
+    def get(
+        cls,
+        server_address: str,
+        compression: CompressionSettings | None = None,
+        binary_encoding: bool = True,
+        keepalive: KeepaliveSettings | None = None,
+    ) -> "MultiplexedConnection":
+        """Возвращает общее соединение с сервером по его адресу.
+
+        Параметры сжатия, кодировки и проверки связи применяются
+        при следующем открытии соединения.
+        """
+        with cls._instances_lock:
+            if server_address not in cls._instances:
+                cls._instances[server_address] = MultiplexedConnection(server_address)
+            instance = cls._instances[server_address]
+            instance.compression = compression
+            instance.binary_encoding = binary_encoding
+            instance.keepalive = keepalive or KeepaliveSettings()
+            return instance
+
+    def attach(self, client: "WebSocketClient") -> None:
+        """Подключает клиента к общему соединению, открывая его при необходимости.
+
+        Ключ соединения занимается под блокировкой, поэтому две вкладки не могут
+        подключиться с одним ключом: вторая получает `ConnectionKeyInUse`.
+        """
+        key = client.connection_key or ""
+        with self._keys_lock:
+            if self._keys.get(key, client) is not client:
+                raise errors.ConnectionKeyInUse(
+                    f"Ключ соединения {key} уже используется."
+                )
+            self._keys[key] = client
+        self._loop_thread.loop.call_soon_threadsafe(self._attach, client)
+
+    def detach(self, client: "WebSocketClient") -> None:
+        """Отключает клиента. Соединение без клиентов закрывается."""
+        self._loop_thread.submit(self._detach(client)).result(
+            timeout=WebSocketClient.CLOSE_TIMEOUT
+        )
+
+    def _attach(self, client: "WebSocketClient") -> None:
+        key = client.connection_key or ""
+        self._clients[key] = client
+
+        if self.connected and self._ws is not None:
+            self._loop_thread.run(
+                self._subscribe([key]), timeout=WebSocketClient.SEND_TIMEOUT
+            )
+            if self._writer is not None:
+                self._writer.add(key, client.outbox)
+            client.on_open()
+        elif self._task is None or self._task.done():
+            self._task = self._loop_thread.submit(self.run_forever())
+
+    async def _detach(self, client: "WebSocketClient") -> None:
+        key = client.connection_key or ""
+        if self._clients.get(key) is not client:
+            return
+
+        del self._clients[key]
+        with self._keys_lock:
+            del self._keys[key]
+        if self._writer is not None:
+            self._writer.remove(key)
+
+        if not self._clients:
+            if self._ws is not None:
+                await self._ws.close()
+            if self._task is not None:
+                self._task.cancel()
+        elif self.connected:
+            await self._send_control("unsubscribe", [key])
+
+    async def run_forever(self) -> None:
+        """Обслуживаем общее соединение до его закрытия"""
+        try:
+            ws, self.compression_stats = await _open_connection(
+                self.server_address, self.compression, self.binary_encoding
+            )
+            async with ws:
+                self._ws = ws
+                self.encoding = get_encoding(ws.subprotocol)
+                self.server_features = _server_features(ws)
+                self.connected = True
+                heartbeat = Heartbeat(ws, self.keepalive)
+                self.rtt_stats = heartbeat.stats
+                heartbeat_task = asyncio.create_task(heartbeat.run())
+                await self._subscribe(list(self._clients))
+
+                # Результаты пишутся после подписки, чтобы сервер знал их ключи
+                self._writer = OutboxWriter(ws, multiplexed=True)
+                for key, client in self._clients.items():
+                    self._writer.add(key, client.outbox)
+                writer_task = asyncio.create_task(self._writer.run())
+
+                for client in list(self._clients.values()):
+                    client.on_open()
+                try:
+                    async for message in ws:
+                        heartbeat.touch()
+                        self._route(message)
+                except ConnectionClosed:
+                    pass
+                finally:
+                    writer_task.cancel()
+                    heartbeat_task.cancel()
+                    self._writer = None
+            self._notify_closed(lambda c: c.on_close(ws.close_code, ws.close_reason))
+        except asyncio.CancelledError:
+            self.connected = False
+            raise
+        except Exception as e:
+            error = str(e)
+            self._notify_closed(lambda c: c.on_error(error))
+
+    def _notify_closed(self, notify: Callable[["WebSocketClient"], Any]) -> None:
+        self.connected = False
+        self._ws = None
+        for client in list(self._clients.values()):
+            notify(client)
+
+    def _route(self, message: str | bytes) -> None:
+        """Передает задачу клиенту, которому она адресована"""
+        try:
+            task = self.encoding.decode(message)
+            key = task.pop("key")
+        except (ValueError, KeyError, AttributeError, TypeError):
+            logger.warning(
+                "Получено сообщение без ключа соединения: %s", LogPayload(message)
+            )
+            return
+
+        client = self._clients.get(key)
+        if client is None:
+            logger.warning(f"Получена задача для неизвестного ключа соединения: {key}")
+            return
+
+        client.on_message(task)
+
+    async def _subscribe(self, keys: list[str]) -> None:
+        if keys:
+            await self._send_control("subscribe", keys)
+
+    async def _send_control(self, message_type: str, keys: list[str]) -> None:
+        if self._ws is None:
+            return
+        try:
+            await self._ws.send(
+                self.encoding.encode({"type": message_type, "keys": keys}),
+                text=self.encoding.text,
+            )
+        except ConnectionClosed:
+            pass
 
 
 class WebSocketClient:
+    """Соединение вкладки с сервером.
+
+    Если задан `connection_key`, клиент работает в мультиплексированном режиме:
+    `server_address` указывает на общий адрес, а задачи и результаты идут
+    через одно на всех вкладок соединение `MultiplexedConnection`.
+
+    Исходящие сообщения ставятся в очередь `outbox`, которую разбирает
+    писатель соединения. Если очередь передана вкладкой, она переживает
+    переподключение вместе с неотправленными сообщениями.
+
+    Сообщения передаются в виде объектов: клиент сам кодирует и разбирает их
+    в формате, согласованном с сервером (`binary_encoding` разрешает
+    предлагать бинарные кодировки).
+
+    Связь с сервером проверяется пингами по параметрам `keepalive`,
+    замеры RTT доступны в `rtt_stats`.
+    """
+
+    SEND_TIMEOUT = 10  # Секунды на отправку одного сообщения
+    CLOSE_TIMEOUT = 5  # Секунды на корректное закрытие соединения
+
     def __init__(
         self,
         server_address: str,
@@ -17,13 +461,29 @@ class WebSocketClient:
         on_open_callback: Callable[[], Any],
         on_error_callback: Callable[[str], Any],
         on_close_callback: Callable[[str], Any],
-        logger: CashboxLogger | Logger,
+        logger: TaskLogger,
+        connection_key: str | None = None,
+        outbox: Outbox | None = None,
+        compression: CompressionSettings | None = None,
+        binary_encoding: bool = True,
+        keepalive: KeepaliveSettings | None = None,
     ) -> None:
         self.server_address = server_address
+        self.connection_key = connection_key
+        self.outbox = outbox if outbox is not None else Outbox()
+        self.compression = compression
+        self.binary_encoding = binary_encoding
+        self.keepalive = keepalive or KeepaliveSettings()
+        self._compression_stats = CompressionStats()
+        self._rtt_stats = RttStats()
+        self._server_features: set[str] = set()
+        self._encoding: MessageEncoding = JSON
         self.connected = False
+        self._multiplexed: MultiplexedConnection | None = None
 
-        self.__ws: websocket.WebSocketApp | None = None
-        self.__ws_thread: threading.Thread | None = None
+        self.__ws: ClientConnection | None = None
+        self._loop_thread = EventLoopThread.get()
+        self._task: Future[None] | None = None
         self._on_message_callback = on_message_callback
         self._on_open_callback = on_open_callback
         self._on_error_callback = on_error_callback
@@ -32,87 +492,155 @@ class WebSocketClient:
         self.logger = logger
 
     @property
-    def _ws(self) -> websocket.WebSocketApp:
+    def compression_stats(self) -> CompressionStats:
+        """Статистика сжатия текущего соединения"""
+        if self._multiplexed is not None:
+            return self._multiplexed.compression_stats
+        return self._compression_stats
+
+    @property
+    def rtt_stats(self) -> RttStats:
+        """Замеры RTT текущего соединения"""
+        if self._multiplexed is not None:
+            return self._multiplexed.rtt_stats
+        return self._rtt_stats
+
+    @property
+    def server_features(self) -> set[str]:
+        """Возможности протокола, подтвержденные сервером"""
+        if self._multiplexed is not None:
+            return self._multiplexed.server_features
+        return self._server_features
+
+    @property
+    def encoding(self) -> MessageEncoding:
+        """Кодировка сообщений, согласованная с сервером"""
+        if self._multiplexed is not None:
+            return self._multiplexed.encoding
+        return self._encoding
+
+    @property
+    def _ws(self) -> ClientConnection:
         if self.__ws is None:
             raise ValueError("_ws is not set")
         return self.__ws
 
     @_ws.setter
-    def _ws(self, value: websocket.WebSocketApp) -> None:
+    def _ws(self, value: ClientConnection) -> None:
         self.__ws = value
 
-    @property
-    def _ws_thread(self) -> threading.Thread:
-        if self.__ws_thread is None:
-            raise ValueError("_ws_thread is not set")
-        return self.__ws_thread
-
-    @_ws_thread.setter
-    def _ws_thread(self, value: threading.Thread) -> None:
-        self.__ws_thread = value
-
     def connect(self) -> None:
-        """Открываем WebSocket соединение в отдельном потоке"""
-        if self.connected:
+        """Открываем WebSocket соединение в общем цикле событий"""
+        if self.connected or (self._task is not None and not self._task.done()):
             return
 
-        self._ws = websocket.WebSocketApp(
-            self.server_address,
-            on_open=self.on_open,
-            on_message=self.on_message,
-            on_close=self.on_close,
-            on_error=self.on_error,
-        )
+        if self.connection_key is not None:
+            self._multiplexed = MultiplexedConnection.get(
+                self.server_address,
+                self.compression,
+                self.binary_encoding,
+                self.keepalive,
+            )
+            self._multiplexed.attach(self)
+            return
 
-        self._ws_thread = threading.Thread(target=self.run_forever, daemon=True)
-        self._ws_thread.start()
+        self._task = self._loop_thread.submit(self.run_forever())
 
-    def run_forever(self) -> None:
-        """Запускаем WebSocket с обработкой ошибок и безопасным завершением"""
+    async def run_forever(self) -> None:
+        """Обслуживаем соединение до его закрытия с обработкой ошибок"""
         try:
-            self._ws.run_forever(ping_interval=30, ping_timeout=10)
+            ws, self._compression_stats = await _open_connection(
+                self.server_address, self.compression, self.binary_encoding
+            )
+            async with ws:
+                self._ws = ws
+                self._encoding = get_encoding(ws.subprotocol)
+                self._server_features = _server_features(ws)
+                heartbeat = Heartbeat(ws, self.keepalive)
+                self._rtt_stats = heartbeat.stats
+                heartbeat_task = asyncio.create_task(heartbeat.run())
+                writer = OutboxWriter(ws)
+                writer.add("", self.outbox)
+                writer_task = asyncio.create_task(writer.run())
+                self.on_open()
+                try:
+                    async for message in ws:
+                        heartbeat.touch()
+                        self.on_message(self._decode(message))
+                except ConnectionClosed:
+                    pass
+                finally:
+                    writer_task.cancel()
+                    heartbeat_task.cancel()
+            self.on_close(ws.close_code, ws.close_reason)
+        except asyncio.CancelledError:
+            self.connected = False
+            raise
         except Exception as e:
-            self.on_error(self._ws.sock, str(e))
+            self.on_error(str(e))
 
-    def on_open(self, ws: websocket.WebSocket) -> None:
-        """Вызывается при получении сообщения от сервера"""
+    def on_open(self) -> None:
+        """Вызывается при установке соединения с сервером"""
         self.connected = True
         self._on_open_callback()
 
-    def on_message(self, ws: websocket.WebSocket, message: Any) -> None:
-        """Вызывается при получении сообщения от сервера"""
+    def _decode(self, message: str | bytes) -> Any:
+        """Разбирает кадр сервера. Для невалидного кадра возвращает None."""
+        try:
+            return self._encoding.decode(message)
+        except ValueError as e:
+            self.logger.error(f"Не удалось разобрать сообщение от сервера: {e}")
+            return None
+
+    def on_message(self, message: Any) -> None:
+        """Вызывается в потоке цикла событий с разобранным сообщением от сервера.
+
+        Подтверждения сервера обрабатываются здесь и дальше не передаются.
+        """
+        if isinstance(message, dict) and message.get("type") == "ack":
+            try:
+                self.outbox.ack(int(message["seq"]))
+            except (KeyError, TypeError, ValueError):
+                self.logger.error(f"Невалидное подтверждение от сервера: {message}")
+            return
+
         self._on_message_callback(message)
 
-    def on_close(
-        self, ws: websocket.WebSocket, close_status_code: int, close_msg: str
-    ) -> None:
+    def on_close(self, close_status_code: int | None, close_msg: str | None) -> None:
         """Вызывается при закрытии соединения"""
         self.connected = False
         self._on_close_callback(f"code: {close_status_code}, reason: {close_msg}")
 
-    def on_error(self, ws: websocket.WebSocket | None, err_msg: Any) -> None:
+    def on_error(self, err_msg: Any) -> None:
         """Обработка ошибки при соединении"""
         self.connected = False
         self._on_error_callback(str(err_msg))
 
     def close(self) -> None:
-        """Закрываем соединение и безопасно завершаем поток"""
+        """Закрываем соединение и останавливаем его обслуживание"""
+        if self._multiplexed is not None:
+            try:
+                self._multiplexed.detach(self)
+            except Exception as e:
+                self.logger.exception(
+                    f"Ошибка при отключении от общего соединения: {e}"
+                )
+            self.connected = False
+            return
+
         try:
-            if self._ws:
-                self._ws.close()
+            if self.__ws is not None:
+                self._loop_thread.submit(self.__ws.close()).result(
+                    timeout=self.CLOSE_TIMEOUT
+                )
         except Exception as e:
             self.logger.exception(f"Ошибка при закрытии WebSocket: {e}")
 
-        try:
-            if self._ws_thread:
-                self._ws_thread.join()
-        except Exception as e:
-            self.logger.error(f"Ошибка при завершении потока с WebSocket: {e}")
+        if self._task is not None:
+            self._task.cancel()
 
         self.connected = False
 
-    def send(self, message: str) -> None:
-        if not self.connected:
-            raise NotConnectedToServer("Нет подключения к серверу")
-
-        self._ws.send(message.encode("utf-8"))
+    def send(self, message: Any) -> None:
+        """Ставим сообщение в очередь отправки. Можно вызывать из любого потока."""
+        self.outbox.put(message)
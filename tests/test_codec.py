@@ -0,0 +1,69 @@
+import json
+import os
+
+import pytest
+
+from src import codec
+
+TASK = {
+    "type": "sell",
+    "taxationType": "osn",
+    "operator": {"name": "Иванов"},
+    "items": [
+        {"type": "position", "name": "Товар «1»", "price": 99.9, "quantity": 1.5},
+        {"type": "position", "name": 'Tab\tи "кавычки"', "price": 0, "quantity": 3},
+    ],
+    "payments": [{"type": "cash", "sum": 149.85}],
+    "electronically": False,
+    "clientInfo": None,
+}
+
+BACKENDS = ["json", "orjson", "msgspec"]
+
+
+@pytest.fixture(params=BACKENDS)
+def backend(request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch) -> str:
+    """Подменяет бэкенд кодека на выбранный через CASHBOX_JSON_CODEC"""
+    if request.param != "json":
+        pytest.importorskip(request.param)
+    monkeypatch.setenv("CASHBOX_JSON_CODEC", request.param)
+    name, dumps, loads = codec._select_backend()
+    monkeypatch.setattr(codec, "_fast_dumps", dumps)
+    monkeypatch.setattr(codec, "_fast_loads", loads)
+    return name
+
+
+def test_driver_payload_matches_json_dumps(backend: str) -> None:
+    assert codec.dumps_driver(TASK) == json.dumps(TASK)
+
+
+def test_requested_backend_is_selected(backend: str) -> None:
+    assert backend == os.environ["CASHBOX_JSON_CODEC"]
+
+
+def test_unavailable_backend_falls_back_to_json(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setenv("CASHBOX_JSON_CODEC", "simdjson")
+    name, _, _ = codec._select_backend()
+    assert name == "json"
+
+
+def test_dumps_is_compact_utf8(backend: str) -> None:
+    data = codec.dumps({"name": "Касса", "sum": 1})
+    assert data == '{"name":"Касса","sum":1}'.encode()
+
+
+def test_round_trip(backend: str) -> None:
+    assert codec.loads(codec.dumps(TASK)) == TASK
+    assert codec.loads(codec.dumps(TASK).decode()) == TASK
+
+
+def test_dumps_falls_back_for_big_integers(backend: str) -> None:
+    number = 2**70
+    assert codec.loads(codec.dumps({"number": number})) == {"number": number}
+
+
+def test_loads_raises_json_decode_error(backend: str) -> None:
+    with pytest.raises(json.JSONDecodeError):
+        codec.loads(b"{not json")
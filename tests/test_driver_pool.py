@@ -0,0 +1,123 @@
+import time
+
+from src.driver_pool import DriverPool
+
+
+class FakeDriver:
+    def __init__(self) -> None:
+        self.opened = True
+
+    def isOpened(self) -> bool:
+        return self.opened
+
+    def close(self) -> int:
+        self.opened = False
+        return 0
+
+
+def fill(pool: DriverPool, count: int) -> dict[str, FakeDriver]:
+    drivers = {}
+    for number in range(count):
+        serial_number = f"{number:04}"
+        drivers[serial_number] = FakeDriver()
+        pool.put(serial_number, f"COM{number}", drivers[serial_number])  # type: ignore[arg-type]
+    return drivers
+
+
+def test_take_returns_pooled_driver_once() -> None:
+    pool = DriverPool()
+    try:
+        drivers = fill(pool, 1)
+
+        assert pool.take("0000", "COM0") is drivers["0000"]  # type: ignore[comparison-overlap]
+        assert pool.take("0000", "COM0") is None
+        assert drivers["0000"].opened
+    finally:
+        pool.clear()
+
+
+def test_take_closes_driver_on_another_port() -> None:
+    pool = DriverPool()
+    try:
+        drivers = fill(pool, 1)
+
+        assert pool.take("0000", "COM9") is None
+        assert not drivers["0000"].opened
+    finally:
+        pool.clear()
+
+
+def test_put_closes_replaced_driver() -> None:
+    pool = DriverPool()
+    try:
+        old = fill(pool, 1)["0000"]
+        new = FakeDriver()
+        pool.put("0000", "COM0", new)  # type: ignore[arg-type]
+        pool.put("0000", "COM0", new)  # type: ignore[arg-type]
+
+        assert not old.opened
+        assert new.opened  # То же соединение повторно не закрывается
+        assert len(pool) == 1
+    finally:
+        pool.clear()
+
+
+def test_overflow_evicts_oldest_driver() -> None:
+    pool = DriverPool(max_size=2)
+    try:
+        drivers = fill(pool, 3)
+
+        assert "0000" not in pool
+        assert not drivers["0000"].opened
+        assert "0001" in pool and "0002" in pool
+    finally:
+        pool.clear()
+
+
+def test_reserved_drivers_survive_eviction() -> None:
+    pool = DriverPool(max_size=2)
+    try:
+        for serial_number in ("0000", "0001", "0002"):
+            pool.reserve(serial_number)
+        drivers = fill(pool, 4)
+
+        # Пул переполнен зарезервированными, вытесняется только незарезервированное
+        assert len(pool) == 3
+        assert "0003" not in pool and not drivers["0003"].opened
+        assert all(drivers[serial_number].opened for serial_number in ("0000", "0001"))
+
+        # Снятое резервирование снова позволяет вытеснить соединение
+        pool.unreserve("0001")
+        pool.put("0004", "COM4", FakeDriver())  # type: ignore[arg-type]
+        assert "0001" not in pool and not drivers["0001"].opened
+        assert "0000" in pool and "0002" in pool
+    finally:
+        pool.clear()
+
+
+def test_idle_drivers_are_reaped() -> None:
+    pool = DriverPool(idle_timeout=0.05)
+    try:
+        pool.reserve("0000")
+        drivers = fill(pool, 2)
+
+        deadline = time.monotonic() + 2
+        while len(pool) and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        assert len(pool) == 0
+        assert not any(driver.opened for driver in drivers.values())
+    finally:
+        pool.clear()
+
+
+def test_reap_keeps_fresh_drivers() -> None:
+    pool = DriverPool(idle_timeout=60)
+    try:
+        drivers = fill(pool, 2)
+        pool.reap()
+
+        assert len(pool) == 2
+        assert all(driver.opened for driver in drivers.values())
+    finally:
+        pool.clear()
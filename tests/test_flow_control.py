@@ -0,0 +1,83 @@
+from types import SimpleNamespace
+
+from src.bridge import TaskBridge
+from src.flow_control import FlowControlSettings
+from src.ws_client import ACK_FEATURE, CREDIT_FEATURE
+
+
+class NullLogger:
+    def debug(self, msg: str, *args: object, **kwargs: object) -> None:
+        pass
+
+    info = warning = error = exception = debug
+
+
+def send_all(bridge: TaskBridge) -> None:
+    """Отправляет все сообщения очереди, как писатель соединения с подтверждениями"""
+    entries = bridge.outbox.peek(100)
+    bridge.outbox.commit(len(entries), wait_ack=True)
+
+
+def queued_credits(bridge: TaskBridge) -> list[int]:
+    return [
+        entry.message["grant"]
+        for entry in bridge.outbox.peek(100)
+        if entry.message.get("type") == "credit"
+    ]
+
+
+def test_credits_are_not_replayed_after_reconnect() -> None:
+    bridge = TaskBridge(
+        name="test",
+        logger=NullLogger(),
+        get_cashbox=lambda: None,
+        queue_size=5,
+        flow_control=FlowControlSettings(min_credits=2),
+    )
+    client = SimpleNamespace(server_features={ACK_FEATURE, CREDIT_FEATURE})
+    try:
+        bridge.on_connection_open(client)  # type: ignore[arg-type]
+        assert queued_credits(bridge) == [2]
+        send_all(bridge)  # Выдача отправлена, но сервер не успел подтвердить
+
+        bridge.on_connection_closed()
+        bridge.outbox.rewind()  # Новое соединение
+        bridge.on_connection_open(client)  # type: ignore[arg-type]
+
+        assert queued_credits(bridge) == [2]
+        assert bridge.credits.stats().available == 2
+    finally:
+        bridge.stop()
+
+
+def test_results_are_still_replayed_after_reconnect() -> None:
+    bridge = TaskBridge(
+        name="test", logger=NullLogger(), get_cashbox=lambda: None, queue_size=5
+    )
+    try:
+        bridge.send({"status": "success", "number": 1, "data": ""})
+        send_all(bridge)
+
+        assert bridge.outbox.rewind() == 1
+        assert bridge.outbox.peek(100)[0].message["number"] == 1
+    finally:
+        bridge.stop()
+
+
+def test_resume_is_not_replayed_after_reconnect() -> None:
+    bridge = TaskBridge(
+        name="test", logger=NullLogger(), get_cashbox=lambda: None, queue_size=5
+    )
+    client = SimpleNamespace(server_features={ACK_FEATURE})
+    try:
+        bridge.on_connection_open(client)  # type: ignore[arg-type]
+        send_all(bridge)  # Сервер не успел подтвердить resume
+
+        bridge.on_connection_closed()
+        bridge.outbox.rewind()
+        bridge.on_connection_open(client)  # type: ignore[arg-type]
+
+        types = [entry.message.get("type") for entry in bridge.outbox.peek(100)]
+        assert types == ["resume"]
+    finally:
+        bridge.stop()
@@ -0,0 +1,94 @@
+from src.outbox import Outbox
+
+
+def messages(outbox: Outbox) -> list[object]:
+    return [entry.message for entry in outbox.peek(100)]
+
+
+def send(outbox: Outbox, count: int, wait_ack: bool = True) -> list[int]:
+    """Отправляет `count` сообщений одним кадром и возвращает их номера"""
+    entries = outbox.peek(count)
+    outbox.commit(len(entries), wait_ack=wait_ack)
+    return [entry.seq for entry in entries]
+
+
+def test_put_numbers_messages_in_order() -> None:
+    outbox = Outbox()
+    for number in range(3):
+        outbox.put(number)
+
+    assert [entry.seq for entry in outbox.peek(100)] == [1, 2, 3]
+    assert messages(outbox) == [0, 1, 2]
+    assert messages(outbox) == [0, 1, 2]  # peek не удаляет сообщения
+    assert len(outbox) == 3
+
+
+def test_commit_removes_sent_messages() -> None:
+    outbox = Outbox()
+    for number in range(3):
+        outbox.put(number)
+
+    send(outbox, 2, wait_ack=False)
+
+    assert messages(outbox) == [2]
+    stats = outbox.stats()
+    assert (stats.sent, stats.frames, stats.unacked) == (2, 1, 0)
+    assert outbox.rewind() == 0  # Без подтверждений повторять нечего
+
+
+def test_rewind_puts_unacked_messages_first() -> None:
+    outbox = Outbox()
+    for number in range(4):
+        outbox.put(number)
+    send(outbox, 1)
+    send(outbox, 2)
+    outbox.put(4)
+
+    assert outbox.rewind() == 3
+    assert messages(outbox) == [0, 1, 2, 3, 4]
+    assert [entry.seq for entry in outbox.peek(100)] == [1, 2, 3, 4, 5]
+
+
+def test_ack_releases_messages_up_to_seq() -> None:
+    outbox = Outbox()
+    for number in range(3):
+        outbox.put(number)
+    seqs = send(outbox, 3)
+
+    outbox.ack(seqs[1])
+
+    assert outbox.stats().unacked == 1
+    assert outbox.rewind() == 1
+    assert messages(outbox) == [2]
+
+
+def test_ack_of_everything_leaves_nothing_to_replay() -> None:
+    outbox = Outbox()
+    outbox.put("result")
+    seqs = send(outbox, 1)
+
+    outbox.ack(seqs[-1])
+
+    assert outbox.rewind() == 0
+    assert messages(outbox) == []
+
+
+def test_not_replayed_messages_are_dropped_on_rewind() -> None:
+    outbox = Outbox()
+    outbox.put("result")
+    outbox.put({"type": "credit"}, replay=False)
+    send(outbox, 2)  # Отправлены, но не подтверждены
+    outbox.put({"type": "resume"}, replay=False)  # Не успели отправить
+    outbox.put("late result")
+
+    assert outbox.rewind() == 1
+    assert messages(outbox) == ["result", "late result"]
+
+
+def test_overflow_drops_oldest_message() -> None:
+    outbox = Outbox(maxsize=2)
+    for number in range(3):
+        outbox.put(number)
+
+    assert messages(outbox) == [1, 2]
+    assert outbox.stats().dropped == 1
@@ -0,0 +1,59 @@
+import random
+import time
+
+import pytest
+
+from src.reconnect import ReconnectPolicy, ReconnectScheduler
+
+POLICY = ReconnectPolicy(first_delay=1.0, base_delay=2.0, max_delay=10.0, factor=2.0)
+
+
+def test_delay_bounds_grow_up_to_max_delay(monkeypatch: pytest.MonkeyPatch) -> None:
+    # Верхняя граница джиттера: задержка равна текущей границе
+    monkeypatch.setattr(random, "uniform", lambda low, high: high)
+    scheduler = ReconnectScheduler(POLICY)
+
+    delays = [scheduler.next_delay() for _ in range(6)]
+
+    assert delays == [1.0, 2.0, 4.0, 8.0, 10.0, 10.0]
+    assert scheduler.attempts == 6
+
+
+def test_jittered_delays_stay_within_bounds() -> None:
+    random.seed(20241)
+    scheduler = ReconnectScheduler(POLICY)
+
+    for attempt in range(50):
+        cap = 1.0 if attempt == 0 else min(2.0 * 2.0 ** (attempt - 1), 10.0)
+        delay = scheduler.next_delay()
+        assert 0 <= delay <= cap
+        assert scheduler.last_delay == delay
+
+    # Полный джиттер: задержки не совпадают у попыток с одной границей
+    assert len({scheduler.next_delay() for _ in range(10)}) == 10
+
+
+def test_reset_reports_attempts_and_recovery_time(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    now = [100.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    scheduler = ReconnectScheduler(POLICY)
+
+    scheduler.next_delay()
+    scheduler.next_delay()
+    now[0] = 107.5
+
+    assert scheduler.reset() == (2, 7.5)
+    assert scheduler.attempts == 0
+    assert scheduler.last_delay is None
+
+    # После сброса отсчет начинается заново с первой границы
+    monkeypatch.setattr(random, "uniform", lambda low, high: high)
+    assert scheduler.next_delay() == 1.0
+
+
+def test_reset_without_attempts_has_no_recovery_time() -> None:
+    scheduler = ReconnectScheduler(POLICY)
+
+    assert scheduler.reset() == (0, None)